@@ -0,0 +1,70 @@
+"""
+AEAD envelope benchmark
+
+Protects and opens messages of 64 B to 64 KB with a session key and reports throughput of:
+    - AES-CFB encryption and HMAC-SHA1 signature (encrypt + sign, unsign + decrypt)
+    - AES-GCM and ChaCha20-Poly1305 authenticated encryption (encrypt, decrypt)
+"""
+
+import os
+import time
+from utim.utilities.cryptography import CryptoLayer
+
+_SIZES = (64, 1024, 16384, 65536)
+_BYTES = 16 * 1024 * 1024
+_MODES = (
+    ('AES-CFB + HMAC-SHA1', CryptoLayer.CRYPTO_MODE_AES),
+    ('AES-GCM', CryptoLayer.CRYPTO_MODE_AES_GCM),
+    ('ChaCha20-Poly1305', CryptoLayer.CRYPTO_MODE_CHACHA20_POLY1305),
+)
+
+
+def bench(title, mode, size):
+    """
+    Protect and open messages
+
+    :param str title: Case title
+    :param bytes mode: Crypto mode
+    :param int size: Message size
+    """
+
+    crypto = CryptoLayer(os.urandom(32), mode)
+    body = os.urandom(size)
+    count = max(_BYTES // size // 4, 100)
+
+    start = time.perf_counter()
+    if crypto.is_aead:
+        for _ in range(count):
+            message = crypto.encrypt(mode, body)
+    else:
+        for _ in range(count):
+            message = crypto.sign(CryptoLayer.SIGN_MODE_SHA1, crypto.encrypt(mode, body))
+    protect = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if crypto.is_aead:
+        for _ in range(count):
+            opened = crypto.decrypt(message)
+    else:
+        for _ in range(count):
+            opened = crypto.decrypt(crypto.unsign(message))
+    open_ = time.perf_counter() - start
+    assert opened == body
+
+    print("{0:<20} {1:6} B: protect {2:7.1f} MB/s {3:7.2f} us, open {4:7.1f} MB/s {5:7.2f} us, "
+          "+{6} B".format(title, size, size * count / protect / 1e6, protect / count * 1e6,
+                          size * count / open_ / 1e6, open_ / count * 1e6, len(message) - size))
+
+
+def main():
+    """
+    Main function
+    """
+
+    for size in _SIZES:
+        for title, mode in _MODES:
+            bench(title, mode, size)
+
+
+if __name__ == '__main__':
+    main()
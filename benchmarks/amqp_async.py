@@ -0,0 +1,188 @@
+"""
+AMQP backend benchmark
+
+Concurrent publisher threads send messages through UConnAMQP (BlockingConnection, publishers
+share the channel) and UConnAMQPAsync (SelectConnection, publishes handed to one I/O thread).
+Stand-in connections write every published frame to a local socket pair drained by a reader
+thread. As pika does, the asynchronous stand-in buffers frames and writes them once per I/O loop
+iteration. Reports total messages per second and the mean time a publisher spends in publish().
+"""
+
+import collections
+import os
+import socket
+import threading
+import time
+import pika
+import pika.adapters.select_connection
+from utim import get_root_path
+
+os.environ.setdefault('UTIM_CONFIG', os.path.join(get_root_path(), 'examples', 'config.ini'))
+
+from utim.utilities import uconn_amqp_async
+from utim.utilities.uconn_amqp import UConnAMQP
+from utim.utilities.uconn_amqp_async import UConnAMQPAsync
+
+_MESSAGES = 20000
+_PUBLISHERS = (1, 4, 8)
+_FRAME = b'\x00' * 120
+
+
+class Wire(object):
+    """
+    Local socket pair, everything written is read and dropped by a reader thread
+    """
+
+    def __init__(self):
+        self.writer, reader = socket.socketpair()
+        thread = threading.Thread(target=self.__read, args=(reader,), name='THREAD_WIRE')
+        thread.daemon = True
+        thread.start()
+
+    @staticmethod
+    def __read(reader):
+        while reader.recv(65536):
+            pass
+
+
+class BlockingStandIn(object):
+    """
+    Connection and channel with BlockingConnection interface, every frame is written at once
+    """
+
+    def __init__(self, parameters):
+        self.__wire = Wire()
+
+    def channel(self):
+        return self
+
+    def queue_declare(self, queue='', durable=False, **kwargs):
+        pass
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, **kwargs):
+        self.__wire.writer.sendall(_FRAME)
+
+    def stop_consuming(self):
+        pass
+
+    def close(self):
+        self.__wire.writer.close()
+
+
+class IOLoop(object):
+    """
+    I/O loop running threadsafe callbacks and flushing the output buffer after each pass
+    """
+
+    def __init__(self, connection):
+        self.__connection = connection
+        self.__callbacks = collections.deque()
+        self.__wakeup = threading.Condition()
+        self.__running = True
+
+    def add_callback_threadsafe(self, callback):
+        with self.__wakeup:
+            self.__callbacks.append(callback)
+            self.__wakeup.notify()
+
+    def start(self):
+        while self.__running:
+            with self.__wakeup:
+                while not self.__callbacks and self.__running:
+                    self.__wakeup.wait()
+                callbacks, self.__callbacks = self.__callbacks, collections.deque()
+            for callback in callbacks:
+                callback()
+            self.__connection.flush()
+
+    def stop(self):
+        self.__running = False
+
+
+class SelectStandIn(object):
+    """
+    Connection and channel with SelectConnection interface, frames are buffered
+    """
+
+    def __init__(self, parameters, on_open_callback, on_open_error_callback, on_close_callback):
+        self.__wire = Wire()
+        self.__buffer = []
+        self.__on_close_callback = on_close_callback
+        self.ioloop = IOLoop(self)
+        self.is_open = True
+        self.ioloop.add_callback_threadsafe(lambda: on_open_callback(self))
+
+    def add_callback_threadsafe(self, callback):
+        self.ioloop.add_callback_threadsafe(callback)
+
+    def channel(self, on_open_callback):
+        on_open_callback(self)
+
+    def queue_declare(self, callback, queue='', durable=False, **kwargs):
+        callback(None)
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, **kwargs):
+        self.__buffer.append(_FRAME)
+
+    def flush(self):
+        if self.__buffer:
+            self.__wire.writer.sendall(b''.join(self.__buffer))
+            self.__buffer = []
+
+    def close(self):
+        self.flush()
+        self.is_open = False
+        self.__wire.writer.close()
+        self.__on_close_callback(self, 200, 'Normal shutdown')
+        self.ioloop.stop()
+
+
+def bench(title, connection, publishers):
+    """
+    Publish messages from publisher threads
+
+    :param str title: Case title
+    :param connection: UConnAMQP or UConnAMQPAsync
+    :param int publishers: Number of publisher threads
+    """
+
+    count = _MESSAGES // publishers
+    blocked = [0.0] * publishers
+    message = b'\x00' * 64
+
+    def publisher(index):
+        start = time.perf_counter()
+        for _ in range(count):
+            connection.publish(b'utim', 'uhost', message)
+        blocked[index] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=publisher, args=(index,), name='THREAD_PUBLISHER')
+               for index in range(publishers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Asynchronous connection publishes the rest before closing
+    connection.disconnect()
+    elapsed = time.perf_counter() - start
+
+    print("{0:<16} {1} publishers: {2:8.0f} messages/s, {3:5.2f} us in publish()".format(
+        title, publishers, count * publishers / elapsed, sum(blocked) / (count * publishers) * 1e6))
+
+
+def main():
+    """
+    Main function
+    """
+
+    pika.BlockingConnection = BlockingStandIn
+    uconn_amqp_async.SelectConnection = SelectStandIn
+
+    for publishers in _PUBLISHERS:
+        bench('UConnAMQP', UConnAMQP(), publishers)
+        bench('UConnAMQPAsync', UConnAMQPAsync(), publishers)
+
+
+if __name__ == '__main__':
+    main()
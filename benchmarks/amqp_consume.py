@@ -0,0 +1,183 @@
+"""
+AMQP consume benchmark
+
+Consumes messages through UConnAMQP from a stand-in broker and reports consumer messages per
+second and ack frames sent, for prefetch counts and ack batch sizes. The stand-in keeps at most
+prefetch count unacknowledged messages delivered, an ack reaches it after half a simulated round
+trip and releases more deliveries after the other half, and every frame sent by the consumer
+costs some CPU time.
+"""
+
+import os
+import threading
+import time
+import pika
+from utim import get_root_path
+
+os.environ.setdefault('UTIM_CONFIG', os.path.join(get_root_path(), 'examples', 'config.ini'))
+
+from utim.utilities.uconn_amqp import UConnAMQP
+
+_MESSAGES = 5000
+_RTT = 0.0005
+_FRAME_COST = 0.00002
+
+
+def spin(seconds):
+    """
+    Busy wait, sleep is too coarse for frame costs
+    """
+
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class Deliver(object):
+    """
+    Basic.Deliver method
+    """
+
+    def __init__(self, delivery_tag, routing_key):
+        self.delivery_tag = delivery_tag
+        self.routing_key = routing_key
+
+
+class StandInChannel(object):
+    """
+    Channel with BlockingChannel interface delivering preloaded messages
+    """
+
+    def __init__(self, connection):
+        self.__connection = connection
+        self.__prefetch_count = 0
+        self.__consumer = None
+        self.acks = 0
+        # Highest delivery tag acknowledged, as seen by the broker after a round trip
+        self.__acked = 0
+        self.__ack_visible = []
+
+    def basic_qos(self, prefetch_size=0, prefetch_count=0, all_channels=False):
+        self.__prefetch_count = prefetch_count
+
+    def queue_declare(self, queue='', durable=False, **kwargs):
+        pass
+
+    def basic_consume(self, consumer_callback, queue, consumer_tag=None, **kwargs):
+        self.__consumer = (consumer_callback, queue)
+
+    def basic_ack(self, delivery_tag=0, multiple=False):
+        spin(_FRAME_COST)
+        self.acks += 1
+        self.__ack_visible.append((time.perf_counter() + _RTT, delivery_tag))
+
+    def basic_cancel(self, consumer_tag):
+        pass
+
+    def stop_consuming(self):
+        self.__consumer = None
+
+    def start_consuming(self):
+        callback, queue = self.__consumer
+        properties = pika.BasicProperties(headers={'sender': 'uhost'})
+        tag = 0
+        while self.__consumer is not None:
+            now = time.perf_counter()
+            while self.__ack_visible and self.__ack_visible[0][0] <= now:
+                self.__acked = self.__ack_visible.pop(0)[1]
+            self.__connection.run_timers(now)
+
+            if tag >= _MESSAGES or (self.__prefetch_count and
+                                    tag - self.__acked >= self.__prefetch_count):
+                time.sleep(_RTT / 10)
+                continue
+
+            tag += 1
+            callback(self, Deliver(tag, queue), properties, b'\x00' * 64)
+
+
+class StandInConnection(object):
+    """
+    Connection with BlockingConnection interface
+    """
+
+    last = None
+
+    def __init__(self, parameters):
+        self.channels = []
+        self.__timers = {}
+        StandInConnection.last = self
+
+    def channel(self):
+        channel = StandInChannel(self)
+        self.channels.append(channel)
+        return channel
+
+    def add_timeout(self, deadline, callback_method):
+        handle = object()
+        self.__timers[handle] = (time.perf_counter() + deadline, callback_method)
+        return handle
+
+    def add_callback_threadsafe(self, callback):
+        self.add_timeout(0, callback)
+
+    def remove_timeout(self, timeout_id):
+        self.__timers.pop(timeout_id, None)
+
+    def run_timers(self, now):
+        for handle, (deadline, callback) in list(self.__timers.items()):
+            if deadline <= now:
+                self.__timers.pop(handle)
+                callback()
+
+    def close(self):
+        pass
+
+
+def bench(title, **kwargs):
+    """
+    Consume messages
+
+    :param str title: Case title
+    :param kwargs: UConnAMQP options
+    """
+
+    received = [0]
+    done = threading.Event()
+
+    def on_message(_, sender, message):
+        received[0] += 1
+        if received[0] == _MESSAGES:
+            done.set()
+
+    connection = UConnAMQP(**kwargs)
+    channel = StandInConnection.last.channels[0]
+
+    start = time.perf_counter()
+    connection.subscribe('utim', None, on_message)
+    done.wait()
+    elapsed = time.perf_counter() - start
+    connection.disconnect()
+
+    print("{0:<32} {1:8.0f} messages/s, {2:5} ack frames".format(
+        title, _MESSAGES / elapsed, channel.acks))
+
+
+def main():
+    """
+    Main function
+    """
+
+    pika.BlockingConnection = StandInConnection
+
+    print("Simulated round trip {0:.1f} ms, {1:.0f} us per frame".format(_RTT * 1e3,
+                                                                        _FRAME_COST * 1e6))
+    bench('no prefetch, ack every message')
+    bench('prefetch 1, ack every message', prefetch_count=1)
+    bench('prefetch 100, ack every message', prefetch_count=100)
+    bench('prefetch 100, ack 50 / 10 ms', prefetch_count=100, ack_batch=50)
+    bench('prefetch 1000, ack 100 / 10 ms', prefetch_count=1000, ack_batch=100)
+
+
+if __name__ == '__main__':
+    main()
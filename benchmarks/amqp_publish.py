@@ -0,0 +1,122 @@
+"""
+AMQP publish benchmark
+
+Publishes messages through UConnAMQP over a stand-in pika connection that answers synchronous
+calls (queue declare, transaction commit) after a simulated broker round trip, and reports
+publish throughput and round trips per message:
+    - queue declared before every publish, as UConnAMQP used to
+    - declared queues cached, no transactions
+    - transaction committed after every message
+    - transaction commits batched
+Commits are synchronous round trips, so batching them is what makes transactions affordable;
+publisher confirms (confirm_delivery) are offered by UConnAMQPAsync with confirm=True.
+"""
+
+import os
+import time
+import pika
+from utim import get_root_path
+
+os.environ.setdefault('UTIM_CONFIG', os.path.join(get_root_path(), 'examples', 'config.ini'))
+
+from utim.utilities.uconn_amqp import UConnAMQP
+
+_MESSAGES = 2000
+_RTT = 0.0005
+
+
+class StandInChannel(object):
+    """
+    Channel with BlockingChannel interface, synchronous calls take one round trip
+    """
+
+    def __init__(self):
+        self.round_trips = 0
+
+    def __round_trip(self):
+        self.round_trips += 1
+        time.sleep(_RTT)
+
+    def queue_declare(self, queue='', durable=False, **kwargs):
+        self.__round_trip()
+
+    def tx_select(self):
+        self.__round_trip()
+
+    def tx_commit(self):
+        self.__round_trip()
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, **kwargs):
+        pass
+
+    def basic_cancel(self, consumer_tag):
+        pass
+
+    def stop_consuming(self):
+        pass
+
+
+class StandInConnection(object):
+    """
+    Connection with BlockingConnection interface
+    """
+
+    channels = []
+
+    def __init__(self, parameters):
+        pass
+
+    def channel(self):
+        channel = StandInChannel()
+        StandInConnection.channels.append(channel)
+        return channel
+
+    def close(self):
+        pass
+
+
+def bench(title, declare_always=False, **kwargs):
+    """
+    Publish messages
+
+    :param str title: Case title
+    :param bool declare_always: Declare queue before every publish
+    :param kwargs: UConnAMQP options
+    """
+
+    StandInConnection.channels = []
+    connection = UConnAMQP(**kwargs)
+    channel = StandInConnection.channels[-1]
+    channel.round_trips = 0
+    message = b'\x00' * 64
+
+    start = time.perf_counter()
+    for _ in range(_MESSAGES):
+        if declare_always:
+            channel.queue_declare(queue='uhost', durable=True)
+            channel.basic_publish(exchange='', routing_key='uhost', body=message)
+        else:
+            connection.publish(b'utim', 'uhost', message)
+    connection.disconnect()
+    elapsed = time.perf_counter() - start
+
+    print("{0:<40} {1:8.0f} messages/s, {2:.3f} round trips/message".format(
+        title, _MESSAGES / elapsed, channel.round_trips / _MESSAGES))
+
+
+def main():
+    """
+    Main function
+    """
+
+    pika.BlockingConnection = StandInConnection
+
+    print("Simulated round trip {0:.1f} ms".format(_RTT * 1e3))
+    bench('declare every publish (before)', declare_always=True)
+    bench('declare cached, no transactions')
+    bench('declare cached, commit every message', confirm_batch=1)
+    bench('declare cached, commit 100 / 10 ms', confirm_batch=100, confirm_interval_ms=10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Batch crypto benchmark
+
+Protects (encrypt + sign) and opens (unsign + decrypt) a burst of messages with a session key
+and reports messages per second: one call per message, batch calls in the calling thread and
+batch calls on thread pools of growing size.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utim.utilities.cryptography import CryptoLayer
+
+_BURST = 8192
+_SIZES = (64, 1024, 8192)
+_MODES = (
+    ('CFB+HMAC', CryptoLayer.CRYPTO_MODE_AES),
+    ('ChaCha20-Poly1305', CryptoLayer.CRYPTO_MODE_CHACHA20_POLY1305),
+)
+
+
+def per_message(crypto, mode, messages):
+    """
+    One call per message
+    """
+
+    if crypto.is_aead:
+        protected = [crypto.encrypt(mode, message) for message in messages]
+        opened = [crypto.decrypt(message) for message in protected]
+    else:
+        protected = [crypto.sign(CryptoLayer.SIGN_MODE_SHA1, crypto.encrypt(mode, message))
+                     for message in messages]
+        opened = [crypto.decrypt(crypto.unsign(message)) for message in protected]
+    return protected, opened
+
+
+def batch(crypto, mode, messages, executor):
+    """
+    Batch calls
+    """
+
+    protected = crypto.encrypt_many(mode, messages, executor)
+    if crypto.is_aead:
+        return protected, crypto.decrypt_many(protected, executor)
+
+    protected = crypto.sign_many(CryptoLayer.SIGN_MODE_SHA1, protected, executor)
+    return protected, crypto.decrypt_many(crypto.unsign_many(protected, executor), executor)
+
+
+def bench(title, run, size):
+    """
+    Time run(messages)
+    """
+
+    messages = [os.urandom(size) for _ in range(_BURST)]
+    start = time.perf_counter()
+    protected, opened = run(messages)
+    elapsed = time.perf_counter() - start
+    assert opened == messages
+
+    print("{0:<44} {1:5} B: {2:8.0f} messages/s".format(title, size, _BURST / elapsed))
+
+
+def main():
+    """
+    Main function
+    """
+
+    key = os.urandom(32)
+    workers = sorted(set((1, 2, 4, os.cpu_count() or 1)))
+    executors = [(count, ThreadPoolExecutor(count)) for count in workers]
+    print("{0} cores".format(os.cpu_count()))
+
+    for name, mode in _MODES:
+        crypto = CryptoLayer(key, mode)
+        for size in _SIZES:
+            bench(name + ', per message', lambda m: per_message(crypto, mode, m), size)
+            bench(name + ', batch', lambda m: batch(crypto, mode, m, None), size)
+            for count, executor in executors:
+                bench('{0}, batch, {1} threads'.format(name, count),
+                      lambda m: batch(crypto, mode, m, executor), size)
+
+    for _, executor in executors:
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Crypto context benchmark
+
+Runs messages through the encrypt, sign, unsign and decrypt workers with a session key and
+reports time per message: with the session crypto layer and with a crypto layer built for every
+message from the key, as the workers used to.
+"""
+
+import os
+import time
+from utim.gateway import UtimIdentity
+from utim.utilities.cryptography import CryptoLayer
+from utim.utilities.message import Message
+from utim.workers import utim_worker_decrypt
+from utim.workers import utim_worker_encrypt
+from utim.workers import utim_worker_sign
+from utim.workers import utim_worker_unsign
+
+_MESSAGES = 20000
+_SIZES = (16, 256, 4096)
+
+
+class PerMessageIdentity(UtimIdentity):
+    """
+    Identity building crypto layer on every request
+    """
+
+    __slots__ = ()
+
+    def get_crypto(self):
+        return CryptoLayer(self.get_session_key())
+
+
+def bench(title, identity, size):
+    """
+    Run messages through workers
+
+    :param str title: Case title
+    :param identity: Identity with session key
+    :param int size: Message size
+    """
+
+    body = os.urandom(size)
+    message = Message(None, None, None, None)
+
+    start = time.perf_counter()
+    for _ in range(_MESSAGES):
+        message.body = body
+        utim_worker_encrypt.process(identity, message)
+        utim_worker_sign.process(identity, message)
+        utim_worker_unsign.process(identity, message)
+        utim_worker_decrypt.process(identity, message)
+    elapsed = time.perf_counter() - start
+    assert message.body == body
+
+    print("{0:<22} {1:5} B: {2:6.2f} us per message (4 workers)".format(
+        title, size, elapsed / _MESSAGES * 1e6))
+
+
+def main():
+    """
+    Main function
+    """
+
+    key = os.urandom(16)
+    cached = UtimIdentity('00', b'key', None, None)
+    cached.set_session_key(key)
+    per_message = PerMessageIdentity('00', b'key', None, None)
+    per_message.set_session_key(key)
+
+    for size in _SIZES:
+        bench('layer per message', per_message, size)
+        bench('session crypto layer', cached, size)
+
+
+if __name__ == '__main__':
+    main()
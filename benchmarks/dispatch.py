@@ -0,0 +1,75 @@
+"""
+Command dispatch benchmark
+
+Measures per-message cost of ProcessDevice.process with a registered worker and
+compares table lookup with the if/elif chain it replaced.
+"""
+
+import timeit
+from utim.utilities.tag import Tag
+from utim.utilities.address import Address
+from utim.utilities.status import Status
+from utim.utilities.process_device import ProcessDevice
+from utim.utilities.message import Message
+
+_NUMBER = 200000
+_TELEMETRY = b'\xe0'
+
+# Uhost commands in the order the old chain compared them
+_CHAIN = [
+    Tag.UCOMMAND.TRY_FIRST,
+    Tag.UCOMMAND.INIT,
+    Tag.UCOMMAND.CONNECTION_STRING,
+    Tag.UCOMMAND.TEST_PLATFORM_DATA,
+    Tag.UCOMMAND.AUTHENTIC,
+    Tag.UCOMMAND.ERROR,
+    Tag.UCOMMAND.KEEPALIVE,
+]
+
+
+def telemetry_worker(utim, data):
+    data.status = Status.STATUS_FINALIZED
+    return data
+
+
+def chain_lookup(body):
+    command = body[0:1]
+    for index, tag in enumerate(_CHAIN):
+        if command == tag:
+            return index
+    return None
+
+
+def table_lookup(table, body):
+    return table.get(body[0]) if body else None
+
+
+def main():
+    """
+    Main function
+    """
+
+    ProcessDevice.register_worker(_TELEMETRY, telemetry_worker)
+    device = ProcessDevice(None)
+
+    body = _TELEMETRY + b'\x00\x04data'
+
+    def process():
+        device.process(Message(Address.ADDRESS_DEVICE, Address.ADDRESS_UTIM, Status.STATUS_PROCESS, body))
+
+    per_message = min(timeit.repeat(process, number=_NUMBER, repeat=5)) / _NUMBER * 1e9
+    print("ProcessDevice.process, registered worker: {0:.1f} ns/message".format(per_message))
+
+    table = {ord(tag): index for index, tag in enumerate(_CHAIN)}
+    for tag in (_CHAIN[0], _CHAIN[-1]):
+        message = tag + b'\x00\x00'
+        chain = min(timeit.repeat(lambda: chain_lookup(message), number=_NUMBER, repeat=5))
+        lookup = min(timeit.repeat(lambda: table_lookup(table, message), number=_NUMBER, repeat=5))
+        print("Command {0}: if/elif chain {1:.1f} ns, table {2:.1f} ns".format(
+            tag.hex(), chain / _NUMBER * 1e9, lookup / _NUMBER * 1e9))
+
+    ProcessDevice.unregister_worker(_TELEMETRY)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Gateway benchmark
+
+Hosts 1k and 10k identities in one UtimGateway and reports memory and CPU per identity:
+    - idle identity (added and subscribed)
+    - identity after SRP start (network ready from device, hello published to Uhost)
+    - keepalive round trip from Uhost
+
+A stand-in connection replaces the broker, so only gateway and processing costs are measured.
+Before that, an identity added with AES-GCM is checked against a Uhost stand-in: SRP handshake
+and an encrypted keepalive round trip.
+"""
+
+import contextlib
+import gc
+import os
+import threading
+import time
+import tracemalloc
+from utim.gateway import UtimGateway
+from utim.utilities import srp
+from utim.utilities.tag import Tag
+from utim.utilities.cryptography import CryptoLayer
+
+_SIZES = (1000, 10000)
+_WORKERS = 4
+_MASTER_KEY = b'gateway benchmark key'
+
+
+class StandInConnection(object):
+    """
+    Connection with ConnManager interface that counts published messages
+    """
+
+    def __init__(self):
+        self.__subscriptions = {}
+        self.__published = 0
+        self.__condition = threading.Condition()
+        self.last = None
+
+    def subscribe(self, topic, callback_object, callback):
+        self.__subscriptions[topic] = (callback_object, callback)
+
+    def unsubscribe(self, topic):
+        self.__subscriptions.pop(topic, None)
+
+    def publish(self, sender, destination, message):
+        with self.__condition:
+            self.__published += 1
+            self.last = message
+            self.__condition.notify_all()
+
+    def disconnect(self):
+        pass
+
+    def deliver(self, topic, sender, message):
+        callback_object, callback = self.__subscriptions[topic]
+        callback(callback_object, sender, message)
+
+    def wait_published(self, count):
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__published >= count)
+
+
+def check_aead_identity():
+    """
+    Check SRP handshake and encrypted keepalive of an identity in AES-GCM mode
+    """
+
+    mode = CryptoLayer.CRYPTO_MODE_AES_GCM
+    name = '7574696D'
+    username = bytes.fromhex(name)
+    connection = StandInConnection()
+    gateway = UtimGateway(connection=connection, uhost_name='uhost', workers=1)
+    gateway.add_identity(name, _MASTER_KEY, crypto_mode=mode)
+    gateway.run()
+    crypto = CryptoLayer(None)
+    published = [0]
+
+    def exchange(message):
+        # Uhost message, or device data of the handshake start; returns the reply to Uhost
+        if message == Tag.INBOUND.NETWORK_READY:
+            gateway.send(name, message)
+        else:
+            connection.deliver(name, b'uhost', message)
+        published[0] += 1
+        connection.wait_published(published[0])
+        return connection.last
+
+    def unsigned(body):
+        return crypto.sign(CryptoLayer.SIGN_MODE_SHA1,
+                           crypto.encrypt(CryptoLayer.CRYPTO_MODE_AES, body))
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        hello = crypto.decrypt(crypto.unsign(exchange(Tag.INBOUND.NETWORK_READY)))
+        salt, verifier = srp.create_salted_verification_key(username, _MASTER_KEY)
+        uhost = srp.Verifier(username, salt, verifier, hello[3:])
+        salt, challenge = uhost.get_challenge()
+        check = crypto.decrypt(crypto.unsign(exchange(unsigned(
+            Tag.UCOMMAND.assemble_try(salt, challenge)))))
+        hamk = uhost.verify_session(check[3:])
+        session = CryptoLayer(uhost.get_session_key(), mode)
+        trusted = exchange(unsigned(Tag.UCOMMAND.assemble_init(hamk)))
+        assert trusted[:2] == Tag.CRYPTO.ENCRYPTED + mode, trusted[:2]
+        assert session.decrypt(trusted)[:1] == Tag.UCOMMAND.TRUSTED
+        reply = exchange(session.encrypt(mode, Tag.UCOMMAND.KEEPALIVE))
+        assert reply[:2] == Tag.CRYPTO.ENCRYPTED + mode, reply[:2]
+        assert session.decrypt(reply), reply
+
+    gateway.stop()
+    print("AES-GCM identity handshake and keepalive round trip: OK")
+
+
+def run_stages(size, names, connection, gateway):
+    """
+    Run SRP start and keepalive stages
+
+    :return tuple: CPU seconds of SRP start and keepalive stages
+    """
+
+    keepalive = CryptoLayer(None).sign(CryptoLayer.SIGN_MODE_SHA1,
+                                       CryptoLayer(None).encrypt(CryptoLayer.CRYPTO_MODE_AES,
+                                                                 Tag.UCOMMAND.KEEPALIVE))
+
+    # Workers print on SRP start
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.process_time()
+        for name in names:
+            gateway.send(name, Tag.INBOUND.NETWORK_READY)
+        connection.wait_published(size)
+        hello = time.process_time() - start
+
+    start = time.process_time()
+    for name in names:
+        connection.deliver(name, b'uhost', keepalive)
+    connection.wait_published(2 * size)
+    alive = time.process_time() - start
+
+    return hello, alive
+
+
+def bench(size):
+    """
+    Benchmark gateway with size identities
+    """
+
+    names = ['{0:08X}'.format(index) for index in range(size)]
+
+    # Memory, traced
+    gc.collect()
+    tracemalloc.start()
+    connection = StandInConnection()
+    gateway = UtimGateway(connection=connection, uhost_name='uhost', workers=_WORKERS)
+    base = tracemalloc.get_traced_memory()[0]
+    for name in names:
+        gateway.add_identity(name, _MASTER_KEY)
+    idle = tracemalloc.get_traced_memory()[0] - base
+    gateway.run()
+    threads = threading.active_count()
+    run_stages(size, names, connection, gateway)
+    started = tracemalloc.get_traced_memory()[0] - base
+    gateway.stop()
+    tracemalloc.stop()
+    del gateway, connection
+
+    # CPU, untraced
+    gc.collect()
+    connection = StandInConnection()
+    gateway = UtimGateway(connection=connection, uhost_name='uhost', workers=_WORKERS)
+    start = time.process_time()
+    for name in names:
+        gateway.add_identity(name, _MASTER_KEY)
+    add = time.process_time() - start
+    gateway.run()
+    hello, alive = run_stages(size, names, connection, gateway)
+    gateway.stop()
+
+    print("{0:>6} identities, {1} threads in process".format(size, threads))
+    print("       memory: idle {0:7.0f} B/identity, after SRP start {1:7.0f} B/identity".format(
+        idle / size, started / size))
+    print("       cpu: add {0:6.1f} us, SRP start {1:7.1f} us, keepalive {2:6.1f} us per identity".format(
+        add / size * 1e6, hello / size * 1e6, alive / size * 1e6))
+
+
+def main():
+    """
+    Main function
+    """
+
+    check_aead_identity()
+    print("pid {0}, {1} gateway workers".format(os.getpid(), _WORKERS))
+    for size in _SIZES:
+        bench(size)
+
+
+if __name__ == '__main__':
+    main()
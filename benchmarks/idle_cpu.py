@@ -0,0 +1,52 @@
+"""
+Idle CPU benchmark
+
+Starts a queue-connected connectivity stack and an item processor, sends nothing
+and reports the CPU time the process burns while it is quiet.
+"""
+
+import queue
+import threading
+import time
+from utim.connectivity import DataLinkManager
+from utim.connectivity.manager import ConnectivityManager
+from utim.utilities.process_item import ProcessItem
+
+_DURATION = 5
+
+
+def main():
+    """
+    Main function
+    """
+
+    rx_queue = queue.Queue()
+    tx_queue = queue.Queue()
+
+    cm = ConnectivityManager()
+    cm.connect(dl_type=DataLinkManager.TYPE_QUEUE, rx=rx_queue, tx=tx_queue)
+
+    item = ProcessItem(None, queue.Queue(), queue.Queue())
+    item.run()
+
+    # Let threads settle
+    time.sleep(0.5)
+
+    threads = threading.active_count()
+    wall_start = time.monotonic()
+    cpu_start = time.process_time()
+    time.sleep(_DURATION)
+    cpu = time.process_time() - cpu_start
+    wall = time.monotonic() - wall_start
+
+    item.stop()
+    cm.stop()
+
+    print("Threads:  {0}".format(threads))
+    print("Wall:     {0:.2f} s".format(wall))
+    print("CPU:      {0:.3f} s".format(cpu))
+    print("CPU load: {0:.2f} %".format(100.0 * cpu / wall))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Lossy link benchmark
+
+Two ConnManagerMQTT instances talk through a stand-in broker that drops messages and acks with
+a given probability. Every message delivered to the receiver runs through Utim processing
+(keepalive), as it would in Utim. Reports retransmissions, duplicates dropped by the receive
+window and processing time saved by dropping them, with an ack per message and with delayed
+selective acks.
+"""
+
+import queue
+import random
+import threading
+import time
+from utim.gateway import UtimIdentity
+from utim.utilities.address import Address
+from utim.utilities.connmanagermqtt import ConnManagerMQTT
+from utim.utilities.cryptography import CryptoLayer
+from utim.utilities.delivery import Scheduler
+from utim.utilities.tag import Tag
+
+_MESSAGES = 2000
+_LOSS_RATES = (0.0, 0.1, 0.3)
+_RETRANSMIT = 0.5
+_ACK_DELAYS = (0, 0.05)
+
+
+class LossyLink(object):
+    """
+    Stand-in broker shared by both managers, dropping messages with given probability
+    """
+
+    def __init__(self, loss, seed=1):
+        self.__loss = loss
+        self.__random = random.Random(seed)
+        self.__subscriptions = {}
+        self.__queue = queue.Queue()
+        self.published = 0
+        self.acks = 0
+        thread = threading.Thread(target=self.__deliver, name='THREAD_LOSSY_LINK')
+        thread.daemon = True
+        thread.start()
+
+    def subscribe(self, topic, callback_object, callback):
+        self.__subscriptions[topic] = (callback_object, callback)
+
+    def publish(self, sender, destination, message):
+        self.published += 1
+        if message[:1] != b'\x01':
+            self.acks += 1
+        if self.__random.random() >= self.__loss:
+            self.__queue.put((destination, sender, message))
+
+    def disconnect(self):
+        pass
+
+    def __deliver(self):
+        while True:
+            destination, sender, message = self.__queue.get()
+            callback_object, callback = self.__subscriptions[destination]
+            callback(callback_object, sender, message)
+
+
+def check_frames():
+    """
+    Check frames: plain by default, with session when enabled, both delivered
+    """
+
+    link = LossyLink(0.0)
+    scheduler = Scheduler()
+    options = dict(scheduler=scheduler, connection=link)
+    plain = ConnManagerMQTT(**options)
+    session = ConnManagerMQTT(session_frames=True, **options)
+    receiver = ConnManagerMQTT(**options)
+    delivered = queue.Queue()
+    sent = []
+    publish = link.publish
+
+    def record(sender, destination, message):
+        if destination == 'utim':
+            sent.append(message[:1])
+        publish(sender, destination, message)
+
+    link.publish = record
+    plain.subscribe('plain', None, lambda *args: None)
+    session.subscribe('session', None, lambda *args: None)
+    receiver.subscribe('utim', None, lambda _, sender, message: delivered.put(message))
+
+    plain.publish(b'plain', 'utim', b'a')
+    session.publish(b'session', 'utim', b'b')
+    assert sent == [b'\x01', b'\x04'], sent
+    assert {delivered.get(timeout=1.0), delivered.get(timeout=1.0)} == {b'a', b'b'}
+
+    scheduler.stop()
+    print("Plain frames by default, session frames delivered: OK")
+
+
+def bench(loss, ack_delay):
+    """
+    Send messages over link with loss probability
+    """
+
+    link = LossyLink(loss)
+    scheduler = Scheduler()
+    options = dict(initial_delay=_RETRANSMIT, interval=_RETRANSMIT, connection=link)
+    uhost = ConnManagerMQTT(scheduler=scheduler, **options)
+    utim = ConnManagerMQTT(ack_delay=ack_delay, **options)
+
+    identity = UtimIdentity('00', b'key', None, None)
+    delivered = []
+    processing = [0.0]
+
+    def on_message(_, sender, message):
+        start = time.perf_counter()
+        identity.process((Address.ADDRESS_UHOST, message))
+        processing[0] += time.perf_counter() - start
+        delivered.append(message)
+
+    uhost.subscribe('uhost', None, lambda *args: None)
+    utim.subscribe('utim', None, on_message)
+
+    crypto = CryptoLayer(None)
+    keepalive = crypto.sign(CryptoLayer.SIGN_MODE_SHA1,
+                            crypto.encrypt(CryptoLayer.CRYPTO_MODE_AES, Tag.UCOMMAND.KEEPALIVE))
+    for _ in range(_MESSAGES):
+        uhost.publish(b'uhost', 'utim', keepalive)
+
+    # Everything is acknowledged when no republish is scheduled
+    while len(delivered) < _MESSAGES or len(scheduler):
+        time.sleep(_RETRANSMIT)
+
+    duplicates = utim.duplicates
+    per_message = processing[0] / len(delivered)
+    print("loss {0:3.0%}, ack delay {1:4.2f} s: {2} messages, {3} link publishes ({4} acks), "
+          "{5} delivered, {6} duplicates dropped, {7:.1f} ms of processing saved".format(
+              loss, ack_delay, _MESSAGES, link.published, link.acks, len(delivered), duplicates,
+              duplicates * per_message * 1e3))
+
+    scheduler.stop()
+
+
+def main():
+    """
+    Main function
+    """
+
+    check_frames()
+    for ack_delay in _ACK_DELAYS:
+        for loss in _LOSS_RATES:
+            bench(loss, ack_delay)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+MQTT reconnection benchmark
+
+A stand-in MQTT 3.1.1 broker on localhost:1883 drops every connection while UConnMQTT is
+connected, as a broker restart or a network failure would. A message published while the
+connection is down must be received through the same connection once paho has reconnected and
+subscribed again. Reports the time from the drop until the message is received, for QoS 0 with
+clean session ('mqtt') and QoS 1 with persistent session ('mqtt_qos'). Skipped when the port is
+taken, for example by a real broker.
+"""
+
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from utim import get_root_path
+
+os.environ.setdefault('UTIM_CONFIG', os.path.join(get_root_path(), 'examples', 'config.ini'))
+
+from utim.utilities.uconn_mqtt import UConnMQTT
+
+_PORT = 1883
+_DROPS = 3
+_TIMEOUT = 10
+
+
+class StandInBroker(object):
+    """
+    Broker routing QoS 0 and 1 publishes to exact topic subscriptions, forgetting the
+    subscriptions of dropped connections
+    """
+
+    def __init__(self):
+        self.__server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__server.bind(('127.0.0.1', _PORT))
+        self.__server.listen(5)
+        self.__lock = threading.Lock()
+        # Subscribed topics by client socket
+        self.__clients = {}
+        thread = threading.Thread(target=self.__accept, name='THREAD_STAND_IN_BROKER')
+        thread.daemon = True
+        thread.start()
+
+    def subscribed(self, topic):
+        """
+        Check if any connection is subscribed to topic
+        """
+
+        with self.__lock:
+            return any(topic in topics for topics in self.__clients.values())
+
+    def drop(self):
+        """
+        Close all connections
+        """
+
+        with self.__lock:
+            clients = list(self.__clients)
+            self.__clients.clear()
+        for client in clients:
+            client.shutdown(socket.SHUT_RDWR)
+            client.close()
+
+    def __accept(self):
+        while True:
+            client, _ = self.__server.accept()
+            with self.__lock:
+                self.__clients[client] = set()
+            thread = threading.Thread(target=self.__serve, args=(client,),
+                                      name='THREAD_STAND_IN_CLIENT')
+            thread.daemon = True
+            thread.start()
+
+    @staticmethod
+    def __read(client, length):
+        data = b''
+        while len(data) < length:
+            chunk = client.recv(length - len(data))
+            if not chunk:
+                raise OSError('Connection closed')
+            data += chunk
+        return data
+
+    def __read_packet(self, client):
+        header = self.__read(client, 1)[0]
+        length, shift = 0, 0
+        while True:
+            byte = self.__read(client, 1)[0]
+            length |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        return header, self.__read(client, length)
+
+    @staticmethod
+    def __packet(header, body):
+        length, encoded = len(body), b''
+        while True:
+            byte, length = length & 0x7f, length >> 7
+            encoded += bytes([byte | (0x80 if length else 0)])
+            if not length:
+                return bytes([header]) + encoded + body
+
+    def __serve(self, client):
+        try:
+            while True:
+                header, body = self.__read_packet(client)
+                kind = header >> 4
+                if kind == 1:
+                    client.sendall(self.__packet(0x20, b'\x00\x00'))
+                elif kind == 3:
+                    self.__route(client, header, body)
+                elif kind == 8:
+                    self.__subscribe(client, body)
+                elif kind == 12:
+                    client.sendall(self.__packet(0xd0, b''))
+                elif kind == 14:
+                    break
+        except OSError:
+            pass
+        with self.__lock:
+            self.__clients.pop(client, None)
+        client.close()
+
+    def __subscribe(self, client, body):
+        granted, offset = b'', 2
+        while offset < len(body):
+            length = struct.unpack('!H', body[offset:offset + 2])[0]
+            topic = body[offset + 2:offset + 2 + length].decode()
+            granted += bytes([min(body[offset + 2 + length], 1)])
+            offset += length + 3
+            with self.__lock:
+                if client in self.__clients:
+                    self.__clients[client].add(topic)
+        client.sendall(self.__packet(0x90, body[:2] + granted))
+
+    def __route(self, client, header, body):
+        length = struct.unpack('!H', body[:2])[0]
+        topic = body[2:2 + length].decode()
+        payload = body[2 + length:]
+        if (header >> 1) & 3:
+            client.sendall(self.__packet(0x40, payload[:2]))
+            payload = payload[2:]
+        packet = self.__packet(0x30, body[:2 + length] + payload)
+        with self.__lock:
+            subscribers = [c for c, topics in self.__clients.items() if topic in topics]
+        for subscriber in subscribers:
+            try:
+                subscriber.sendall(packet)
+            except OSError:
+                pass
+
+
+def wait(condition):
+    """
+    Wait until condition is true
+
+    :return bool: False on timeout
+    """
+
+    deadline = time.monotonic() + _TIMEOUT
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def bench(broker, title, qos):
+    """
+    Drop connection, publish and wait for the message
+
+    :param StandInBroker broker: Broker
+    :param str title: Case title
+    :param int qos: MQTT QoS level
+    """
+
+    received = queue.Queue()
+    connection = UConnMQTT(qos=qos, client_id='utim-reconnect-{0}'.format(qos))
+    topic = 'reconnect{0}'.format(qos)
+    connection.subscribe(topic, None, lambda _, sender, message: received.put(message))
+    assert wait(lambda: broker.subscribed(topic)), 'not subscribed'
+
+    elapsed = []
+    for number in range(_DROPS):
+        message = str(number).encode()
+        start = time.perf_counter()
+        broker.drop()
+        connection.publish(b'bench', topic, message)
+        try:
+            # QoS 0 message published while disconnected is lost, publish again once resubscribed
+            while True:
+                try:
+                    value = received.get(timeout=0.1)
+                except queue.Empty:
+                    assert time.perf_counter() - start < _TIMEOUT, 'traffic did not resume'
+                    if qos == 0 and broker.subscribed(topic):
+                        connection.publish(b'bench', topic, message)
+                    continue
+                if value == message:
+                    break
+        finally:
+            elapsed.append(time.perf_counter() - start)
+
+    connection.disconnect()
+    print("{0:<30} traffic resumed after {1} drops, {2:.2f} s on average".format(
+        title, _DROPS, sum(elapsed) / len(elapsed)))
+
+
+def main():
+    """
+    Main function
+    """
+
+    try:
+        broker = StandInBroker()
+    except OSError as er:
+        print("Port {0} not available ({1}), skipped".format(_PORT, er))
+        return
+
+    bench(broker, 'mqtt (QoS 0)', 0)
+    bench(broker, 'mqtt_qos (QoS 1)', 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+MQTT delivery mode benchmark
+
+Compares the 'mqtt' connection type (ConnManagerMQTT: id header and ack publish per message over
+QoS 0) with 'mqtt_qos' (delivery guaranteed by MQTT QoS 1 and 2):
+    - wire overhead: publishes and payload bytes per message, counted with a stand-in broker
+    - throughput: messages per second from one connection to another through the broker in
+    UTIM_CONFIG (examples/config.ini by default), skipped when the broker is not reachable
+"""
+
+import os
+import socket
+import threading
+import time
+from utim import get_root_path
+
+os.environ.setdefault('UTIM_CONFIG', os.path.join(get_root_path(), 'examples', 'config.ini'))
+
+from utim.utilities.config import Config
+from utim.utilities.connmanager import ConnManager
+from utim.utilities.connmanagermqtt import ConnManagerMQTT
+
+_MESSAGES = 5000
+_OVERHEAD_MESSAGES = 1000
+_SIZE = 64
+_TIMEOUT = 60
+
+
+class CountingConnection(object):
+    """
+    Stand-in broker counting publishes and payload bytes, delivering them at once
+    """
+
+    def __init__(self):
+        self.published = 0
+        self.bytes = 0
+        self.__subscriptions = {}
+
+    def subscribe(self, topic, callback_object, callback):
+        self.__subscriptions[topic] = (callback_object, callback)
+
+    def unsubscribe(self, topic):
+        self.__subscriptions.pop(topic, None)
+
+    def publish(self, sender, destination, message):
+        self.published += 1
+        # UConnMQTT payload is sender, space and message
+        self.bytes += len(sender) + 1 + len(message)
+        callback_object, callback = self.__subscriptions[destination]
+        callback(callback_object, sender, message)
+
+    def disconnect(self):
+        pass
+
+
+def overhead():
+    """
+    Report publishes and bytes per message of the ack protocol
+    """
+
+    link = CountingConnection()
+    manager = ConnManagerMQTT(connection=link)
+    manager.subscribe('uhost', None, lambda *args: None)
+    manager.subscribe('utim', None, lambda *args: None)
+    message = b'\x00' * _SIZE
+    for _ in range(_OVERHEAD_MESSAGES):
+        manager.publish(b'uhost', 'utim', message)
+    manager.disconnect()
+
+    plain = len(b'uhost') + 1 + _SIZE
+    print("{0:<22} {1:.1f} publishes, {2:.1f} payload bytes per {3} B message".format(
+        'mqtt (acks)', link.published / _OVERHEAD_MESSAGES, link.bytes / _OVERHEAD_MESSAGES,
+        _SIZE))
+    print("{0:<22} {1:.1f} publishes, {2:.1f} payload bytes per {3} B message".format(
+        'mqtt_qos', 1.0, float(plain), _SIZE))
+
+
+def throughput(title, connection_type, **kwargs):
+    """
+    Send messages through broker
+
+    :param str title: Case title
+    :param str connection_type: ConnManager connection type
+    :param kwargs: Options of the connection
+    """
+
+    received = [0]
+    done = threading.Event()
+
+    def on_message(_, sender, message):
+        received[0] += 1
+        if received[0] == _MESSAGES:
+            done.set()
+
+    receiver_options = dict(kwargs)
+    if 'qos' in kwargs:
+        receiver_options['client_id'] = 'utim-benchmark-receiver'
+        kwargs['client_id'] = 'utim-benchmark-sender'
+    receiver = ConnManager(connection_type, **receiver_options)
+    sender = ConnManager(connection_type, **kwargs)
+    receiver.subscribe('utim-benchmark', None, on_message)
+    time.sleep(0.5)
+
+    message = b'\x00' * _SIZE
+    start = time.perf_counter()
+    for _ in range(_MESSAGES):
+        sender.publish(b'uhost', 'utim-benchmark', message)
+    complete = done.wait(_TIMEOUT)
+    elapsed = time.perf_counter() - start
+
+    print("{0:<22} {1:8.0f} messages/s{2}".format(
+        title, received[0] / elapsed, '' if complete else ' (timed out, {0} received)'.format(
+            received[0])))
+
+    sender.disconnect()
+    receiver.disconnect()
+
+
+def main():
+    """
+    Main function
+    """
+
+    overhead()
+
+    try:
+        socket.create_connection((Config().messaging_hostname, 1883), timeout=1).close()
+    except OSError:
+        print("Broker is not reachable, throughput skipped")
+        return
+
+    throughput('mqtt (acks)', ConnManager.CONNECTION_TYPE_MQTT)
+    throughput('mqtt_qos, QoS 1', ConnManager.CONNECTION_TYPE_MQTT_QOS, qos=1)
+    throughput('mqtt_qos, QoS 2', ConnManager.CONNECTION_TYPE_MQTT_QOS, qos=2)
+
+
+if __name__ == '__main__':
+    main()
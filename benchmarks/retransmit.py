@@ -0,0 +1,86 @@
+"""
+Retransmission benchmark
+
+Publishes messages through ConnManagerMQTT without acknowledging them and reports thread count
+and memory per outstanding message, then acknowledges all of them and reports what is left.
+A stand-in connection replaces the broker.
+"""
+
+import threading
+import time
+import tracemalloc
+from utim.utilities.connmanagermqtt import ConnManagerMQTT
+from utim.utilities.delivery import Scheduler
+
+_SIZES = (1000, 10000, 30000)
+
+
+class StandInConnection(object):
+    """
+    Connection with UConnMQTT interface that remembers id of the first published message
+    """
+
+    def __init__(self):
+        self.first_id = None
+
+    def subscribe(self, topic, callback_object, callback):
+        pass
+
+    def publish(self, sender, destination, message):
+        if self.first_id is None:
+            self.first_id = int.from_bytes(message[1:3], 'big')
+
+    def disconnect(self):
+        pass
+
+
+def bench(size):
+    """
+    Benchmark size outstanding messages
+    """
+
+    scheduler = Scheduler()
+    connection = StandInConnection()
+    manager = ConnManagerMQTT(max_in_flight=32768, scheduler=scheduler, connection=connection)
+    message = b'\x00' * 32
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for _ in range(size):
+        manager.publish(b'utim', 'uhost', message)
+    publish = time.perf_counter() - start
+    pending = tracemalloc.get_traced_memory()[0] - base
+    threads = threading.active_count()
+
+    # Ids are consecutive
+    acks = [b'\x02' + ((connection.first_id + index) % 65536).to_bytes(2, 'big')
+            for index in range(size)]
+    start = time.perf_counter()
+    for ack in acks:
+        manager._on_message('utim', b'uhost', ack)
+    release = time.perf_counter() - start
+    del acks
+    left = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    print("{0:>6} outstanding: {1} threads, {2:4.0f} B/message, publish {3:5.2f} us, "
+          "ack {4:5.2f} us; after acks {5} B, {6} scheduled".format(
+              size, threads, pending / size, publish / size * 1e6, release / size * 1e6,
+              left, len(scheduler)))
+
+    manager.disconnect()
+    scheduler.stop()
+
+
+def main():
+    """
+    Main function
+    """
+
+    for size in _SIZES:
+        bench(size)
+
+
+if __name__ == '__main__':
+    main()
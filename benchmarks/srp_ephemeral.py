@@ -0,0 +1,72 @@
+"""
+SRP HELLO benchmark
+
+Runs NETWORK_READY through the startup worker of a gateway identity, as the ProcessItem thread
+does, and reports the time until HELLO is assembled: with the client ephemeral (a, A) computed on
+the spot and taken from the background ephemeral pool. Handshakes are restarted after a pause
+that lets the pool refill. Runs with every available big integer backend.
+"""
+
+import contextlib
+import io
+import time
+from utim.gateway import UtimIdentity
+from utim.utilities import bigint
+from utim.utilities import srp
+from utim.utilities.address import Address
+from utim.utilities.message import Message
+from utim.utilities.status import Status
+from utim.utilities.tag import Tag
+from utim.workers import device_worker_startup
+
+_HANDSHAKES = 200
+_PAUSE = 0.01
+
+
+def bench(title):
+    """
+    Start handshakes
+
+    :param str title: Case title
+    """
+
+    identity = UtimIdentity('00', b'key', None, None)
+    message = Message(None, None, None, None)
+    elapsed = []
+
+    for _ in range(_HANDSHAKES):
+        time.sleep(_PAUSE)
+        identity.set_srp_step(None)
+        message.update(Address.ADDRESS_DEVICE, Address.ADDRESS_UTIM, Status.STATUS_PROCESS,
+                       Tag.INBOUND.NETWORK_READY)
+        # Worker prints the start of the sequence
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            device_worker_startup.process(identity, message)
+            elapsed.append(time.perf_counter() - start)
+        assert message.destination == Address.ADDRESS_UHOST
+
+    elapsed.sort()
+    print("{0:<30} NETWORK_READY -> HELLO {1:7.1f} us (median {2:7.1f} us)".format(
+        title, sum(elapsed) / len(elapsed) * 1e6, elapsed[len(elapsed) // 2] * 1e6))
+
+
+def main():
+    """
+    Main function
+    """
+
+    group = srp.Group.get(srp.NG_1024)
+    pop = srp.EphemeralPool.pop
+    srp.EphemeralPool.get()
+
+    for name in bigint.available_backends():
+        bigint.set_backend(name)
+        srp.EphemeralPool.pop = lambda pool: srp.new_ephemeral(group)
+        bench(name + ', ephemeral on the spot')
+        srp.EphemeralPool.pop = pop
+        bench(name + ', ephemeral pool')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+SRP handshake benchmark
+
+For every available big integer backend, checks bit-exact SRP test vectors and fixed-base
+exponentiation against pow(), then reports the time of a 1024-bit modular exponentiation and
+complete handshakes (User, Verifier, challenge, session verification) per second with g^e mod N
+computed by powmod() of the backend and by the fixed-base table of the group. Finally prints
+the CPU profile of handshakes with the selected backend.
+"""
+
+import cProfile
+import hashlib
+import pstats
+import time
+from utim.utilities import bigint
+from utim.utilities import srp
+
+_HANDSHAKES = 200
+_MODEXPS = 500
+
+# Handshake of fixed ephemerals and salt, sha256 of long values
+_VECTOR_USERNAME = b'utim'
+_VECTOR_PASSWORD = b'master key'
+_VECTOR_SALT = b'\x01\x02\x03\x04'
+_VECTOR_A_SECRET = bytes(range(1, 33))
+_VECTOR_B_SECRET = bytes(range(101, 133))
+_VECTOR = {
+    'v': 'f94b3da72c47a2f57fb3abac80e52101c1f1f5a8c9093595fe91fe21d29fd2b3',
+    'A': '1299e62223accbc37ab63768b599a59ba9e0153ded4b859e8959baa72e0539a6',
+    'B': '55b993b8652d96bbe73b9e21f1123fe1c1f05d7594faee699ec820607cdc80f4',
+    'M': '9696c8c139602ca813e580b59622ff5ee0e6a3483604624cfa29d102e6c9de6d',
+    'H_AMK': '0c1d294fad05afd0504db236b80f5bbb4724e481f8ed636098b2ae2c9424a859',
+    'K': '6e83bd4ec857b9a9863d3ee52b8694d43276057ce1f4971771de2fad33d50a56',
+}
+
+
+def handshake(username, password, salt, verification_key, bytes_a=None, bytes_b=None):
+    """
+    Run SRP handshake
+
+    :return dict: Handshake values
+    """
+
+    user = srp.User(username, password, bytes_a=bytes_a)
+    _, bytes_A = user.start_authentication()
+    verifier = srp.Verifier(username, salt, verification_key, bytes_A, bytes_b=bytes_b)
+    salt, bytes_B = verifier.get_challenge()
+    M = user.process_challenge(salt, bytes_B)
+    H_AMK = verifier.verify_session(M)
+    user.verify_session(H_AMK)
+    assert user.authenticated() and verifier.authenticated()
+
+    return {'A': bytes_A, 'B': bytes_B, 'M': M, 'H_AMK': H_AMK, 'K': user.get_session_key()}
+
+
+def check_vectors():
+    """
+    Check test vectors and fixed-base table
+    """
+
+    N, g = srp.get_ng(srp.NG_1024, None, None)
+    x = srp.gen_x(hashlib.sha256, _VECTOR_SALT, _VECTOR_USERNAME, _VECTOR_PASSWORD)
+    v = srp.long_to_bytes(srp.Group.get(srp.NG_1024).pow_g(x))
+    values = handshake(_VECTOR_USERNAME, _VECTOR_PASSWORD, _VECTOR_SALT, v,
+                       _VECTOR_A_SECRET, _VECTOR_B_SECRET)
+    values['v'] = v
+
+    for name, expected in _VECTOR.items():
+        value = values[name]
+        digest = hashlib.sha256(value).hexdigest() if name in ('v', 'A', 'B') else value.hex()
+        assert digest == expected, name
+
+    group = srp.Group.get(srp.NG_1024)
+    for e in [0, 1, 2, 63, 64, 65, (1 << 256) - 1, 1 << 256, (1 << 300) + 12345] + \
+            [srp.get_random_of_length(32) for _ in range(100)]:
+        value = group.pow_g(e)
+        assert type(value) is int and value == pow(g, e, N), e
+
+    print("Test vectors and fixed-base table: OK")
+
+
+def bench_modexp():
+    """
+    Time modular exponentiation of 256-bit and 1024-bit exponents
+    """
+
+    N, g = srp.get_ng(srp.NG_1024, None, None)
+    powmod = bigint.get_backend().powmod
+    for bits in (256, 1024):
+        exponents = [srp.get_random_of_length(bits // 8) for _ in range(_MODEXPS)]
+        start = time.perf_counter()
+        for e in exponents:
+            powmod(g + 1, e, N)
+        elapsed = time.perf_counter() - start
+        print("powmod(), {0:4}-bit exponent: {1:7.1f} us".format(bits, elapsed / _MODEXPS * 1e6))
+
+
+def bench(title):
+    """
+    Run handshakes
+    """
+
+    salt, verification_key = srp.create_salted_verification_key(_VECTOR_USERNAME,
+                                                                _VECTOR_PASSWORD)
+    start = time.perf_counter()
+    for _ in range(_HANDSHAKES):
+        handshake(_VECTOR_USERNAME, _VECTOR_PASSWORD, salt, verification_key)
+    elapsed = time.perf_counter() - start
+
+    print("{0:<26} {1:6.1f} handshakes/s, {2:6.2f} ms per handshake".format(
+        title, _HANDSHAKES / elapsed, elapsed / _HANDSHAKES * 1e3))
+
+
+def profile():
+    """
+    Print functions taking most time in handshakes
+    """
+
+    salt, verification_key = srp.create_salted_verification_key(_VECTOR_USERNAME,
+                                                                _VECTOR_PASSWORD)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(_HANDSHAKES):
+        handshake(_VECTOR_USERNAME, _VECTOR_PASSWORD, salt, verification_key)
+    profiler.disable()
+    pstats.Stats(profiler).sort_stats('tottime').print_stats(8)
+
+
+def main():
+    """
+    Main function
+    """
+
+    pow_g = srp.Group.pow_g
+    for name in bigint.available_backends():
+        bigint.set_backend(name)
+        print("Backend {0}".format(name))
+        check_vectors()
+        bench_modexp()
+
+        start = time.perf_counter()
+        srp.FixedBaseTable(*srp.get_ng(srp.NG_1024, None, None))
+        print("Fixed-base table built in {0:.1f} ms".format((time.perf_counter() - start) * 1e3))
+
+        srp.Group.pow_g = lambda group, e: bigint.get_backend().powmod(group.g, e, group.N)
+        bench(name + ', powmod()')
+        srp.Group.pow_g = pow_g
+        bench(name + ', fixed-base table')
+
+    profile()
+
+
+if __name__ == '__main__':
+    main()
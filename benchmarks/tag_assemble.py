@@ -0,0 +1,64 @@
+"""
+Tag assemble microbenchmark
+
+Compares Tag.UCOMMAND / Tag.OUTBOUND assemble methods with the plain
+tag + length + data concatenation they used to do.
+"""
+
+import os
+import timeit
+from utim.utilities.tag import Tag
+
+_NUMBER = 200000
+
+
+def legacy_assemble(tag, data):
+    return tag + len(data).to_bytes(2, byteorder='big') + data
+
+
+def legacy_assemble_pair(tag1, data1, tag2, data2):
+    length1 = len(data1).to_bytes(2, byteorder='big')
+    length2 = len(data2).to_bytes(2, byteorder='big')
+    return tag1 + length1 + data1 + tag2 + length2 + data2
+
+
+def report(name, legacy, current):
+    """
+    Check both functions build the same frame and print their timings
+    """
+
+    assert legacy() == current(), name
+    legacy_time = min(timeit.repeat(legacy, number=_NUMBER, repeat=5)) / _NUMBER * 1e9
+    current_time = min(timeit.repeat(current, number=_NUMBER, repeat=5)) / _NUMBER * 1e9
+    print("{0:<20} legacy {1:7.1f} ns   current {2:7.1f} ns   x{3:.2f}".format(
+        name, legacy_time, current_time, legacy_time / current_time))
+
+
+def main():
+    """
+    Main function
+    """
+
+    a = os.urandom(128)
+    salt = os.urandom(4)
+    b = os.urandom(128)
+    m = os.urandom(32)
+
+    report('hello', lambda: legacy_assemble(Tag.UCOMMAND.HELLO, a),
+           lambda: Tag.UCOMMAND.assemble_hello(a))
+    report('check', lambda: legacy_assemble(Tag.UCOMMAND.CHECK, m),
+           lambda: Tag.UCOMMAND.assemble_check(m))
+    report('try', lambda: legacy_assemble_pair(Tag.UCOMMAND.TRY_FIRST, salt, Tag.UCOMMAND.TRY_SECOND, b),
+           lambda: Tag.UCOMMAND.assemble_try(salt, b))
+    report('signed', lambda: legacy_assemble_pair(Tag.UCOMMAND.SIGNED, a, Tag.UCOMMAND.SIGNATURE, m),
+           lambda: Tag.UCOMMAND.assemble_signed(a, m))
+    report('ok_status', lambda: legacy_assemble(Tag.OUTBOUND.OK_STATUS, b''),
+           Tag.OUTBOUND.assemble_ok_status)
+    report('verified', lambda: legacy_assemble(Tag.UCOMMAND.VERIFIED, b''),
+           Tag.UCOMMAND.assemble_verified)
+    report('authentic', lambda: legacy_assemble(Tag.UCOMMAND.AUTHENTIC, b''),
+           Tag.UCOMMAND.assemble_authentic)
+
+
+if __name__ == '__main__':
+    main()
@@ -49,7 +49,7 @@ def main():
         cm1.send(data1)
 
         while True:
-            data = cm1.receive()
+            data = cm1.receive(1)
             if data:
                 print("RECEIVED DATA: {0}".format(data))
                 session_key = data[1]
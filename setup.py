@@ -25,6 +25,9 @@ setuptools.setup(
         'paho-mqtt',
         'pika',
         'six',
-        'pycrypto',
+        'pycryptodome',
     ],
+    extras_require={
+        'gmpy2': ['gmpy2'],
+    },
 )
@@ -0,0 +1,456 @@
+"""
+Asyncio connectivity manager
+
+Every layer of a stack (Network, Transport, Top) is a coroutine stage joined to its neighbours
+by asyncio queues. All stacks share one reactor thread, so a process can run many stacks
+without a thread pair per layer.
+
+Blocking edges stay off the reactor, and they are not free of threads:
+    - DataLink input is thread-per-stack: every stack has a reader thread blocked on its DataLink
+    queue, which hands data to the loop. A queue.Queue cannot be waited on together with others,
+    so one shared reader could only serve many stacks by polling them.
+    - Uhost publishes run in the default executor of the loop, a thread pool shared by all
+    stacks, so every publish takes a hop to a pool thread.
+N stacks therefore run on the reactor thread, N reader threads and the executor pool.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+from .datalink import manager as dl_manager, exceptions as dl_exceptions
+from .datalink.queue import DataLinkQueue
+from . import framing
+from .network.manager import NetworkDataType
+from .transport.manager import TransportDataType
+from .top.manager import TopDataType, TopManagerConnectionStatus, TopManagerDataTypeException
+from .manager import ConnectivityWrongArgsException, ConnectivityConnectError
+from ..utilities import connmanager, config, exceptions
+from ..utilities.timeout import Timeout
+
+
+class Reactor(object):
+    """
+    Event loop running in its own thread
+    """
+
+    __default = None
+    __default_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Initialization
+        """
+
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(
+            target=self.__run,
+            name='THREAD_CONNECTIVITY_REACTOR'
+        )
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    @classmethod
+    def default(cls):
+        """
+        Get reactor shared by all stacks of the process
+
+        :return Reactor:
+        """
+
+        with cls.__default_lock:
+            if cls.__default is None:
+                cls.__default = Reactor()
+            return cls.__default
+
+    @property
+    def loop(self):
+        return self.__loop
+
+    def __run(self):
+        """
+        Run event loop forever
+        """
+
+        asyncio.set_event_loop(self.__loop)
+        self.__loop.run_forever()
+        logging.info("Stopping reactor..")
+
+    def run_coroutine(self, coroutine):
+        """
+        Schedule coroutine on the reactor
+
+        :param coroutine: Coroutine object
+        :return concurrent.futures.Future:
+        """
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.__loop)
+
+    def call_soon(self, callback, *args):
+        """
+        Schedule callback on the reactor from any thread
+
+        :param callback: Callback
+        """
+
+        self.__loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self):
+        """
+        Stop
+        """
+
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+
+
+class AsyncConnectivityManager(object):
+    """
+    Connectivity manager running all layers as coroutines on a reactor, with a DataLink reader
+    thread of its own
+    """
+
+    def __init__(self, reactor=None):
+        """
+        Initialization
+
+        :param Reactor reactor: Reactor to run on (shared default reactor if None)
+        """
+
+        self.__reactor = reactor if reactor is not None else Reactor.default()
+
+        self.__datalink = None
+        self.__datalink_thread = None
+        self.__run_event = threading.Event()
+        self.__tasks = []
+
+        # Stage queues, created on the reactor
+        self.__network_in = None
+        self.__transport_in = None
+        self.__top_in = None
+        self.__top_out = None
+        self.__uhost_out = None
+        self.__transport_out = None
+        self.__network_out = None
+
+        # Queue read by receive()
+        self.__inbound_queue = queue.Queue()
+
+        # Uhost connection
+        self.__uhost_client = None
+        self.__uhost_name = None
+        self.__utim_name = None
+        self.__uhost_status = TopManagerConnectionStatus.NOT_INITIALIZED
+
+    def connect(self, **kwargs):
+        """
+
+        :param dl_type: DataLink manager connection type
+        :param tx: Queue to transmit data
+        :param rx: Queue to receive data
+        :return:
+        """
+
+        if 'dl_type' not in kwargs.keys():
+            raise ConnectivityWrongArgsException()
+        if kwargs['dl_type'] != dl_manager.DataLinkManager.TYPE_QUEUE:
+            raise ConnectivityWrongArgsException()
+
+        try:
+            self.__datalink = DataLinkQueue()
+            self.__datalink.connect(**kwargs)
+
+        except dl_exceptions.DataLinkRealisationException as ex:
+            logging.error("Cannot create DataLink: %s", ex)
+            raise ConnectivityConnectError()
+
+        self.__reactor.run_coroutine(self.__start()).result()
+
+        self.__run_event.set()
+        self.__datalink_thread = threading.Thread(
+            target=self.__datalink_inbound,
+            name='THREAD_ASYNC_DATALINK_INBOUND'
+        )
+        self.__datalink_thread.daemon = True
+        self.__datalink_thread.start()
+
+    async def __start(self):
+        """
+        Create stage queues and start stages
+        """
+
+        self.__network_in = asyncio.Queue()
+        self.__transport_in = asyncio.Queue()
+        self.__top_in = asyncio.Queue()
+        self.__top_out = asyncio.Queue()
+        self.__uhost_out = asyncio.Queue()
+        self.__transport_out = asyncio.Queue()
+        self.__network_out = asyncio.Queue()
+
+        stages = [
+            self.__network_inbound,
+            self.__transport_inbound,
+            self.__top_inbound,
+            self.__top_outbound,
+            self.__uhost_outbound,
+            self.__transport_outbound,
+            self.__network_outbound
+        ]
+        self.__tasks = [asyncio.ensure_future(stage()) for stage in stages]
+
+    def __datalink_inbound(self):
+        """
+        Move data from the DataLink queue to the network stage, runs in its own thread
+
+        Blocks on the queue, so data reaches the loop as soon as it is queued and a quiet
+        stack does not wake the reactor.
+        """
+
+        while self.__run_event.is_set():
+            data = self.__datalink.receive(Timeout.QUEUE_WAIT)
+            if data is not None:
+                self.__reactor.call_soon(self.__network_in.put_nowait, data)
+
+    async def __network_inbound(self):
+        """
+        Network stage: strip network header and route data by its type
+        """
+
+        while True:
+            data = await self.__network_in.get()
+            parsed = self.__parse(data)
+            if parsed is None:
+                continue
+
+            tag, body = parsed
+            if tag == NetworkDataType.DEVICE:
+                await self.__transport_in.put(body)
+            else:
+                logging.debug("Unhandled network data type - %d: %s", tag, str(body))
+
+    async def __transport_inbound(self):
+        """
+        Transport stage: strip transport header
+        """
+
+        while True:
+            data = await self.__transport_in.get()
+            parsed = self.__parse(data)
+            if parsed is None:
+                continue
+
+            tag, body = parsed
+            if not TransportDataType.validate(tag):
+                logging.debug("Unknown data type - %d: %s", tag, str(body))
+            elif body:
+                await self.__top_in.put([TopDataType.DEVICE, body])
+
+    async def __top_inbound(self):
+        """
+        Top stage: hand data over to receive()
+        """
+
+        while True:
+            data = await self.__top_in.get()
+            self.__inbound_queue.put_nowait(data)
+
+    async def __top_outbound(self):
+        """
+        Top stage: route outbound data to device or uhost
+        """
+
+        while True:
+            data_type, data = await self.__top_out.get()
+            if data_type == TopDataType.DEVICE:
+                await self.__transport_out.put([TransportDataType.DEVICE, data])
+
+            elif (data_type == TopDataType.UHOST and
+                  self.__uhost_status == TopManagerConnectionStatus.SUCCESS):
+                await self.__uhost_out.put(data)
+
+            else:
+                logging.debug("AsyncConnectivityManager has no active status connections !")
+
+    async def __uhost_outbound(self):
+        """
+        Uhost stage: publish to uhost in order, a slow broker does not hold device data
+        """
+
+        loop = asyncio.get_event_loop()
+        while True:
+            data = await self.__uhost_out.get()
+            try:
+                # Broker clients block, keep them off the reactor
+                await loop.run_in_executor(
+                    None,
+                    self.__uhost_client.publish,
+                    self.__utim_name.encode(),
+                    self.__uhost_name,
+                    data
+                )
+            except exceptions.UtimException as ex:
+                logging.error("Uhost publish error: %s", ex)
+
+    async def __transport_outbound(self):
+        """
+        Transport stage: add transport header
+        """
+
+        while True:
+            destination, body = await self.__transport_out.get()
+            packet = framing.assemble(destination, body)
+            await self.__network_out.put([NetworkDataType.DEVICE, packet])
+
+    async def __network_outbound(self):
+        """
+        Network stage: add network header and pass data to DataLink
+        """
+
+        while True:
+            destination, body = await self.__network_out.get()
+            packet = framing.assemble(destination, body)
+            while not self.__datalink.send(packet):
+                await asyncio.sleep(Timeout.QUEUE_WAIT)
+
+    @staticmethod
+    def __parse(data):
+        """
+        Split data into header tag and body
+
+        :param bytes data: Data to parse
+        :return tuple|None: (tag, body)
+        """
+
+        if not isinstance(data, bytes):
+            logging.error("Invalid data type: %s", str(data))
+            return None
+
+        parsed = framing.parse(data)
+        if parsed is None:
+            logging.debug("Invalid data length - %d: %s", len(data), str(data))
+
+        return parsed
+
+    def __on_uhost_message(self, conn, sender, message):
+        """
+        Uhost message callback, called from broker client thread
+
+        :param sender: Message sender
+        :param message: The message
+        """
+
+        logging.info("Received message {0} from {1}".format(message, sender))
+        self.__reactor.call_soon(self.__top_in.put_nowait, [TopDataType.UHOST, message])
+
+    def send(self, data):
+        """
+        Send method
+
+        :param data: Data to send [TopDataType, bytes]
+        :return bool: True if data is queued, False - otherwise (no connection to destination)
+        :raises: TopManagerDataTypeException
+        """
+
+        if not TopDataType.validate(data[0]):
+            raise TopManagerDataTypeException()
+        if not isinstance(data[1], bytes):
+            return False
+        if data[0] == TopDataType.PLATFORM or (
+                data[0] == TopDataType.UHOST and
+                self.__uhost_status != TopManagerConnectionStatus.SUCCESS):
+            logging.debug("AsyncConnectivityManager has no connection for %s", data[0])
+            return False
+
+        self.__reactor.call_soon(self.__top_out.put_nowait, data)
+        return True
+
+    def receive(self, timeout=0):
+        """
+        Receive method
+
+        :param float timeout: Seconds to wait for data (0 - do not wait)
+        :return:
+        """
+
+        try:
+            if timeout:
+                return self.__inbound_queue.get(timeout=timeout)
+            return self.__inbound_queue.get_nowait()
+
+        except queue.Empty:
+            pass
+
+        return None
+
+    def run_uhost_connection(self, config_dict):
+        """
+        Run Uhost connection
+
+        :param dict config_dict: Config, 'shared' is optional
+        :return:
+        """
+
+        try:
+            self.__utim_name = config_dict['utim_name']
+            protocol = config_dict['protocol']
+
+            self.__uhost_name = bytes.fromhex(config.Config().uhost_name).decode()
+            if config_dict.get('shared', False):
+                self.__uhost_client = connmanager.SharedConnManager(protocol)
+            else:
+                self.__uhost_client = connmanager.ConnManager(protocol)
+            self.__uhost_client.subscribe(self.__utim_name, self, self.__on_uhost_message)
+            logging.debug("Subscribed to topic: %s", self.__utim_name)
+
+            self.__uhost_status = TopManagerConnectionStatus.SUCCESS
+
+        except KeyError:
+            logging.error('Invalid config file: %s', config_dict)
+            self.__uhost_status = TopManagerConnectionStatus.INVALID_CONFIG
+
+        except exceptions.UtimConnectionException:
+            logging.error('Utim connection exception')
+            self.__uhost_status = TopManagerConnectionStatus.UHOST_CONNECTION_ERROR
+
+        except exceptions.UtimUnknownException:
+            logging.error('Utim unknown exception')
+            self.__uhost_status = TopManagerConnectionStatus.UHOST_ERROR
+
+        return self.__uhost_status
+
+    def run_platform_connection(self, config_dict):
+        """
+        Run platform connection
+
+        :param dict config_dict: Config
+        :return:
+        """
+
+        return TopManagerConnectionStatus.NOT_INITIALIZED
+
+    def stop(self):
+        """
+        Stop
+        """
+
+        if self.__uhost_client:
+            self.__uhost_client.disconnect()
+            self.__uhost_status = TopManagerConnectionStatus.NOT_INITIALIZED
+
+        self.__run_event.clear()
+        if self.__datalink_thread:
+            self.__datalink_thread.join()
+            self.__datalink_thread = None
+
+        if self.__tasks:
+            self.__reactor.run_coroutine(self.__cancel()).result()
+
+    async def __cancel(self):
+        """
+        Cancel stage tasks
+        """
+
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        self.__tasks = []
@@ -8,6 +8,7 @@ import threading
 from .queue import DataLinkQueue
 from .uart import DataLinkUART
 from .exceptions import *
+from ...utilities.timeout import Timeout
 
 
 class DataLinkManager(object):
@@ -87,7 +88,7 @@ class DataLinkManager(object):
         """
 
         while self.__run_event.is_set():
-            data = self.__datalink.receive()
+            data = self.__datalink.receive(Timeout.QUEUE_WAIT)
             if data is not None:
                 while not self.__put_data(data):
                     pass
@@ -116,7 +117,7 @@ class DataLinkManager(object):
 
         while self.__run_event.is_set():
             try:
-                data = self.__outbound_queue.get_nowait()
+                data = self.__outbound_queue.get(timeout=Timeout.QUEUE_WAIT)
                 while not self.__datalink.send(data):
                     pass
 
@@ -128,12 +129,16 @@ class DataLinkManager(object):
 
         logging.info("Stopping outbound processing..")
 
-    def receive(self):
+    def receive(self, timeout=0):
         """
         Get first message from queue
+
+        :param float timeout: Seconds to wait for a message (0 - do not wait)
         """
 
         try:
+            if timeout:
+                return self.__inbound_queue.get(timeout=timeout)
             return self.__inbound_queue.get_nowait()
 
         except queue.Empty:
@@ -30,14 +30,18 @@ class DataLinkQueue(object):
         self.__tx = kwargs['tx']
         self.__rx = kwargs['rx']
 
-    def receive(self):
+    def receive(self, timeout=0):
         """
         Get first message from queue
+
+        :param float timeout: Seconds to wait for a message (0 - do not wait)
         """
         if self.__rx is None:
             raise DataLinkRealisationConnectionException()
 
         try:
+            if timeout:
+                return self.__rx.get(timeout=timeout)
             return self.__rx.get_nowait()
 
         except queue.Empty:
@@ -0,0 +1,124 @@
+"""
+Network and Transport layer framing
+
+Both layers prefix their payload with a header: 1 byte tag and 2 bytes big-endian length
+"""
+
+import struct
+
+HEADER = struct.Struct('>BH')
+HEADER_LENGTH = HEADER.size
+
+# Network header immediately followed by Transport header
+_NESTED_HEADER = struct.Struct('>BHBH')
+
+
+def parse(data):
+    """
+    Split frame into tag and body
+
+    :param bytes data: Frame
+    :return tuple|None: (tag, body), None if data is shorter than header
+    """
+
+    if len(data) < HEADER_LENGTH:
+        return None
+
+    tag, length = HEADER.unpack_from(data)
+    return tag, data[HEADER_LENGTH:HEADER_LENGTH + length]
+
+
+def assemble(tag, body):
+    """
+    Build frame
+
+    :param int tag: Tag
+    :param bytes body: Body
+    :return bytes: Frame
+    """
+
+    return HEADER.pack(tag, len(body)) + body
+
+
+def parse_nested(data):
+    """
+    Split Network frame holding a Transport frame in one pass
+
+    Result is the same as parsing the Network frame and then parsing its body as Transport
+    frame, but only the innermost body is copied.
+
+    :param bytes data: Network frame
+    :return tuple|None: (network tag, transport tag, body), None if any header is incomplete
+    """
+
+    data_length = len(data)
+    if data_length < HEADER_LENGTH:
+        return None
+
+    outer_tag, outer_length = HEADER.unpack_from(data)
+    outer_end = min(data_length, HEADER_LENGTH + outer_length)
+    if outer_end < 2 * HEADER_LENGTH:
+        return None
+
+    inner_tag, inner_length = HEADER.unpack_from(data, HEADER_LENGTH)
+    inner_end = min(outer_end, 2 * HEADER_LENGTH + inner_length)
+    return outer_tag, inner_tag, data[2 * HEADER_LENGTH:inner_end]
+
+
+def assemble_nested(outer_tag, inner_tag, body):
+    """
+    Build Network frame holding a Transport frame in one pass
+
+    :param int outer_tag: Network tag
+    :param int inner_tag: Transport tag
+    :param bytes body: Body
+    :return bytes: Network frame
+    """
+
+    length = len(body)
+    return _NESTED_HEADER.pack(outer_tag, length + HEADER_LENGTH, inner_tag, length) + body
+
+
+class Frame(object):
+    """
+    Outbound frame under construction
+
+    Each layer prepends its header with wrap(); headers and body are joined into one
+    buffer by to_bytes(), so the body is copied once whatever the number of layers.
+    """
+
+    __slots__ = ('_parts', '_length')
+
+    def __init__(self, body):
+        """
+        Initialization
+
+        :param bytes body: Body
+        """
+
+        self._parts = [body]
+        self._length = len(body)
+
+    def __len__(self):
+        return self._length
+
+    def wrap(self, tag):
+        """
+        Prepend header
+
+        :param int tag: Tag
+        :return Frame: self
+        """
+
+        self._parts.append(HEADER.pack(tag, self._length))
+        self._length += HEADER_LENGTH
+        return self
+
+    def to_bytes(self):
+        """
+        Join headers and body
+
+        :return bytes: Frame
+        """
+
+        return b''.join(reversed(self._parts))
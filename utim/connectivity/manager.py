@@ -50,9 +50,12 @@ class ConnectivityManager(object):
         :param dl_type: DataLink manager connection type
         :param tx: Queue to transmit data
         :param rx: Queue to receive data
+        :param fused: Parse Network and Transport headers in one pass (optional, False by default)
         :return:
         """
 
+        fused = kwargs.pop('fused', False)
+
         try:
             # Init DataLinkManager
             if 'dl_type' not in kwargs.keys():
@@ -66,14 +69,19 @@ class ConnectivityManager(object):
             )
             self.__datalink_manager.connect(**kwargs)
 
-            # Init NetworkManager
-            self.__network_manager = net_manager.NetworkManager(self.__datalink_manager)
+            if fused:
+                # Init TopManager with device connection on DataLinkManager
+                self.__top_manager = top_manager.TopManager(self.__datalink_manager, fused=True)
+
+            else:
+                # Init NetworkManager
+                self.__network_manager = net_manager.NetworkManager(self.__datalink_manager)
 
-            # Init TransportManager
-            self.__transport_manager = tr_manager.TransportManager(self.__network_manager)
+                # Init TransportManager
+                self.__transport_manager = tr_manager.TransportManager(self.__network_manager)
 
-            # Init TopManager
-            self.__top_manager = top_manager.TopManager(self.__transport_manager)
+                # Init TopManager
+                self.__top_manager = top_manager.TopManager(self.__transport_manager)
 
         except (dl_exceptions.DataLinkRealisationWrongArgsException,
                 dl_exceptions.DataLinkRealisationException) as ex:
@@ -102,14 +110,15 @@ class ConnectivityManager(object):
 
         return self.__top_manager.send(data)
 
-    def receive(self):
+    def receive(self, timeout=0):
         """
         Receive method
 
+        :param float timeout: Seconds to wait for data (0 - do not wait)
         :return:
         """
 
-        return self.__top_manager.receive()
+        return self.__top_manager.receive(timeout)
 
     def run_uhost_connection(self, config):
         """
@@ -1,6 +1,8 @@
 import logging
 import queue
 import threading
+from .. import framing
+from ...utilities.timeout import Timeout
 
 
 class NetworkManagerException(Exception):
@@ -138,7 +140,7 @@ class NetworkManager(object):
         """
 
         while self.__run_event.is_set():
-            data = self.__manager.receive()
+            data = self.__manager.receive(Timeout.QUEUE_WAIT)
             self.__inbound_processing(data)
 
         logging.info("Stopping inbound processing..")
@@ -155,12 +157,9 @@ class NetworkManager(object):
             if isinstance(data, bytes):
                 # Data must be 3 bytes at a minimum
                 data_length = len(data)
-                if data_length >= 3:
-                    tag_bytes = data[0:1]
-                    tag = int.from_bytes(tag_bytes, byteorder='big', signed=False)
-                    length_bytes = data[1:3]
-                    length = int.from_bytes(length_bytes, byteorder='big', signed=False)
-                    data = data[3:3+length]
+                if data_length >= framing.HEADER_LENGTH:
+                    # Pass body as a view, upper layer copies it once
+                    tag, data = framing.parse(memoryview(data))
 
                     if tag == NetworkDataType.DEVICE:
                         while not self.__put_data(self.__device_queue, data):
@@ -219,36 +218,40 @@ class NetworkManager(object):
         """
 
         try:
-            data = self.__outbound_queue.get_nowait()
-            length = len(data[1]).to_bytes(2, byteorder='big')
-            destination = data[0].to_bytes(1, byteorder='big')
-            packet = destination + length + data[1]
-            return packet
+            destination, body = self.__outbound_queue.get(timeout=Timeout.QUEUE_WAIT)
+            if not isinstance(body, framing.Frame):
+                body = framing.Frame(body)
+            return body.wrap(destination).to_bytes()
 
         except queue.Empty:
             pass
 
         return None
 
-    def receive(self, data_type):
+    def receive(self, data_type, timeout=0):
         """
         Receive method
 
         :param NetworkDataType data_type: Network data type
-        :return bytes|None: Data
+        :param float timeout: Seconds to wait for data (0 - do not wait)
+        :return memoryview|None: Data
         :raises: NetworkManagerDataTypeException
         """
 
         if NetworkDataType.validate(data_type):
-            try:
-                if data_type is NetworkDataType.DEVICE:
-                    return self.__device_queue.get_nowait()
+            if data_type is NetworkDataType.DEVICE:
+                type_queue = self.__device_queue
+
+            elif data_type is NetworkDataType.UHOST:
+                type_queue = self.__uhost_queue
 
-                elif data_type is NetworkDataType.UHOST:
-                    return self.__uhost_queue.get_nowait()
+            else:
+                type_queue = self.__platform_queue
 
-                elif data_type is NetworkDataType.PLATFORM:
-                    return self.__platform_queue.get_nowait()
+            try:
+                if timeout:
+                    return type_queue.get(timeout=timeout)
+                return type_queue.get_nowait()
             except queue.Empty:
                 pass
 
@@ -262,13 +265,13 @@ class NetworkManager(object):
         Send method
 
         :param NetworkDataType destination: Network data type
-        :param bytes data: data
+        :param bytes|Frame data: data
         :return bool: True if data is sent, False - otherwise
         :raises: NetworkManagerDataTypeException
         """
 
         if NetworkDataType.validate(destination):
-            if isinstance(data, bytes):
+            if isinstance(data, (bytes, framing.Frame)):
                 try:
                     self.__outbound_queue.put_nowait([destination, data])
                     return True
@@ -0,0 +1,142 @@
+"""
+Fused device module
+
+Device connection working straight on top of DataLink manager. Network and Transport
+headers are parsed and built in one pass, so a message crosses one queue between
+DataLink and Top managers.
+"""
+
+import threading
+import logging
+import queue
+from .utim_device import UtimDeviceExceptionInvalidMethods, UtimDeviceInvalidDataException
+from ... import framing
+from ...network.manager import NetworkDataType
+from ...transport.manager import TransportDataType
+from ....utilities.timeout import Timeout
+
+
+class FusedDevice(object):
+    """
+    Fused device class
+    """
+
+    def __init__(self, datalink_receive, datalink_send, data_event=None):
+        """
+        Initialize device
+
+        :param datalink_receive: Receive method
+        :param datalink_send: Send method
+        :param threading.Event data_event: Event to set when inbound data is queued
+        """
+
+        if not callable(datalink_receive) or not callable(datalink_send):
+            raise UtimDeviceExceptionInvalidMethods()
+
+        self.__dl_receive = datalink_receive
+        self.__dl_send = datalink_send
+        self.__data_event = data_event
+
+        # Queues
+        self.__inbound_queue = queue.Queue()
+
+        # Threads
+        self.__inbound_thread = None
+
+        # Run event
+        self.__run_event = threading.Event()
+
+    def run(self):
+        """
+        Run data processing
+        """
+
+        self.__run_event.set()
+
+        logging.info("Try to run inbound process in another thread")
+        self.__inbound_thread = threading.Thread(
+            target=self.__inbound_process,
+            name='THREAD_FUSED_DEVICE_INBOUND_PROCESS'
+        )
+        self.__inbound_thread.daemon = True
+        self.__inbound_thread.start()
+
+    def __inbound_process(self):
+        """
+        Inbound process
+        """
+
+        while self.__run_event.is_set():
+            data = self.__dl_receive(Timeout.QUEUE_WAIT)
+            if data is not None:
+                self.__inbound_processing(data)
+
+        logging.info("Stopping inbound processing..")
+
+    def __inbound_processing(self, data):
+        """
+        Process received inbound data
+
+        :param bytes data: Data to process
+        """
+
+        if not isinstance(data, bytes):
+            logging.error("Invalid data type: %s", str(data))
+            return
+
+        parsed = framing.parse_nested(data)
+        if parsed is None:
+            logging.debug("Invalid data length - %d: %s", len(data), str(data))
+            return
+
+        network_tag, transport_tag, body = parsed
+        if network_tag != NetworkDataType.DEVICE:
+            logging.debug("Unhandled network data type - %d: %s", network_tag, str(body))
+        elif not TransportDataType.validate(transport_tag):
+            logging.debug("Unknown data type - %d: %s", transport_tag, str(body))
+        elif body:
+            self.__inbound_queue.put(body)
+            if self.__data_event:
+                self.__data_event.set()
+
+    def stop(self):
+        """
+        Stop running
+        """
+
+        if self.__run_event:
+            self.__run_event.clear()
+
+        if self.__inbound_thread:
+            self.__inbound_thread.join()
+
+    def receive(self):
+        """
+        Receive method
+
+        :return bytes|None: Data
+        """
+
+        try:
+            return self.__inbound_queue.get_nowait()
+
+        except queue.Empty:
+            pass
+
+        return None
+
+    def send(self, data):
+        """
+        Send method
+
+        :param bytes data: data
+        :return bool: True if data is sent, False - otherwise
+        :raises: UtimDeviceInvalidDataException
+        """
+
+        if isinstance(data, bytes):
+            packet = framing.assemble_nested(NetworkDataType.DEVICE, TransportDataType.DEVICE, data)
+            return self.__dl_send(packet)
+
+        else:
+            raise UtimDeviceInvalidDataException()
@@ -5,6 +5,7 @@ Utim device module
 import threading
 import logging
 import queue
+from ....utilities.timeout import Timeout
 
 
 class UtimDeviceException(Exception):
@@ -36,12 +37,13 @@ class UtimDevice(object):
     Utim device class
     """
 
-    def __init__(self, transport_receive, transport_send):
+    def __init__(self, transport_receive, transport_send, data_event=None):
         """
         Initialize device
 
         :param transport_receive: Receive method
         :param transport_send: Send method
+        :param threading.Event data_event: Event to set when inbound data is queued
         """
 
         if not callable(transport_receive) or not callable(transport_send):
@@ -49,6 +51,7 @@ class UtimDevice(object):
 
         self.__t_receive = transport_receive
         self.__t_send = transport_send
+        self.__data_event = data_event
 
         self.__running = True
 
@@ -105,10 +108,12 @@ class UtimDevice(object):
         """
 
         while self.__run_event.is_set():
-            data = self.__t_receive()
+            data = self.__t_receive(Timeout.QUEUE_WAIT)
             if data:
                 while not self.__put_data(data):
                     pass
+                if self.__data_event:
+                    self.__data_event.set()
 
         logging.info("Stopping inbound processing..")
 
@@ -134,7 +139,7 @@ class UtimDevice(object):
 
         while self.__run_event.is_set():
             try:
-                data = self.__outbound_queue.get_nowait()
+                data = self.__outbound_queue.get(timeout=Timeout.QUEUE_WAIT)
                 if data:
                     self.__t_send(data)
 
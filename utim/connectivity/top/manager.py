@@ -3,7 +3,9 @@ import queue
 import threading
 from .uhost import utim_connection
 from ...utilities import exceptions
+from ...utilities.timeout import Timeout
 from .device import utim_device
+from .device import fused_device
 from .device.utim_device import UtimDeviceInvalidDataException
 from .uhost.utim_connection import UtimConnectionInvalidDataException
 
@@ -93,11 +95,12 @@ class TopManager(object):
     Top manager class
     """
 
-    def __init__(self, manager):
+    def __init__(self, manager, fused=False):
         """
         Initialization
 
-        :param TransportManager manager: Transport manager instance
+        :param TransportManager manager: Transport manager instance (DataLink manager if fused)
+        :param bool fused: Run device connection directly on DataLink manager
         """
 
         logging.info("NetworkManager is starting..")
@@ -113,6 +116,7 @@ class TopManager(object):
                 raise TopManagerMethodException
 
         self.__manager = manager  # TransportManager instance
+        self.__fused = fused
 
         # Connections
         self.__device_connection = None
@@ -124,6 +128,9 @@ class TopManager(object):
         self.__uhost_status = TopManagerConnectionStatus.NOT_INITIALIZED
         self.__platform_status = TopManagerConnectionStatus.NOT_INITIALIZED
 
+        # Set by connections when they have inbound data
+        self.__data_event = threading.Event()
+
         # Run connections
         self.__run_device_connection()
 
@@ -175,29 +182,38 @@ class TopManager(object):
         """
 
         while self.__run_event.is_set():
+            # Park until any connection has data
+            self.__data_event.wait(Timeout.QUEUE_WAIT)
+            self.__data_event.clear()
+
             if (self.__device_connection and
                     self.__device_status == TopManagerConnectionStatus.SUCCESS):
-                data_device = self.__device_connection.receive()
-                if data_device is not None:
-                    while not self.__put_data([TopDataType.DEVICE, data_device]):
-                        pass
+                self.__drain(self.__device_connection, TopDataType.DEVICE)
 
             if (self.__uhost_connection and
                     self.__uhost_status == TopManagerConnectionStatus.SUCCESS):
-                data_uhost = self.__uhost_connection.receive()
-                if data_uhost is not None:
-                    while not self.__put_data([TopDataType.UHOST, data_uhost]):
-                        pass
+                self.__drain(self.__uhost_connection, TopDataType.UHOST)
 
             if (self.__platform_connection and
                     self.__platform_status == TopManagerConnectionStatus.SUCCESS):
-                data_platform = self.__platform_connection.receive()
-                if data_platform is not None:
-                    while not self.__put_data([TopDataType.PLATFORM, data_platform]):
-                        pass
+                self.__drain(self.__platform_connection, TopDataType.PLATFORM)
 
         logging.info("Stopping inbound processing..")
 
+    def __drain(self, connection, data_type):
+        """
+        Move all received data of connection to inbound queue
+
+        :param connection: Connection to receive data from
+        :param TopDataType data_type: Top data type of connection
+        """
+
+        data = connection.receive()
+        while data is not None:
+            while not self.__put_data([data_type, data]):
+                pass
+            data = connection.receive()
+
     def __put_data(self, data):
         """
         Put data
@@ -231,7 +247,7 @@ class TopManager(object):
         """
 
         try:
-            data = self.__outbound_queue.get_nowait()
+            data = self.__outbound_queue.get(timeout=Timeout.QUEUE_WAIT)
             data_type = data[0]
             data = data[1]
             if TopDataType.validate(data_type):
@@ -264,9 +280,15 @@ class TopManager(object):
         """
 
         try:
-            self.__device_connection = utim_device.UtimDevice(
+            if self.__fused:
+                device_class = fused_device.FusedDevice
+            else:
+                device_class = utim_device.UtimDevice
+
+            self.__device_connection = device_class(
                 self.__manager.receive,
-                self.__manager.send
+                self.__manager.send,
+                self.__data_event
             )
             self.__device_connection.run()
 
@@ -282,18 +304,21 @@ class TopManager(object):
         """
         Run uhost connection in another thread
 
-        :param dict config: Config of uhost connection
+        :param dict config: Config of uhost connection, 'shared' is optional
         """
 
         try:
             # Get values
             utim_name = config['utim_name']
             protocol = config['protocol']
+            shared = config.get('shared', False)
 
             # Establish connection
             self.__uhost_connection = utim_connection.UtimConnection(
                 utim_name,
-                protocol
+                protocol,
+                self.__data_event,
+                shared
             )
             self.__uhost_connection.connect()
             self.__uhost_connection.run()
@@ -337,14 +362,17 @@ class TopManager(object):
         else:
             raise TopManagerDataTypeException()
 
-    def receive(self):
+    def receive(self, timeout=0):
         """
         Receive method
 
+        :param float timeout: Seconds to wait for data (0 - do not wait)
         :return bytes|None: Data
         """
 
         try:
+            if timeout:
+                return self.__inbound_queue.get(timeout=timeout)
             return self.__inbound_queue.get_nowait()
 
         except queue.Empty:
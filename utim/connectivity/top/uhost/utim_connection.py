@@ -4,11 +4,11 @@ Utim Connection module
 This module implements Utim connection and messaging through the MQTT or AMQP
 """
 
-import time
 import logging
 import queue
 import threading
 from ....utilities import connmanager, config
+from ....utilities.timeout import Timeout
 
 
 class UtimConnectionException(Exception):
@@ -32,9 +32,16 @@ class UtimConnection(object):
     MQTT class
     """
 
-    def __init__(self, name, type):
+    def __init__(self, name, type, data_event=None, shared=False):
         """
         Initialize MQTT connection
+
+        Outbound data is published as soon as it is queued.
+
+        :param str name: Utim name
+        :param str type: Connection type
+        :param threading.Event data_event: Event to set when inbound data is queued
+        :param bool shared: Share broker connection with other UtimConnections of the same type
         """
 
         self.__inbound_queue = queue.Queue()  # Queue for inbound data
@@ -42,6 +49,8 @@ class UtimConnection(object):
         self.__utim_name = name
         self.__type = type
         self.__client = None
+        self.__data_event = data_event
+        self.__shared = shared
 
         # Threads
         self.__run2_thread = None
@@ -50,14 +59,22 @@ class UtimConnection(object):
         self.__run_event = threading.Event()
 
         self.__config = config.Config()
+        self.__destination = bytes.fromhex(self.__config.uhost_name).decode()
 
-    def connect(self):
+    def connect(self, client=None):
         """
         Establish connection
+
+        :param client: Connection to use instead of a new one (ConnManager interface)
         :return:
         """
 
-        self.__client = connmanager.ConnManager(self.__type)
+        if client is not None:
+            self.__client = client
+        elif self.__shared:
+            self.__client = connmanager.SharedConnManager(self.__type)
+        else:
+            self.__client = connmanager.ConnManager(self.__type)
 
     def stop(self):
         """
@@ -100,29 +117,25 @@ class UtimConnection(object):
 
         logging.info("Start Running")
         while self.__run_event.is_set():
-            self.__publish()
-            time.sleep(1)
+            try:
+                message = self.__outbound_queue.get(timeout=Timeout.QUEUE_WAIT)
+            except queue.Empty:
+                continue
+
+            self.__publish(message)
 
         logging.info("Stopping processing..")
 
-    def __publish(self):
+    def __publish(self, message):
         """
         Publish
-        """
-
-        while not self.__outbound_queue.empty():
-            try:
-                message = self.__outbound_queue.get_nowait()
-                logging.debug("Publish item: %s", message)
 
-                destination = bytes.fromhex(self.__config.uhost_name)
-                logging.debug("Message: %s", message)
-                logging.debug("Type message: %s", type(message))
-                self.__client.publish(self.__utim_name.encode(), destination.decode(), message)
-                logging.debug("Message %s was published to %s", str(destination), str(message))
+        :param bytes message: Item to publish
+        """
 
-            except queue.Empty:
-                pass
+        logging.debug("Publish item: %s", message)
+        self.__client.publish(self.__utim_name.encode(), self.__destination, message)
+        logging.debug("Message %s was published to %s", str(message), self.__destination)
 
     def _on_message(self, conn, sender, message):
         """
@@ -138,6 +151,8 @@ class UtimConnection(object):
         logging.info("Received message {0} from {1}".format(message, sender))
         while not self.__put_data(message):
             pass
+        if self.__data_event:
+            self.__data_event.set()
 
     def __put_data(self, data):
         """
@@ -3,6 +3,8 @@ import logging
 import threading
 import socket
 from ..network.manager import NetworkManager, NetworkDataType
+from .. import framing
+from ...utilities.timeout import Timeout
 
 
 class TransportManagerException(Exception):
@@ -160,7 +162,7 @@ class TransportManager(object):
         """
 
         while self.__run_event.is_set():
-            data = self.__manager.receive(NetworkDataType.DEVICE)
+            data = self.__manager.receive(NetworkDataType.DEVICE, Timeout.QUEUE_WAIT)
             if data:
                 self.__inbound_processing(data)
 
@@ -182,19 +184,17 @@ class TransportManager(object):
     def __inbound_processing(self, data):
         """
         Process received inbound data
-        :param bytes data: Data to process
+        :param bytes|memoryview data: Data to process
         """
         if data is not None:
             # Data must be bytes type
-            if isinstance(data, bytes):
+            if isinstance(data, (bytes, memoryview)):
                 # Data must be 3 bytes at a minimum
                 data_length = len(data)
-                if data_length >= 3:
-                    tag_bytes = data[0:1]
-                    tag = int.from_bytes(tag_bytes, byteorder='big', signed=False)
-                    length_bytes = data[1:3]
-                    length = int.from_bytes(length_bytes, byteorder='big', signed=False)
-                    data = data[3:3 + length]
+                if data_length >= framing.HEADER_LENGTH:
+                    tag, data = framing.parse(memoryview(data))
+                    # The only copy of the body on the way up
+                    data = bytes(data)
                     if TransportDataType.validate(tag) is True:
                         while not self.__put_data(data):
                             pass
@@ -229,13 +229,11 @@ class TransportManager(object):
         """
 
         try:
-            data = self.__outbound_queue.get_nowait()
+            data = self.__outbound_queue.get(timeout=Timeout.QUEUE_WAIT)
             destination = data[0]
             body = data[1]
-            # Assemble packet
-            dest = destination.to_bytes(1, byteorder='big')
-            length = len(body).to_bytes(2 , byteorder='big')
-            packet = dest + length + body
+            # Assemble packet, body is copied once when network layer joins the frame
+            packet = framing.Frame(body).wrap(destination)
 
             tag = None
             if destination == TransportDataType.DEVICE:
@@ -346,14 +344,17 @@ class TransportManager(object):
             print(er.errno)
             #raise  TransportManagerSocketException(er)
 
-    def receive(self):
+    def receive(self, timeout=0):
         """
         Receive method
 
+        :param float timeout: Seconds to wait for data (0 - do not wait)
         :return bytes|None: Data
 
         """
         try:
+            if timeout:
+                return self.__inbound_queue.get(timeout=timeout)
             return self.__inbound_queue.get_nowait()
 
         except queue.Empty:
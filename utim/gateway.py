@@ -0,0 +1,344 @@
+"""
+Utim gateway module
+
+Gateway hosts many Utim identities in one process. Every identity has its own name, SRP state
+and session key, but all of them share one broker connection and a fixed set of worker threads:
+
+    - each identity subscribes to its own topic on the shared connection, Uhost messages are
+    dispatched to the identity by topic
+
+    - identities are spread over worker threads, each worker has its own queue. Messages of one
+    identity are always processed by the same worker, so they are processed in order and
+    identity state is never touched by two threads at once
+
+    - downstream devices pass data to their identity with send() and get answers from the
+    device callback
+
+"""
+
+import threading
+import logging
+import queue
+from .utilities import srp
+from .utilities import connmanager
+from .utilities import config
+from .utilities import process_item
+from .utilities.address import Address
+from .utilities.session import UtimSession
+from .utilities.cryptography import CryptoLayer
+from .utilities.exceptions import UtimUncallableCallbackError
+from .utilities.timeout import Timeout
+
+
+class UtimGatewayException(Exception):
+    """
+    General UtimGateway exception
+    """
+
+    pass
+
+
+class UtimGatewayIdentityException(UtimGatewayException):
+    """
+    Duplicate or unknown identity exception
+    """
+
+    pass
+
+
+class UtimIdentity(UtimSession):
+    """
+    Utim identity hosted by gateway
+
+    Has the session state used by workers, as Utim
+    """
+
+    __slots__ = ('__name', '__master_key', '__gateway', '__queue', '__item_process')
+
+    def __init__(self, name, master_key, gateway, in_queue,
+                 crypto_mode=CryptoLayer.CRYPTO_MODE_AES):
+        """
+        Initialization
+
+        :param str name: Utim name (hex string)
+        :param bytes master_key: Master key
+        :param UtimGateway gateway: Gateway hosting the identity
+        :param Queue in_queue: Queue of the gateway worker processing the identity
+        :param bytes crypto_mode: Crypto mode of Uhost messages, see UtimSession.set_crypto_mode()
+        """
+
+        UtimSession.__init__(self)
+        self.set_crypto_mode(crypto_mode)
+
+        self.__name = name
+        self.__master_key = master_key
+        self.__gateway = gateway
+        self.__queue = in_queue
+
+        # Process item, never run: the gateway worker calls process()
+        self.__item_process = process_item.ProcessItem(self)
+
+    @property
+    def name(self):
+        """
+        Utim name
+        """
+
+        return self.__name
+
+    @property
+    def queue(self):
+        """
+        Queue of the gateway worker processing the identity
+        """
+
+        return self.__queue
+
+    def process(self, data):
+        """
+        Process inbound item
+
+        :param tuple data: (source address, body)
+        :return tuple|None: (destination address, body)
+        """
+
+        return self.__item_process.process(data)
+
+    def _get_srp_credentials(self):
+        """
+        Get SRP username and password
+        """
+
+        return bytes.fromhex(self.__name), self.__master_key
+
+    def utim_die(self):
+        """
+        Remove identity from gateway
+        """
+
+        self.__gateway.remove_identity(self.__name)
+
+
+class UtimGateway(object):
+    """
+    Utim gateway class
+    """
+
+    DEFAULT_WORKERS = 4
+
+    def __init__(self, connection=None, uhost_name=None, workers=DEFAULT_WORKERS):
+        """
+        Initialization
+
+        Connection and Uhost name default to the ones in config, the connection is shared with
+        other users of the same protocol in the process.
+
+        :param connection: Shared connection to Uhost (ConnManager interface)
+        :param str uhost_name: Uhost topic
+        :param int workers: Number of worker threads
+        """
+
+        if workers < 1:
+            raise UtimGatewayException("At least one worker is required")
+
+        self.__own_connection = connection is None
+        if connection is None or uhost_name is None:
+            cfg = config.Config()
+            if connection is None:
+                connection = connmanager.SharedConnManager(cfg.utim_messaging_protocol.lower())
+            if uhost_name is None:
+                uhost_name = bytes.fromhex(cfg.uhost_name).decode()
+
+        self.__connection = connection
+        self.__uhost_name = uhost_name
+
+        # Identities by name
+        self.__identities = {}
+        self.__lock = threading.Lock()
+
+        # Device callback
+        self.__device_callback = None
+
+        # Worker queues, identities are assigned round robin
+        self.__queues = [queue.Queue() for _ in range(workers)]
+        self.__next_queue = 0
+
+        # Threads
+        self.__threads = []
+
+        # Run event
+        self.__run_event = threading.Event()
+
+        # Precomputed SRP ephemerals, a few per worker
+        srp.EphemeralPool.get(size=workers * srp.EphemeralPool.DEFAULT_SIZE)
+
+    def set_device_callback(self, callback):
+        """
+        Set callback for data addressed to devices
+
+        :param callback: Callable callback(name, body)
+        :raise: UtimUncallableCallbackError
+        """
+
+        if not callable(callback):
+            raise UtimUncallableCallbackError()
+
+        self.__device_callback = callback
+
+    def add_identity(self, name, master_key, crypto_mode=CryptoLayer.CRYPTO_MODE_AES):
+        """
+        Add identity and subscribe to its topic
+
+        :param str name: Utim name (hex string)
+        :param bytes master_key: Master key
+        :param bytes crypto_mode: Crypto mode of Uhost messages, see UtimSession.set_crypto_mode()
+        :return UtimIdentity: Identity
+        :raise: UtimGatewayIdentityException, ValueError
+        """
+
+        name = name.upper()
+        with self.__lock:
+            if name in self.__identities:
+                raise UtimGatewayIdentityException("Identity {0} already exists".format(name))
+
+            in_queue = self.__queues[self.__next_queue]
+            self.__next_queue = (self.__next_queue + 1) % len(self.__queues)
+
+            identity = UtimIdentity(name, master_key, self, in_queue, crypto_mode)
+            self.__identities[name] = identity
+
+        self.__connection.subscribe(name, identity, self._on_uhost_message)
+
+        return identity
+
+    def remove_identity(self, name):
+        """
+        Remove identity, unsubscribe from its topic and drop its cached SRP identity
+
+        :param str name: Utim name
+        """
+
+        name = name.upper()
+        with self.__lock:
+            identity = self.__identities.pop(name, None)
+
+        if identity is not None:
+            self.__connection.unsubscribe(name)
+            srp.Identity.discard(bytes.fromhex(name))
+
+    def get_identity(self, name):
+        """
+        Get identity
+
+        :param str name: Utim name
+        :return UtimIdentity|None: Identity
+        """
+
+        return self.__identities.get(name.upper())
+
+    def __len__(self):
+        return len(self.__identities)
+
+    def send(self, name, body):
+        """
+        Pass device data to identity
+
+        Thread-safe.
+
+        :param str name: Utim name
+        :param bytes body: Device data
+        :raise: UtimGatewayIdentityException
+        """
+
+        identity = self.__identities.get(name.upper())
+        if identity is None:
+            raise UtimGatewayIdentityException("Unknown identity {0}".format(name))
+
+        identity.queue.put((identity, Address.ADDRESS_DEVICE, body))
+
+    def _on_uhost_message(self, identity, sender, message):
+        """
+        Uhost message callback of shared connection
+
+        :param UtimIdentity identity: Identity subscribed to the topic
+        :param sender: Message sender
+        :param message: The message
+        """
+
+        identity.queue.put((identity, Address.ADDRESS_UHOST, message))
+
+    def run(self):
+        """
+        Run worker threads
+        """
+
+        self.__run_event.set()
+
+        for index, in_queue in enumerate(self.__queues):
+            thread = threading.Thread(
+                target=self.__work,
+                args=(in_queue,),
+                name='THREAD_UTIM_GATEWAY_WORKER_{0}'.format(index)
+            )
+            thread.daemon = True
+            thread.start()
+            self.__threads.append(thread)
+
+    def __work(self, in_queue):
+        """
+        Worker thread
+
+        :param Queue in_queue: Queue of the worker
+        """
+
+        while self.__run_event.is_set():
+            try:
+                identity, address, body = in_queue.get(timeout=Timeout.QUEUE_WAIT)
+            except queue.Empty:
+                continue
+
+            try:
+                res = identity.process((address, body))
+                if res:
+                    self.__route(identity, res)
+            except Exception as ex:
+                logging.exception("Gateway processing error of %s: %s", identity.name, ex)
+
+        logging.info("Stopping gateway worker..")
+
+    def __route(self, identity, data):
+        """
+        Route processed data
+
+        :param UtimIdentity identity: Identity
+        :param tuple data: (destination address, body)
+        """
+
+        destination, body = data
+        if destination == Address.ADDRESS_UHOST:
+            self.__connection.publish(identity.name.encode(), self.__uhost_name, body)
+        elif destination == Address.ADDRESS_DEVICE:
+            callback = self.__device_callback
+            if callback is not None:
+                callback(identity.name, body)
+            else:
+                logging.debug("No device callback, dropped data of %s", identity.name)
+        else:
+            logging.debug("Unsupported outbound destination of %s: %s - %s", identity.name,
+                          destination, body)
+
+    def stop(self):
+        """
+        Stop gateway
+        """
+
+        self.__run_event.clear()
+
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
+
+        if self.__own_connection and self.__connection:
+            self.__connection.disconnect()
+
+        logging.debug("Utim gateway was stopped !!")
@@ -0,0 +1,133 @@
+"""
+Big integer arithmetic backend
+
+SRP modular arithmetic goes through the selected backend:
+    - 'gmpy2': GMP through gmpy2, selected by default when gmpy2 is installed
+    - 'python': built-in int and pow()
+
+Backend functions take and return Python ints, so values hashed and serialized by SRP are the
+same whatever the backend. Numbers kept for repeated arithmetic (fixed-base tables) may be
+converted once with mpz().
+"""
+
+import logging
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+class BigIntBackendException(Exception):
+    """
+    Unknown or unavailable backend exception
+    """
+
+    pass
+
+
+class PythonBackend(object):
+    """
+    Built-in int arithmetic
+    """
+
+    name = 'python'
+
+    @staticmethod
+    def powmod(base, exponent, modulus):
+        """
+        base^exponent mod modulus
+        """
+
+        return pow(base, exponent, modulus)
+
+    @staticmethod
+    def mpz(value):
+        """
+        Number for repeated arithmetic
+        """
+
+        return value
+
+    @staticmethod
+    def to_int(value):
+        """
+        Python int of a number
+        """
+
+        return value
+
+
+class Gmpy2Backend(object):
+    """
+    GMP arithmetic
+    """
+
+    name = 'gmpy2'
+
+    @staticmethod
+    def powmod(base, exponent, modulus):
+        """
+        base^exponent mod modulus
+        """
+
+        return int(gmpy2.powmod(base, exponent, modulus))
+
+    @staticmethod
+    def mpz(value):
+        """
+        Number for repeated arithmetic
+        """
+
+        return gmpy2.mpz(value)
+
+    @staticmethod
+    def to_int(value):
+        """
+        Python int of a number
+        """
+
+        return int(value)
+
+
+_backends = {PythonBackend.name: PythonBackend}
+if gmpy2 is not None:
+    _backends[Gmpy2Backend.name] = Gmpy2Backend
+
+_backend = Gmpy2Backend if gmpy2 is not None else PythonBackend
+
+
+def available_backends():
+    """
+    Names of available backends
+
+    :return list:
+    """
+
+    return list(_backends)
+
+
+def get_backend():
+    """
+    Selected backend
+    """
+
+    return _backend
+
+
+def set_backend(name):
+    """
+    Select backend
+
+    :param str name: Backend name
+    :raise: BigIntBackendException
+    """
+
+    global _backend
+
+    backend = _backends.get(name)
+    if backend is None:
+        raise BigIntBackendException("Big integer backend {0} is not available".format(name))
+
+    logging.info("Using big integer backend %s", name)
+    _backend = backend
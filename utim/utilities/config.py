@@ -33,6 +33,16 @@ class Config(object):
         except KeyError:
             raise ConfigException
 
+        # Optional
+        section = self.parser[self.utim_messaging_protocol]
+        try:
+            self.__messaging_qos = section.getint('qos', 0)
+            self.__messaging_max_inflight = section.getint('max_inflight', 20)
+        except ValueError:
+            raise ConfigException
+        self.__messaging_client_id = section.get('client_id')
+        self.__utim_crypto_mode = self.parser['UTIM'].get('crypto_mode', 'aes').lower()
+
     @property
     def utim_name(self):
         return self.__utim_name
@@ -60,3 +70,19 @@ class Config(object):
     @property
     def messaging_reconnect_time(self):
         return self.__messaging_reconnect_time
+
+    @property
+    def messaging_qos(self):
+        return self.__messaging_qos
+
+    @property
+    def messaging_max_inflight(self):
+        return self.__messaging_max_inflight
+
+    @property
+    def messaging_client_id(self):
+        return self.__messaging_client_id
+
+    @property
+    def utim_crypto_mode(self):
+        return self.__utim_crypto_mode
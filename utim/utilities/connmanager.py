@@ -1,7 +1,11 @@
 """ConnManager containing script"""
 import logging
+import threading
+from . import config
+from .exceptions import UtimConnectionException
 from .connmanagermqtt import ConnManagerMQTT
 from .uconn_amqp import UConnAMQP
+from .uconn_amqp_async import UConnAMQPAsync
 from .uconn_mqtt import UConnMQTT
 
 
@@ -13,21 +17,37 @@ class ConnManager(object):
 
     CONNECTION_TYPE_MQTT = 'mqtt'
     CONNECTION_TYPE_AMQP = 'amqp'
+    # AMQP on one asynchronous I/O thread
+    CONNECTION_TYPE_AMQP_ASYNC = 'amqp_async'
     CONNECTION_TYPE_UMQTT = 'umqtt'
+    # MQTT with delivery guaranteed by MQTT QoS instead of ConnManagerMQTT acks
+    CONNECTION_TYPE_MQTT_QOS = 'mqtt_qos'
 
-    def __init__(self, connection_type):
+    def __init__(self, connection_type, **kwargs):
         """
         Initialization of ConnManager
 
-        :param str connection_type: Connection type (mqtt and amqp is supported)
+        :param str connection_type: Connection type (mqtt, mqtt_qos, umqtt, amqp and amqp_async
+        is supported)
+        :param kwargs: Options of the connection, see ConnManagerMQTT for mqtt, UConnMQTT for
+        mqtt_qos and umqtt, UConnAMQP for amqp and UConnAMQPAsync for amqp_async
         """
         logging.info('Initializing ConnManager, type: ' + connection_type)
         if connection_type == ConnManager.CONNECTION_TYPE_AMQP:
-            self.__connection = UConnAMQP()
+            self.__connection = UConnAMQP(**kwargs)
+        elif connection_type == ConnManager.CONNECTION_TYPE_AMQP_ASYNC:
+            self.__connection = UConnAMQPAsync(**kwargs)
         elif connection_type == ConnManager.CONNECTION_TYPE_UMQTT:
-            self.__connection = UConnMQTT()
+            self.__connection = UConnMQTT(**kwargs)
+        elif connection_type == ConnManager.CONNECTION_TYPE_MQTT_QOS:
+            if 'qos' not in kwargs:
+                kwargs['qos'] = max(config.Config().messaging_qos, 1)
+            self.__connection = UConnMQTT(**kwargs)
         else:
-            self.__connection = ConnManagerMQTT()
+            self.__connection = ConnManagerMQTT(**kwargs)
+
+        # Callback object and callback by topic
+        self.__subscriptions = {}
 
     def disconnect(self):
         """
@@ -45,9 +65,8 @@ class ConnManager(object):
         :param method callback: Callback for received message
         """
         logging.info("Subscribing for {0}".format(topic))
-        self.__callback_object = callback_object
-        self.__callback = callback
-        self.__connection.subscribe(topic, self, ConnManager._on_message)
+        self.__subscriptions[topic] = (callback_object, callback)
+        self.__connection.subscribe(topic, topic, self._on_message)
 
     def unsubscribe(self, topic):
         """
@@ -56,6 +75,7 @@ class ConnManager(object):
         :param str topic: Topic for subscription cancelling
         """
         logging.info("Unsubscribing from {0}".format(topic))
+        self.__subscriptions.pop(topic, None)
         self.__connection.unsubscribe(topic)
 
     def publish(self, sender, destination, message):
@@ -69,12 +89,136 @@ class ConnManager(object):
         logging.info("Publishing {0} to topic {1}".format(message, destination))
         self.__connection.publish(sender, destination, message)
 
-    def _on_message(self, sender, message):
+    def _on_message(self, topic, sender, message):
         """
         Message receiving callback
 
+        :param str topic: Topic message was received on
         :param sender: Message sender
         :param message: The message
         """
         logging.info("Received message {0} from {1}".format(message, sender))
-        self.__callback(self.__callback_object, sender, message)
+        subscription = self.__subscriptions.get(topic)
+        if subscription is None:
+            logging.error("No subscription for topic {0}".format(topic))
+            return
+        callback_object, callback = subscription
+        callback(callback_object, sender, message)
+
+
+class SharedConnManagerException(UtimConnectionException):
+    """
+    Topic already subscribed or options differing on a shared connection
+    """
+
+    pass
+
+
+class SharedConnManager(object):
+    """
+    Handle of ConnManager shared by all users of the same connection type in the process
+
+    One broker connection serves all handles: each handle subscribes its own topics, inbound
+    messages are dispatched by topic and all publishes go over the same connection. A topic
+    belongs to one handle at a time.
+    The connection is disconnected when the last handle is disconnected.
+    """
+
+    __lock = threading.Lock()
+    # [ConnManager, number of handles, options, handles by topic] by connection type
+    __managers = {}
+
+    def __init__(self, connection_type, **kwargs):
+        """
+        Initialization of SharedConnManager
+
+        :param str connection_type: Connection type (mqtt and amqp is supported)
+        :param kwargs: Options of the connection, set by the first handle of the type. Later
+            handles give no options or the same ones.
+        :raise: SharedConnManagerException
+        """
+
+        with SharedConnManager.__lock:
+            entry = SharedConnManager.__managers.get(connection_type)
+            if entry is None:
+                entry = [ConnManager(connection_type, **kwargs), 0, kwargs, {}]
+                SharedConnManager.__managers[connection_type] = entry
+            elif kwargs and kwargs != entry[2]:
+                raise SharedConnManagerException(
+                    "Shared {0} connection has options {1}, not {2}".format(connection_type,
+                                                                          entry[2], kwargs))
+            entry[1] += 1
+
+        logging.info('Using shared ConnManager, type: {0}, handles: {1}'.format(connection_type,
+                                                                                 entry[1]))
+        self.__connection_type = connection_type
+        self.__manager = entry[0]
+        self.__handles = entry[3]
+        self.__topics = set()
+        self.__connected = True
+
+    def disconnect(self):
+        """
+        Unsubscribe topics of this handle and disconnect from server if it was the last handle
+        """
+
+        if not self.__connected:
+            return
+        self.__connected = False
+
+        for topic in list(self.__topics):
+            self.unsubscribe(topic)
+
+        with SharedConnManager.__lock:
+            entry = SharedConnManager.__managers[self.__connection_type]
+            entry[1] -= 1
+            last = entry[1] == 0
+            if last:
+                SharedConnManager.__managers.pop(self.__connection_type)
+
+        if last:
+            self.__manager.disconnect()
+
+    def subscribe(self, topic, callback_object, callback):
+        """
+        Subscribe on topic
+
+        :param str topic: Topic for subscription
+        :param object callback_object: Object with callback method
+        :param method callback: Callback for received message
+        :raise: SharedConnManagerException if another handle subscribed the topic
+        """
+
+        with SharedConnManager.__lock:
+            handle = self.__handles.setdefault(topic, self)
+        if handle is not self:
+            raise SharedConnManagerException(
+                "Topic {0} is already subscribed on the shared connection".format(topic))
+
+        self.__topics.add(topic)
+        self.__manager.subscribe(topic, callback_object, callback)
+
+    def unsubscribe(self, topic):
+        """
+        Unsubscribe from topic
+
+        :param str topic: Topic for subscription cancelling
+        """
+
+        if topic not in self.__topics:
+            return
+        self.__topics.discard(topic)
+        self.__manager.unsubscribe(topic)
+        with SharedConnManager.__lock:
+            self.__handles.pop(topic, None)
+
+    def publish(self, sender, destination, message):
+        """
+        Publish message
+
+        :param sender: Message sender
+        :param destination: Message destination
+        :param message: The message
+        """
+
+        self.__manager.publish(sender, destination, message)
@@ -1,9 +1,11 @@
 """ConnManagerMQTT containing script"""
-import _thread
-import time
+import threading
+import os
 import random
 import logging
 from .uconn_mqtt import UConnMQTT
+from .delivery import Scheduler, ReceiveWindow, SELECTIVE_ACK, SESSION_MESSAGE, SESSION_LENGTH
+from .delivery import assemble_selective_acks, parse_selective_ack
 from . import exceptions
 
 
@@ -12,26 +14,102 @@ class ConnManagerMQTT(object):
     UconnMQTT wrapper that guarantee delivery to addressee
     """
 
-    _SENDER = 'sender'
-    _DESTINATION = 'destination'
-    _MESSAGE = 'message'
+    # Indexes of sent message entry
+    _SENDER = 0
+    _DESTINATION = 1
+    _MESSAGE = 2
+    _HANDLE = 3
+    _INTERVAL = 4
 
-    def __init__(self):
+    DEFAULT_INITIAL_DELAY = 10
+    DEFAULT_INTERVAL = 5
+    DEFAULT_BACKOFF = 1
+    DEFAULT_MAX_INTERVAL = 60
+    DEFAULT_MAX_IN_FLIGHT = 1024
+    DEFAULT_ACK_DELAY = 0
+
+    def __init__(self, initial_delay=DEFAULT_INITIAL_DELAY, interval=DEFAULT_INTERVAL,
+                 backoff=DEFAULT_BACKOFF, max_interval=DEFAULT_MAX_INTERVAL,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, scheduler=None, connection=None,
+                 window_size=ReceiveWindow.DEFAULT_SIZE, ack_delay=DEFAULT_ACK_DELAY,
+                 session_frames=False):
         """
         Initialization of ConnManager
+
+        Unacknowledged message is republished initial_delay seconds after publishing, then
+        every interval seconds, the interval is multiplied by backoff after every republish
+        up to max_interval. publish() blocks while the oldest unacknowledged message is
+        max_in_flight ids behind the next one.
+        Received messages are always acknowledged, but retransmissions of messages among the
+        last window_size ones of their sender on the topic are not delivered again.
+        Retransmissions always fall within the window if window_size of receiver is not less
+        than max_in_flight of sender.
+        With session_frames messages carry the random session of this connection, so the
+        receiver starts a new window when the sender restarts instead of taking the new ids
+        for retransmissions. Only enable it when the peers understand session frames; messages
+        with and without session are always understood on receive.
+        With ack_delay 0 every received message is acknowledged at once with its own ack.
+        Otherwise ids received from a sender during ack_delay seconds are acknowledged together
+        with selective ack frames, which the sender must understand.
+
+        :param float initial_delay: Seconds before first republish
+        :param float interval: Seconds between republishes
+        :param float backoff: Interval multiplier
+        :param float max_interval: Maximum seconds between republishes
+        :param int max_in_flight: Maximum id distance of unacknowledged messages (at most 32768)
+        :param Scheduler scheduler: Republish scheduler (shared default scheduler if None)
+        :param connection: Underlying connection (new UConnMQTT if None)
+        :param int window_size: Number of message ids per sender checked for duplicates
+        :param float ack_delay: Seconds to collect ids to acknowledge (0 - ack every message)
+        :param bool session_frames: Send messages with session
         """
         logging.info('Initializing ConnmanagerMQTT')
-        self.__connection = UConnMQTT()
-        self.__message_number = random.randint(0, 65536)
+        if not 0 < max_in_flight <= 32768:
+            raise ValueError('max_in_flight must be in 1..32768')
+        self.__initial_delay = initial_delay
+        self.__interval = interval
+        self.__backoff = backoff
+        self.__max_interval = max_interval
+        self.__scheduler = scheduler or Scheduler.default()
+        self.__max_in_flight = max_in_flight
+        self.__lock = threading.Lock()
+        self.__released = threading.Condition(self.__lock)
+        self.__connection = connection or UConnMQTT()
+        self.__message_number = random.randint(0, 65535)
+        self.__frame_header = (SESSION_MESSAGE + os.urandom(SESSION_LENGTH) if session_frames
+                               else b'\x01')
+        # [sender, destination, message, republish handle, interval] by message id
         self.__sent_messages = dict()
-        self.__callback = None
-        self.__callback_object = None
+        # Received message ids by topic and sender
+        self.__window_size = window_size
+        self.__windows = dict()
+        # Ids to acknowledge by sender
+        self.__ack_delay = ack_delay
+        self.__ack_lock = threading.Lock()
+        self.__pending_acks = dict()
+        # Callback object and callback by topic
+        self.__subscriptions = {}
+
+    @property
+    def duplicates(self):
+        """
+        Number of received duplicates that were not delivered
+        """
+        return sum(window.duplicates for window in list(self.__windows.values()))
 
     def disconnect(self):
         """
         Disconnection from server
         """
         logging.info('Disconnecting...')
+        for sender in list(self.__pending_acks):
+            self._flush_acks(sender)
+        with self.__released:
+            entries = list(self.__sent_messages.values())
+            self.__sent_messages.clear()
+            self.__released.notify_all()
+        for entry in entries:
+            self.__scheduler.cancel(entry[self._HANDLE])
         self.__connection.disconnect()
 
     def subscribe(self, topic, callback_object, callback):
@@ -39,14 +117,14 @@ class ConnManagerMQTT(object):
         Subscribe on topic
 
         :param str topic: Topic for subscription
+        :param object callback_object: Object with callback method
         :param method callback: Callback for received message
         """
         logging.info("Subscribing for {0}".format(topic))
         if not callable(callback):
             raise exceptions.UtimUncallableCallbackError
-        self.__callback = callback
-        self.__callback_object = callback_object
-        self.__connection.subscribe(topic, self, ConnManagerMQTT._on_message)
+        self.__subscriptions[topic] = (callback_object, callback)
+        self.__connection.subscribe(topic, topic, self._on_message)
 
     def unsubscribe(self, topic):
         """
@@ -55,6 +133,7 @@ class ConnManagerMQTT(object):
         :param str topic: Topic for subscription cancelling
         """
         logging.info("Unsubscribing from {0}".format(topic))
+        self.__subscriptions.pop(topic, None)
         self.__connection.unsubscribe(topic)
 
     def publish(self, sender, destination, message):
@@ -65,42 +144,93 @@ class ConnManagerMQTT(object):
         :param destination: Message destination
         :param message: The message
         """
-        id = self.__message_number
-        self.__message_number = (self.__message_number + 1) % 65536
-        out_message = b'\x01' + id.to_bytes(2, 'big') + message
+        with self.__released:
+            # Sent messages are ordered by id, the first one is the oldest
+            while (self.__sent_messages and
+                   (self.__message_number - next(iter(self.__sent_messages))) % 65536 >=
+                   self.__max_in_flight):
+                self.__released.wait()
+
+            id = self.__message_number
+            self.__message_number = (self.__message_number + 1) % 65536
+            handle = self.__scheduler.call_later(self.__initial_delay, self._republish, id)
+            self.__sent_messages[id] = [sender, destination, message, handle, self.__interval]
+
+        out_message = self.__frame_header + id.to_bytes(2, 'big') + message
         logging.info("Publishing {0} to topic {1}".format(message, destination))
         self.__connection.publish(sender, destination, out_message)
-        self.__sent_messages[id] = {self._SENDER: sender,
-                                    self._DESTINATION: destination,
-                                    self._MESSAGE: message}
-
-        _thread.start_new_thread(self._republish, (id,))
 
     def _republish(self, id):
         """
-        Check if message was delivered and republish if not
+        Republish message that was not delivered and schedule next republish
 
         :param id: Message ID
         """
-        logging.info("_publish for {0} started".format(id))
-        time.sleep(10)
-        while id in self.__sent_messages.keys():
-            try:
-                logging.info("Message {0} wasn\'t delivered".format(id))
-                message = self.__sent_messages[id]
-                self.__connection.publish(message[self._SENDER], message[self._DESTINATION],
-                                          b'\x01' + id.to_bytes(2, 'big') + message[self._MESSAGE])
-                time.sleep(5)
-            except KeyError:
-                logging.error("Message was already deleted from republish")
-                break
+        with self.__lock:
+            entry = self.__sent_messages.get(id)
+            if entry is None:
+                return
+            interval = entry[self._INTERVAL]
+            entry[self._HANDLE] = self.__scheduler.call_later(interval, self._republish, id)
+            entry[self._INTERVAL] = min(interval * self.__backoff, self.__max_interval)
+
+        logging.info("Message {0} wasn\'t delivered".format(id))
+        self.__connection.publish(entry[self._SENDER], entry[self._DESTINATION],
+                                  self.__frame_header + id.to_bytes(2, 'big') +
+                                  entry[self._MESSAGE])
+
+    def __release(self, ids):
+        """
+        Forget delivered messages
+
+        :param ids: Message IDs
+        """
+        with self.__released:
+            entries = [self.__sent_messages.pop(id, None) for id in ids]
+            self.__released.notify_all()
+        for id, entry in zip(ids, entries):
+            if entry is None:
+                logging.info("Message {0} was already delivered".format(id))
+            else:
+                self.__scheduler.cancel(entry[self._HANDLE])
+                logging.info("Message {0} was delivered".format(id))
 
-        logging.info("Message {0} was delivered".format(id))
+    def __acknowledge(self, sender, id_bytes):
+        """
+        Acknowledge received message now or collect its id for selective ack
 
-    def _on_message(self, sender, message):
+        :param bytes sender: Message sender
+        :param bytes id_bytes: Message ID
+        """
+        if not self.__ack_delay:
+            self.__connection.publish(b'ack', sender.decode(), b'\x02' + id_bytes)
+            return
+
+        with self.__ack_lock:
+            ids = self.__pending_acks.get(sender)
+            if ids is None:
+                ids = self.__pending_acks[sender] = []
+                self.__scheduler.call_later(self.__ack_delay, self._flush_acks, sender)
+            ids.append(int.from_bytes(id_bytes, 'big'))
+
+    def _flush_acks(self, sender):
+        """
+        Send selective acks of ids collected from sender
+
+        :param bytes sender: Message sender
+        """
+        with self.__ack_lock:
+            ids = self.__pending_acks.pop(sender, None)
+        if not ids:
+            return
+        for frame in assemble_selective_acks(ids):
+            self.__connection.publish(b'ack', sender.decode(), frame)
+
+    def _on_message(self, topic, sender, message):
         """
         Message receiving callback
 
+        :param str topic: Topic message was received on
         :param sender: Message sender
         :param message: The message
         """
@@ -109,15 +239,32 @@ class ConnManagerMQTT(object):
             logging.info('Message is too short to be something!')
         else:
             if message[:1] == b'\x02':
-                try:
-                    logging.info('Received ack, deleting message from sent')
-                    id = int.from_bytes(message[1:3], 'big')
-                    if id in self.__sent_messages.keys():
-                        self.__sent_messages.pop(id)
-                except KeyError:
-                    logging.error("Message was already deleted from republish")
+                logging.info('Received ack, deleting message from sent')
+                self.__release((int.from_bytes(message[1:3], 'big'),))
+            elif message[:1] == SELECTIVE_ACK:
+                logging.info('Received selective ack, deleting messages from sent')
+                self.__release(parse_selective_ack(message))
             else:
+                if message[:1] == SESSION_MESSAGE:
+                    if len(message) < SESSION_LENGTH + 3:
+                        logging.info('Message is too short to be something!')
+                        return
+                    session = message[1:SESSION_LENGTH + 1]
+                    message = message[SESSION_LENGTH:]
+                else:
+                    session = None
+
                 logging.info('Received message, sending ack...')
-                ack_message = b'\x02' + message[1:3]
-                self.__connection.publish(b'ack', sender.decode(), ack_message)
-                self.__callback(self.__callback_object, sender, message[3:])
+                self.__acknowledge(sender, message[1:3])
+
+                window = self.__windows.get((topic, sender))
+                if window is None:
+                    window = self.__windows[(topic, sender)] = ReceiveWindow(self.__window_size)
+                if not window.accept(int.from_bytes(message[1:3], 'big'), session):
+                    logging.info('Duplicate message from {0} dropped'.format(sender))
+                    return
+
+                subscription = self.__subscriptions.get(topic)
+                if subscription is not None:
+                    callback_object, callback = subscription
+                    callback(callback_object, sender, message[3:])
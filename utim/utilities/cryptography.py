@@ -1,6 +1,16 @@
-"""Cryptography layer for Utim and Uhost"""
+"""
+Cryptography layer for Utim and Uhost
 
-from Crypto.Cipher import AES
+Encrypted envelope is ENCRYPTED tag, crypto mode and:
+    - CRYPTO_MODE_NONE: message
+    - CRYPTO_MODE_AES: AES-CFB ciphertext, authenticated by the signed envelope around it
+    - CRYPTO_MODE_AES_GCM, CRYPTO_MODE_CHACHA20_POLY1305: nonce (12 bytes), ciphertext and
+    tag (16 bytes). Authenticated encryption, the envelope is not signed. Tag and mode bytes are
+    authenticated as associated data
+"""
+
+from Crypto.Cipher import AES, ChaCha20_Poly1305
+from Crypto.Random import get_random_bytes
 import hashlib
 import hmac
 import logging
@@ -17,17 +27,72 @@ class CryptoLayer(object):
 
     CRYPTO_MODE_NONE = b'\x00'
     CRYPTO_MODE_AES = b'\x01'
+    CRYPTO_MODE_AES_GCM = b'\x02'
+    CRYPTO_MODE_CHACHA20_POLY1305 = b'\x03'
+
+    AEAD_MODES = (CRYPTO_MODE_AES_GCM, CRYPTO_MODE_CHACHA20_POLY1305)
+
+    # Session crypto modes by config name
+    SESSION_MODES = {
+        'aes': CRYPTO_MODE_AES,
+        'aes_gcm': CRYPTO_MODE_AES_GCM,
+        'chacha20_poly1305': CRYPTO_MODE_CHACHA20_POLY1305,
+    }
+
+    # Messages per task of batch calls running on executor
+    DEFAULT_CHUNK_SIZE = 256
 
     __SIGN_SHA1_LENGTH = 20
+    __NONCE_LENGTH = 12
+    __TAG_LENGTH = 16
     __iv = b'\x75\xbe\x38\x2b\x42\x51\xc7\x05\xa2\x43\x23\x5d\xe0\xf4\xb5\x08'
 
-    def __init__(self, key):
+    def __init__(self, key, mode=CRYPTO_MODE_AES):
         """
         Initialization of CryptoLayer
-        For AES key must be 16, 24 or 32 bytes
+        For AES key must be 16, 24 or 32 bytes, for ChaCha20-Poly1305 32 bytes
+
+        HMAC state of the key is computed once, every signature starts from a copy of it.
+        With an AEAD session mode and a key, only messages encrypted in that mode are decrypted.
+
+        :param bytes key: Session key
+        :param bytes mode: Session crypto mode
         """
-        logging.info('Creating new layer with key {0}'.format(key))
+        logging.debug('Creating new crypto layer')
         self.__key = key
+        self.__mode = mode
+        self.__hmac = hmac.new(key, digestmod=hashlib.sha1) if key is not None else None
+
+    @property
+    def mode(self):
+        """
+        Session crypto mode
+        """
+
+        return self.__mode
+
+    @property
+    def is_aead(self):
+        """
+        Messages of the session are protected by authenticated encryption only, not signed
+        """
+
+        return self.__key is not None and self.__mode in self.AEAD_MODES
+
+    def __new_aead(self, mode, nonce):
+        """
+        Create AEAD cipher
+
+        :param bytes mode: CRYPTO_MODE_AES_GCM or CRYPTO_MODE_CHACHA20_POLY1305
+        :param bytes nonce: Nonce
+        """
+
+        if mode == self.CRYPTO_MODE_AES_GCM:
+            cipher = AES.new(self.__key, AES.MODE_GCM, nonce=nonce)
+        else:
+            cipher = ChaCha20_Poly1305.new(key=self.__key, nonce=nonce)
+        cipher.update(Tag.CRYPTO.ENCRYPTED + mode)
+        return cipher
 
     @staticmethod
     def is_secured(message):
@@ -50,6 +115,10 @@ class CryptoLayer(object):
             if mode == self.CRYPTO_MODE_AES:
                 cipher = AES.new(self.__key, AES.MODE_CFB, self.__iv)
                 return Tag.CRYPTO.ENCRYPTED + mode + cipher.encrypt(message)
+            if mode in self.AEAD_MODES:
+                nonce = get_random_bytes(self.__NONCE_LENGTH)
+                ciphertext, tag = self.__new_aead(mode, nonce).encrypt_and_digest(message)
+                return b''.join((Tag.CRYPTO.ENCRYPTED, mode, nonce, ciphertext, tag))
         return Tag.CRYPTO.ENCRYPTED + self.CRYPTO_MODE_NONE + message
 
     def decrypt(self, message):
@@ -61,9 +130,23 @@ class CryptoLayer(object):
         if self.__key is None:
             if message[1:2] == self.CRYPTO_MODE_NONE:
                 return message[2:]
+        elif self.__mode in self.AEAD_MODES:
+            # Unauthenticated modes are not accepted in AEAD session
+            mode = message[1:2]
+            if mode != self.__mode or len(message) < 2 + self.__NONCE_LENGTH + self.__TAG_LENGTH:
+                return None
+            nonce = message[2:2 + self.__NONCE_LENGTH]
+            tag = message[-self.__TAG_LENGTH:]
+            try:
+                return self.__new_aead(mode, nonce).decrypt_and_verify(
+                    message[2 + self.__NONCE_LENGTH:-self.__TAG_LENGTH], tag)
+            except ValueError:
+                logging.error('Message authentication failed')
+                return None
         elif message[1:2] == self.CRYPTO_MODE_AES:
+            # CFB state after the IV is the IV itself, so IV needs no decrypting
             cipher = AES.new(self.__key, AES.MODE_CFB, self.__iv)
-            return cipher.decrypt(self.__iv + message[2:])[16:]
+            return cipher.decrypt(message[2:])
         return None
 
     def sign(self, mode, message):
@@ -72,7 +155,9 @@ class CryptoLayer(object):
         """
         if self.__key is not None and mode != self.SIGN_MODE_NONE:
             if mode == self.SIGN_MODE_SHA1:
-                signature = hmac.new(self.__key, message, hashlib.sha1).digest()
+                mac = self.__hmac.copy()
+                mac.update(message)
+                signature = mac.digest()
                 return Tag.CRYPTO.SIGNED + mode + message + signature
         return Tag.CRYPTO.SIGNED + self.SIGN_MODE_NONE + message
 
@@ -90,7 +175,158 @@ class CryptoLayer(object):
             message_end = len(message) - self.__SIGN_SHA1_LENGTH
             useful_message = message[2:message_end]
             signature = message[message_end:]
-            ref_signature = hmac.new(self.__key, useful_message, hashlib.sha1).digest()
+            mac = self.__hmac.copy()
+            mac.update(useful_message)
+            ref_signature = mac.digest()
             if signature == ref_signature:
                 return useful_message
         return None
+
+    def encrypt_many(self, mode, messages, executor=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Encrypt messages, same as encrypt() of every message
+
+        With executor, batches longer than chunk_size are split into chunks encrypted in
+        parallel (the ciphers release the GIL).
+
+        :param bytes mode: Crypto mode
+        :param list messages: Messages
+        :param concurrent.futures.Executor executor: Executor (None - encrypt in calling thread)
+        :param int chunk_size: Messages per executor task
+        :return list: Encrypted messages
+        """
+
+        return self.__many(self.__encrypt_chunk, mode, messages, executor, chunk_size)
+
+    def decrypt_many(self, messages, executor=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Decrypt messages, same as decrypt() of every message
+
+        :param list messages: Messages
+        :param concurrent.futures.Executor executor: Executor (None - decrypt in calling thread)
+        :param int chunk_size: Messages per executor task
+        :return list: Decrypted messages, None for messages failing to decrypt
+        """
+
+        return self.__many(self.__decrypt_chunk, None, messages, executor, chunk_size)
+
+    def sign_many(self, mode, messages, executor=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Sign messages, same as sign() of every message
+
+        :param bytes mode: Sign mode
+        :param list messages: Messages
+        :param concurrent.futures.Executor executor: Executor (None - sign in calling thread)
+        :param int chunk_size: Messages per executor task
+        :return list: Signed messages
+        """
+
+        return self.__many(self.__sign_chunk, mode, messages, executor, chunk_size)
+
+    def unsign_many(self, messages, executor=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Unsign messages, same as unsign() of every message
+
+        :param list messages: Messages
+        :param concurrent.futures.Executor executor: Executor (None - unsign in calling thread)
+        :param int chunk_size: Messages per executor task
+        :return list: Unsigned messages, None for messages failing verification
+        """
+
+        return self.__many(self.__unsign_chunk, None, messages, executor, chunk_size)
+
+    @staticmethod
+    def __many(process_chunk, mode, messages, executor, chunk_size):
+        """
+        Process messages in calling thread or in chunks on executor
+
+        :param process_chunk: Callable process_chunk(mode, messages) returning list
+        :return list: Processed messages in order
+        """
+
+        if executor is None or len(messages) <= chunk_size:
+            return process_chunk(mode, messages)
+
+        chunks = [messages[index:index + chunk_size]
+                  for index in range(0, len(messages), chunk_size)]
+        results = executor.map(lambda chunk: process_chunk(mode, chunk), chunks)
+        return [message for result in results for message in result]
+
+    def __encrypt_chunk(self, mode, messages):
+        """
+        Encrypt messages
+        """
+
+        if self.__key is None or mode not in (self.CRYPTO_MODE_AES,) + self.AEAD_MODES:
+            prefix = Tag.CRYPTO.ENCRYPTED + self.CRYPTO_MODE_NONE
+            return [prefix + message for message in messages]
+
+        if mode in self.AEAD_MODES:
+            return [self.encrypt(mode, message) for message in messages]
+
+        # CFB state advances with every message, every message needs its own cipher
+        new, key, cfb, iv = AES.new, self.__key, AES.MODE_CFB, self.__iv
+        prefix = Tag.CRYPTO.ENCRYPTED + mode
+        return [prefix + new(key, cfb, iv).encrypt(message) for message in messages]
+
+    def __decrypt_chunk(self, mode, messages):
+        """
+        Decrypt messages
+        """
+
+        if self.__key is None or self.__mode in self.AEAD_MODES:
+            return [self.decrypt(message) for message in messages]
+
+        # Decrypting the IV as ciphertext brings CFB state back to the IV, so one cipher
+        # decrypts all AES messages in one call: IV, message, IV, message...
+        cfb = [index for index, message in enumerate(messages)
+               if message[1:2] == self.CRYPTO_MODE_AES]
+        result = [None] * len(messages)
+        if cfb:
+            iv = self.__iv
+            plain = AES.new(self.__key, AES.MODE_CFB, iv).decrypt(
+                b''.join([iv + messages[index][2:] for index in cfb]))
+            offset = 0
+            for index in cfb:
+                start = offset + 16
+                offset = start + len(messages[index]) - 2
+                result[index] = plain[start:offset]
+        return result
+
+    def __sign_chunk(self, mode, messages):
+        """
+        Sign messages
+        """
+
+        if self.__key is None or mode != self.SIGN_MODE_SHA1:
+            prefix = Tag.CRYPTO.SIGNED + self.SIGN_MODE_NONE
+            return [prefix + message for message in messages]
+
+        prefix = Tag.CRYPTO.SIGNED + mode
+        result = []
+        for message in messages:
+            mac = self.__hmac.copy()
+            mac.update(message)
+            result.append(prefix + message + mac.digest())
+        return result
+
+    def __unsign_chunk(self, mode, messages):
+        """
+        Unsign messages
+        """
+
+        if self.__key is None:
+            return [self.unsign(message) for message in messages]
+
+        length = self.__SIGN_SHA1_LENGTH
+        result = []
+        for message in messages:
+            if len(message) < 2 or message[1:2] != self.SIGN_MODE_SHA1:
+                result.append(None)
+                continue
+            message_end = len(message) - length
+            useful_message = message[2:message_end]
+            mac = self.__hmac.copy()
+            mac.update(useful_message)
+            result.append(useful_message if mac.digest() == message[message_end:] else None)
+        return result
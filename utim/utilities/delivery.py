@@ -0,0 +1,305 @@
+"""
+Delivery module
+
+Helpers of the ConnManagerMQTT delivery protocol
+
+Frames are tagged with the first byte:
+    - 0x01: message, id (2 bytes) and message
+    - 0x02: ack of one message, id (2 bytes)
+    - 0x03: selective ack, first id (2 bytes) and bitmap of acknowledged ids: bit n of the
+    bitmap (least significant bit of each byte first) acknowledges id first + n
+    - 0x04: message of a session, session (4 bytes), id (2 bytes) and message. The session is
+    random per sending connection, so ids of a restarted sender are not taken for
+    retransmissions of the previous one
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+SELECTIVE_ACK = b'\x03'
+SESSION_MESSAGE = b'\x04'
+SESSION_LENGTH = 4
+# Ids covered by one selective ack frame
+SELECTIVE_ACK_MAX_IDS = 2048
+
+
+class Scheduler(object):
+    """
+    One thread running callbacks at their deadlines
+
+    Pending calls are kept in a heap ordered by deadline, so any number of them costs one
+    thread and one heap entry each.
+    """
+
+    __default = None
+    __default_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Initialization
+        """
+
+        # [deadline, sequence number, callback, args] entries, callback is None when cancelled
+        self.__heap = []
+        self.__cancelled = 0
+        self.__sequence = itertools.count()
+        self.__condition = threading.Condition()
+        self.__running = True
+
+        self.__thread = threading.Thread(
+            target=self.__run,
+            name='THREAD_DELIVERY_SCHEDULER'
+        )
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    @classmethod
+    def default(cls):
+        """
+        Get scheduler shared by all connections of the process
+
+        :return Scheduler:
+        """
+
+        with cls.__default_lock:
+            if cls.__default is None:
+                cls.__default = Scheduler()
+            return cls.__default
+
+    def __len__(self):
+        return len(self.__heap) - self.__cancelled
+
+    def call_later(self, delay, callback, *args):
+        """
+        Schedule callback
+
+        :param float delay: Seconds to wait before the call
+        :param callback: Callback
+        :return list: Handle to cancel the call
+        """
+
+        entry = [time.monotonic() + delay, next(self.__sequence), callback, args]
+        with self.__condition:
+            heapq.heappush(self.__heap, entry)
+            if self.__heap[0] is entry:
+                self.__condition.notify()
+
+        return entry
+
+    def cancel(self, handle):
+        """
+        Cancel scheduled call
+
+        Does nothing if the call has already run or been cancelled.
+
+        :param list handle: Handle returned by call_later()
+        """
+
+        with self.__condition:
+            if handle[2] is None:
+                return
+            handle[2] = None
+            handle[3] = None
+            self.__cancelled += 1
+
+            # Drop cancelled entries once they are the majority of the heap
+            if self.__cancelled > len(self.__heap) // 2:
+                self.__heap = [entry for entry in self.__heap if entry[2] is not None]
+                heapq.heapify(self.__heap)
+                self.__cancelled = 0
+
+    def __run(self):
+        """
+        Run due callbacks
+        """
+
+        while True:
+            with self.__condition:
+                while self.__running:
+                    if not self.__heap:
+                        self.__condition.wait()
+                        continue
+
+                    entry = self.__heap[0]
+                    if entry[2] is None:
+                        heapq.heappop(self.__heap)
+                        self.__cancelled -= 1
+                        continue
+
+                    timeout = entry[0] - time.monotonic()
+                    if timeout <= 0:
+                        heapq.heappop(self.__heap)
+                        break
+
+                    self.__condition.wait(timeout)
+
+                if not self.__running:
+                    break
+
+                callback, args = entry[2], entry[3]
+                # Mark as done, later cancel() is a no-op
+                entry[2] = None
+                entry[3] = None
+
+            try:
+                callback(*args)
+            except Exception as ex:
+                logging.exception("Scheduled call error: %s", ex)
+
+        logging.info("Stopping scheduler..")
+
+    def stop(self):
+        """
+        Stop, pending calls are dropped
+        """
+
+        with self.__condition:
+            self.__running = False
+            self.__condition.notify()
+
+        self.__thread.join()
+
+
+class ReceiveWindow(object):
+    """
+    Sliding window of message ids received from one sender
+
+    Ids are 16-bit serial numbers. The window remembers which of the last size ids before the
+    highest one received were seen, so retransmissions of them are recognized as duplicates.
+    An id far behind the window or a new session of the sender means the sender restarted its
+    numbering, the window is re-anchored on it.
+    """
+
+    DEFAULT_SIZE = 1024
+
+    __MODULO = 65536
+    __HALF = 32768
+
+    def __init__(self, size=DEFAULT_SIZE):
+        """
+        Initialization
+
+        :param int size: Number of ids remembered (less than 32768)
+        """
+
+        if not 0 < size < self.__HALF:
+            raise ValueError('size must be in 1..32767')
+
+        self.__size = size
+        self.__mask = (1 << size) - 1
+        self.__top = None
+        self.__session = None
+        # Bit n is set if id top - n was received
+        self.__bitmap = 0
+        self.__duplicates = 0
+
+    @property
+    def duplicates(self):
+        """
+        Number of duplicates recognized
+        """
+
+        return self.__duplicates
+
+    def accept(self, id, session=None):
+        """
+        Register received id
+
+        :param int id: Message id
+        :param bytes session: Sender session (None for messages without session)
+        :return bool: True if id is new, False if it is a duplicate
+        """
+
+        if self.__top is None or session != self.__session:
+            self.__session = session
+            self.__anchor(id)
+            return True
+
+        # Signed serial number distance from top
+        distance = (id - self.__top + self.__HALF) % self.__MODULO - self.__HALF
+
+        if distance > 0:
+            if distance < self.__size:
+                self.__bitmap = ((self.__bitmap << distance) | 1) & self.__mask
+            else:
+                self.__bitmap = 1
+            self.__top = id
+            return True
+
+        if -distance >= self.__size:
+            self.__anchor(id)
+            return True
+
+        mask = 1 << -distance
+        if self.__bitmap & mask:
+            self.__duplicates += 1
+            return False
+
+        self.__bitmap |= mask
+        return True
+
+    def __anchor(self, id):
+        """
+        Restart window at id
+
+        :param int id: Message id
+        """
+
+        self.__top = id
+        self.__bitmap = 1
+
+
+def assemble_selective_acks(ids):
+    """
+    Build selective ack frames acknowledging ids
+
+    :param list ids: Message ids
+    :return list: Frames
+    """
+
+    if not ids:
+        return []
+
+    # Signed serial distances from the first id, so a batch may cross the id wrap
+    first = ids[0]
+    offsets = sorted(set((id - first + 32768) % 65536 - 32768 for id in ids))
+
+    frames = []
+    index = 0
+    while index < len(offsets):
+        base = offsets[index]
+        last = index
+        while last + 1 < len(offsets) and offsets[last + 1] - base < SELECTIVE_ACK_MAX_IDS:
+            last += 1
+
+        bitmap = bytearray((offsets[last] - base) // 8 + 1)
+        for offset in offsets[index:last + 1]:
+            bit = offset - base
+            bitmap[bit >> 3] |= 1 << (bit & 7)
+
+        frames.append(SELECTIVE_ACK + ((first + base) % 65536).to_bytes(2, 'big') + bytes(bitmap))
+        index = last + 1
+
+    return frames
+
+
+def parse_selective_ack(frame):
+    """
+    Get ids acknowledged by selective ack frame
+
+    :param bytes frame: Frame
+    :return list: Message ids
+    """
+
+    start = int.from_bytes(frame[1:3], 'big')
+    ids = []
+    for index, byte in enumerate(frame[3:]):
+        if byte:
+            for bit in range(8):
+                if byte >> bit & 1:
+                    ids.append((start + index * 8 + bit) % 65536)
+
+    return ids
@@ -0,0 +1,43 @@
+"""
+Message module
+"""
+
+
+class Message(object):
+    """
+    Message passed through subprocessors and workers
+    """
+
+    __slots__ = ('source', 'destination', 'status', 'body')
+
+    def __init__(self, source, destination, status, body):
+        """
+        Initialization
+
+        :param int source: Source address
+        :param int destination: Destination address
+        :param int status: Processing status
+        :param body: Message body
+        """
+
+        self.source = source
+        self.destination = destination
+        self.status = status
+        self.body = body
+
+    def update(self, source, destination, status, body):
+        """
+        Set all fields at once
+
+        :return Message: self
+        """
+
+        self.source = source
+        self.destination = destination
+        self.status = status
+        self.body = body
+        return self
+
+    def __repr__(self):
+        return 'Message({0}, {1}, {2}, {3!r})'.format(self.source, self.destination, self.status,
+                                                      self.body)
@@ -7,7 +7,7 @@ from ..workers import device_worker_forward
 from ..workers import device_worker_startup
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
+from ..utilities.exceptions import UtimUncallableCallbackError
 
 
 class ProcessDevice(object):
@@ -15,6 +15,34 @@ class ProcessDevice(object):
     Subprocessor for device messages
     """
 
+    # Workers by command tag value
+    _workers = {}
+
+    @classmethod
+    def register_worker(cls, command, worker):
+        """
+        Register worker for device command
+
+        :param bytes command: Command tag
+        :param worker: Callable worker(utim, data) returning processed Message
+        :raise: UtimUncallableCallbackError
+        """
+
+        if not callable(worker):
+            raise UtimUncallableCallbackError()
+
+        cls._workers[ord(command)] = worker
+
+    @classmethod
+    def unregister_worker(cls, command):
+        """
+        Unregister worker of device command
+
+        :param bytes command: Command tag
+        """
+
+        cls._workers.pop(ord(command), None)
+
     def __init__(self, utim):
         """
         Initialization of subprocessor for device messages
@@ -25,26 +53,29 @@ class ProcessDevice(object):
     def process(self, data):
         """
         Process device message
-        :param data: array [source, destination, status, body]
-        :return: same as input
+        :param Message data: Message
+        :return Message: Processed message
         """
 
         # Placeholder for data being processed, that will be returned one day
         res = data
 
-        while (res[SubprocessorIndex.status.value] is not Status.STATUS_TO_SEND and
-               res[SubprocessorIndex.status.value] is not Status.STATUS_FINALIZED and
-               res[SubprocessorIndex.source.value] is Address.ADDRESS_DEVICE):
-            command = res[SubprocessorIndex.body.value][0:1]
-            if command == Tag.INBOUND.DATA_TO_PLATFORM:
-                res = device_worker_forward.process(self.__utim, res)
-            elif command == Tag.INBOUND.NETWORK_READY:
-                res = device_worker_startup.process(self.__utim, res)
+        workers = self._workers
+        while (res.status is not Status.STATUS_TO_SEND and
+               res.status is not Status.STATUS_FINALIZED and
+               res.source is Address.ADDRESS_DEVICE):
+            body = res.body
+            worker = workers.get(body[0]) if body else None
+            if worker is not None:
+                res = worker(self.__utim, res)
             else:
-                res[SubprocessorIndex.status.value] = Status.STATUS_FINALIZED
+                res.status = Status.STATUS_FINALIZED
 
-            if (res[SubprocessorIndex.status.value] is Status.STATUS_TO_SEND or
-                    res[SubprocessorIndex.status.value] is Status.STATUS_FINALIZED):
+            if res.status is Status.STATUS_TO_SEND or res.status is Status.STATUS_FINALIZED:
                 break
 
         return res
+
+
+ProcessDevice.register_worker(Tag.INBOUND.DATA_TO_PLATFORM, device_worker_forward.process)
+ProcessDevice.register_worker(Tag.INBOUND.NETWORK_READY, device_worker_startup.process)
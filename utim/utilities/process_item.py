@@ -10,7 +10,8 @@ from .status import Status
 from . import process_device
 from . import process_uhost
 from . import process_platform
-from .data_indexes import ProcessorIndex, SubprocessorIndex
+from .message import Message
+from .timeout import Timeout
 
 
 class ProcessItemException(Exception):
@@ -34,17 +35,20 @@ class ProcessItem(object):
     Process Item class
     """
 
-    def __init__(self, utim, in_queue, out_queue):
+    def __init__(self, utim, in_queue=None, out_queue=None):
         """
         Initialization
 
+        Queues are needed by run() only. Without them items are processed by calling process().
+
         :param Utim utim: Utim instance
         :param Queue in_queue: Inbound queue
         :param Queue out_queue: Outbound queue
         """
 
         # Check input parameters
-        if not (isinstance(in_queue, queue.Queue) and isinstance(out_queue, queue.Queue)):
+        if not ((in_queue is None and out_queue is None) or
+                (isinstance(in_queue, queue.Queue) and isinstance(out_queue, queue.Queue))):
             raise InputParametersException()
 
         # Set utim
@@ -67,26 +71,21 @@ class ProcessItem(object):
 
         logging.info("Process Item is initialized!")
 
-    def __process(self, data):
+    def process(self, data):
         """
-        Inbound data processing and
+        Inbound data processing
 
-        :param list data: Data to process [Source, Body]
-        :return list: Processed data
+        :param tuple data: Data to process (source, body)
+        :return tuple: Processed data
         """
 
-        source = data[ProcessorIndex.address.value]
-        destination = Address.ADDRESS_UTIM
-        status = Status.STATUS_PROCESS
-        body = data[ProcessorIndex.body.value]
+        source, body = data
 
-        # [From, To, Status, Message]
-        data_to_process = [source, destination, status, body]
+        data_to_process = Message(source, Address.ADDRESS_UTIM, Status.STATUS_PROCESS, body)
         logging.info("Data TO PROCESS {}".format(data_to_process))
 
         address = source
-        while data_to_process[SubprocessorIndex.status.value] not in\
-                (Status.STATUS_TO_SEND, Status.STATUS_FINALIZED):
+        while data_to_process.status not in (Status.STATUS_TO_SEND, Status.STATUS_FINALIZED):
             if address == Address.ADDRESS_DEVICE:
                 data_to_process = self.__device.process(data_to_process)
 
@@ -96,14 +95,14 @@ class ProcessItem(object):
             elif address == Address.ADDRESS_PLATFORM:
                 data_to_process = self.__platform.process(data_to_process)
 
-            if isinstance(data_to_process, list) and len(data_to_process) == 4:
-                if (data_to_process[SubprocessorIndex.source.value] == Address.ADDRESS_UTIM and
-                        data_to_process[SubprocessorIndex.destination.value] != Address.ADDRESS_UTIM):
-                    address = data_to_process[SubprocessorIndex.destination.value]
+            if isinstance(data_to_process, Message):
+                if (data_to_process.source == Address.ADDRESS_UTIM and
+                        data_to_process.destination != Address.ADDRESS_UTIM):
+                    address = data_to_process.destination
 
-                elif (data_to_process[SubprocessorIndex.source.value] != Address.ADDRESS_UTIM and
-                      data_to_process[SubprocessorIndex.destination.value] == Address.ADDRESS_UTIM):
-                    address = data_to_process[SubprocessorIndex.source.value]
+                elif (data_to_process.source != Address.ADDRESS_UTIM and
+                      data_to_process.destination == Address.ADDRESS_UTIM):
+                    address = data_to_process.source
 
                 else:
                     data_to_process = self.__error_handler(data_to_process)
@@ -119,16 +118,13 @@ class ProcessItem(object):
         Assemble answer
 
         :param data: Data
-        :return list|None:
+        :return tuple|None: (destination, body)
         """
 
-        if isinstance(data, list) and len(data) == 4:
-            if (data[SubprocessorIndex.destination.value] is not Address.ADDRESS_UTIM and
-                    data[SubprocessorIndex.status.value] is not Status.STATUS_FINALIZED):
-                return [
-                    data[SubprocessorIndex.destination.value],
-                    data[SubprocessorIndex.body.value]
-                ]
+        if isinstance(data, Message):
+            if (data.destination is not Address.ADDRESS_UTIM and
+                    data.status is not Status.STATUS_FINALIZED):
+                return data.destination, data.body
 
         if data is not None:
             logging.error("Invalid data to return: %s %s", type(data), str(data))
@@ -138,8 +134,13 @@ class ProcessItem(object):
     def run(self):
         """
         Run
+
+        :raise: InputParametersException if item has no queues
         """
 
+        if self.__inbound_queue is None:
+            raise InputParametersException()
+
         self.__run_event.set()
 
         self.__run_thread = threading.Thread(
@@ -156,8 +157,8 @@ class ProcessItem(object):
 
         while self.__run_event.is_set():
             try:
-                data = self.__inbound_queue.get_nowait()
-                res = self.__process(data)
+                data = self.__inbound_queue.get(timeout=Timeout.QUEUE_WAIT)
+                res = self.process(data)
                 if res:
                     while not self.__put_data(res):
                         pass
@@ -201,8 +202,8 @@ class ProcessItem(object):
 
         logging.error("Item processing error: %s", str(data))
 
-        if isinstance(data, list) and len(data) == 4:
-            data[SubprocessorIndex.status.value] = Status.STATUS_FINALIZED
+        if isinstance(data, Message):
+            data.status = Status.STATUS_FINALIZED
             return data
 
         return None
@@ -15,9 +15,9 @@ from ..workers import utim_worker_decrypt
 from ..workers import utim_worker_sign
 from ..workers import utim_worker_unsign
 from ..workers import utim_worker_keepalive
-from ..utilities.data_indexes import SubprocessorIndex
 from ..utilities.address import Address
 from ..utilities.status import Status
+from ..utilities.exceptions import UtimUncallableCallbackError
 
 
 class ProcessUhost(object):
@@ -25,6 +25,34 @@ class ProcessUhost(object):
     Subprocessor for uhost messages
     """
 
+    # Workers by command tag value
+    _workers = {}
+
+    @classmethod
+    def register_worker(cls, command, worker):
+        """
+        Register worker for uhost command
+
+        :param bytes command: Command tag
+        :param worker: Callable worker(utim, data) returning processed Message
+        :raise: UtimUncallableCallbackError
+        """
+
+        if not callable(worker):
+            raise UtimUncallableCallbackError()
+
+        cls._workers[ord(command)] = worker
+
+    @classmethod
+    def unregister_worker(cls, command):
+        """
+        Unregister worker of uhost command
+
+        :param bytes command: Command tag
+        """
+
+        cls._workers.pop(ord(command), None)
+
     def __init__(self, utim):
         """
         Initialization of subprocessor for uhost messages
@@ -35,49 +63,47 @@ class ProcessUhost(object):
     def process(self, data):
         """
         Process uhost message
-        :param data: array [source, destination, status
-        :return: same as input
+        :param Message data: Message
+        :return Message: Processed message
         """
 
         res = data
 
         logging.info('Data to decipher: {}'.format(res))
 
-        if (res[SubprocessorIndex.source.value] is Address.ADDRESS_UHOST and
-                res[SubprocessorIndex.status.value] is Status.STATUS_PROCESS):
+        # Authenticated encryption of the session needs no signature
+        if (res.source is Address.ADDRESS_UHOST and res.status is Status.STATUS_PROCESS
+                and not self.__utim.get_crypto().is_aead):
             res = utim_worker_unsign.process(self.__utim, res)
-        if (res[SubprocessorIndex.source.value] is Address.ADDRESS_UHOST and
-                res[SubprocessorIndex.status.value] is Status.STATUS_PROCESS):
+        if res.source is Address.ADDRESS_UHOST and res.status is Status.STATUS_PROCESS:
             res = utim_worker_decrypt.process(self.__utim, res)
 
         logging.info('Data after deciphering: {}'.format(res))
 
-        while (res[SubprocessorIndex.status.value] is not Status.STATUS_TO_SEND and
-               res[SubprocessorIndex.status.value] is not Status.STATUS_FINALIZED and
-               res[SubprocessorIndex.source.value] is Address.ADDRESS_UHOST):
-            command = res[SubprocessorIndex.body.value][0:1]
-            if command == Tag.UCOMMAND.TRY_FIRST:
-                res = utim_worker_try.process(self.__utim, res)
-            elif command == Tag.UCOMMAND.INIT:
-                res = utim_worker_init.process(self.__utim, res)
-            elif command == Tag.UCOMMAND.CONNECTION_STRING:
-                res = utim_worker_connection_string.process(self.__utim, res)
-            elif command == Tag.UCOMMAND.TEST_PLATFORM_DATA:
-                res = utim_worker_platform_verify.process(self.__utim, res)
-            elif command == Tag.UCOMMAND.AUTHENTIC:
-                res = utim_worker_authentic.process(self.__utim, res)
-            elif command == Tag.UCOMMAND.ERROR:
-                res = utim_worker_error.process(self.__utim, res)
-
-            elif command == Tag.UCOMMAND.KEEPALIVE:
-                res = utim_worker_keepalive.process(self.__utim, res)
-
+        workers = self._workers
+        while (res.status is not Status.STATUS_TO_SEND and
+               res.status is not Status.STATUS_FINALIZED and
+               res.source is Address.ADDRESS_UHOST):
+            body = res.body
+            worker = workers.get(body[0]) if body else None
+            if worker is not None:
+                res = worker(self.__utim, res)
             else:
-                res[SubprocessorIndex.status.value] = Status.STATUS_FINALIZED
+                res.status = Status.STATUS_FINALIZED
 
-        if (res[SubprocessorIndex.destination.value] == Address.ADDRESS_UHOST
-                and res[SubprocessorIndex.status.value] == Status.STATUS_PROCESS):
+        if (res.destination == Address.ADDRESS_UHOST
+                and res.status == Status.STATUS_PROCESS):
             res = utim_worker_encrypt.process(self.__utim, res)
-            res = utim_worker_sign.process(self.__utim, res)
+            if res.status == Status.STATUS_PROCESS:
+                res = utim_worker_sign.process(self.__utim, res)
 
         return res
+
+
+ProcessUhost.register_worker(Tag.UCOMMAND.TRY_FIRST, utim_worker_try.process)
+ProcessUhost.register_worker(Tag.UCOMMAND.INIT, utim_worker_init.process)
+ProcessUhost.register_worker(Tag.UCOMMAND.CONNECTION_STRING, utim_worker_connection_string.process)
+ProcessUhost.register_worker(Tag.UCOMMAND.TEST_PLATFORM_DATA, utim_worker_platform_verify.process)
+ProcessUhost.register_worker(Tag.UCOMMAND.AUTHENTIC, utim_worker_authentic.process)
+ProcessUhost.register_worker(Tag.UCOMMAND.ERROR, utim_worker_error.process)
+ProcessUhost.register_worker(Tag.UCOMMAND.KEEPALIVE, utim_worker_keepalive.process)
@@ -0,0 +1,145 @@
+"""
+Session state of a Utim identity
+
+Workers read and update the state through the getters and setters of UtimSession, which both
+Utim and the identities hosted by UtimGateway extend.
+"""
+
+import logging
+from . import srp
+from .cryptography import CryptoLayer
+
+
+class UtimSession(object):
+    """
+    SRP handshake state, session key with its crypto layer and platform config
+
+    Subclasses provide the SRP username and password with _get_srp_credentials().
+    """
+
+    __slots__ = ('__session_key', '__crypto', '__crypto_mode', '__srp_client', '__srp_step',
+                 '__step_iterations', '__platform_config')
+
+    def __init__(self):
+        """
+        Initialization
+        """
+
+        # Session key of this session and its crypto layer
+        self.__session_key = None
+        self.__crypto = CryptoLayer(None)
+        self.__crypto_mode = CryptoLayer.CRYPTO_MODE_AES
+
+        # SRP client, its ephemeral is taken from the pool started by the owner of the session
+        self.__srp_client = None
+        # Utim SRP auth step
+        self.__srp_step = None
+        self.__step_iterations = 10
+
+        # Platform config
+        self.__platform_config = None
+
+    def _get_srp_credentials(self):
+        """
+        Get SRP username and password
+
+        :return tuple: (bytes username, bytes password)
+        """
+
+        raise NotImplementedError
+
+    def set_platform_config(self, config_string):
+        """
+        Set platform id
+        """
+        try:
+            self.__platform_config = dict(config_string)
+        except ValueError:
+            logging.error('Error setting platform config')
+
+    def get_platform_config(self):
+        """
+        Get platform id
+        """
+        return self.__platform_config
+
+    def get_srp_step(self):
+        """
+        Get SRP step
+        """
+
+        return self.__srp_step
+
+    def set_srp_step(self, step):
+        """
+        Set SRP step, the next handshake after reset to None uses a new SRP client
+        """
+
+        self.__srp_step = step
+        if step is None:
+            self.__srp_client = None
+
+    def get_srp_iterations(self):
+        """
+        Get SRP iterations
+        """
+
+        return self.__step_iterations
+
+    def set_srp_iterations(self, iteration):
+        """
+        Set SRP iterations
+        """
+
+        self.__step_iterations = iteration
+
+    def get_session_key(self):
+        """
+        Get session key
+        """
+
+        return self.__session_key
+
+    def set_session_key(self, key):
+        """
+        Set session key
+        """
+
+        self.__session_key = key
+        self.__crypto = CryptoLayer(key, self.__crypto_mode)
+
+    def set_crypto_mode(self, mode):
+        """
+        Set crypto mode of Uhost messages, takes effect with the next session key
+
+        With CRYPTO_MODE_AES_GCM or CRYPTO_MODE_CHACHA20_POLY1305 messages are protected by
+        authenticated encryption instead of AES-CFB and HMAC signature. Uhost must use the
+        same mode.
+
+        :param bytes mode: CryptoLayer.CRYPTO_MODE_AES or one of CryptoLayer.AEAD_MODES
+        :raise: ValueError
+        """
+
+        if mode not in CryptoLayer.SESSION_MODES.values():
+            raise ValueError('Unsupported session crypto mode {0}'.format(mode))
+        self.__crypto_mode = mode
+
+    def get_crypto(self):
+        """
+        Get crypto layer of the session key
+        """
+
+        return self.__crypto
+
+    def get_srp_client(self):
+        """
+        Get SRP client
+        """
+
+        if self.__srp_client is None:
+            username, password = self._get_srp_credentials()
+            logging.debug("Create new SRP User for %s", username)
+            self.__srp_client = srp.User(username, password,
+                                         ephemeral=srp.EphemeralPool.get().pop())
+
+        return self.__srp_client
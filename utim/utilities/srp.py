@@ -13,10 +13,14 @@
 # x    Private key (derived from p and s)
 # v    Password verifier
 
+import collections
 import hashlib
+import logging
 import os
 import binascii
+import threading
 import six
+from . import bigint
 
 SHA256 = 0
 
@@ -42,24 +46,115 @@ def get_ng(ng_type, n_hex, g_hex):
     return int(n_hex, 16), int(g_hex, 16)
 
 
+class FixedBaseTable(object):
+    """
+    Windowed fixed-base exponentiation table of g modulo N
+
+    Row i holds g^(d * 2^(window * i)) mod N for every window digit d, so g^e mod N is the
+    product of one entry per window of e: about bits / window modular multiplications instead
+    of a square and multiply per bit. Exponents wider than bits fall back to powmod() of the
+    backend. Entries are numbers of the big integer backend selected when the table is built.
+    """
+
+    DEFAULT_BITS = 256
+    DEFAULT_WINDOW = 6
+
+    def __init__(self, N, g, bits=DEFAULT_BITS, window=DEFAULT_WINDOW):
+        self.N = N
+        self.g = g
+        self.backend = bigint.get_backend()
+        self.__window = window
+        self.__mask = (1 << window) - 1
+        self.__limit = 1 << (-(-bits // window) * window)
+
+        self.__rows = []
+        self.__modulus = N = self.backend.mpz(N)
+        base = self.backend.mpz(g) % N
+        for _ in range(-(-bits // window)):
+            row = [1] * (1 << window)
+            power = 1
+            for digit in range(1, 1 << window):
+                power = power * base % N
+                row[digit] = power
+            self.__rows.append(row)
+            # g^(2^(window * (i + 1)))
+            base = power * base % N
+
+    def pow(self, e):
+        """
+        g^e mod N
+        """
+
+        if not 0 <= e < self.__limit:
+            return self.backend.powmod(self.g, e, self.N)
+
+        N = self.__modulus
+        mask = self.__mask
+        window = self.__window
+        result = 1
+        for row in self.__rows:
+            if not e:
+                break
+            digit = e & mask
+            if digit:
+                result = result * row[digit] % N
+            e >>= window
+        return self.backend.to_int(result % N)
+
+
+class Group(object):
+    """
+    Group context of N and g, shared by all SRP users and verifiers of the process
+    """
+
+    __groups = {}
+    __lock = threading.Lock()
+
+    def __init__(self, N, g):
+        self.N = N
+        self.g = g
+        self.__table = None
+        self.__table_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, ng_type, n_hex=None, g_hex=None):
+        """
+        Get group context
+
+        :return Group:
+        """
+
+        N, g = get_ng(ng_type, n_hex, g_hex)
+        with cls.__lock:
+            group = cls.__groups.get((N, g))
+            if group is None:
+                group = cls(N, g)
+                cls.__groups[(N, g)] = group
+        return group
+
+    def pow_g(self, e):
+        """
+        g^e mod N with fixed-base table, the table is built on the first call and again after
+        the big integer backend is changed
+        """
+
+        table = self.__table
+        if table is None or table.backend is not bigint.get_backend():
+            with self.__table_lock:
+                table = self.__table
+                if table is None or table.backend is not bigint.get_backend():
+                    self.__table = FixedBaseTable(self.N, self.g)
+                table = self.__table
+        return table.pow(e)
+
+
 def bytes_to_long(s):
-    n = 0
-    for b in six.iterbytes(s):
-        n = (n << 8) | b
-    return n
+    return int.from_bytes(s, 'big')
 
 
 def long_to_bytes(n):
-    l = list()
-    x = 0
-    off = 0
-    while x != n:
-        b = (n >> off) & 0xFF
-        l.append(chr(b))
-        x = x | (b << off)
-        off += 8
-    l.reverse()
-    return six.b(''.join(l))
+    # Shortest big-endian encoding, b'' for 0
+    return n.to_bytes((n.bit_length() + 7) // 8, 'big')
 
 
 def get_random(nbytes):
@@ -78,7 +173,7 @@ def H(hash_class, *args, **kwargs):
         if s is not None:
             h.update(long_to_bytes(s) if isinstance(s, six.integer_types) else s)
 
-    return int(h.hexdigest(), 16)
+    return int.from_bytes(h.digest(), 'big')
 
 
 # N = 0xAC6BDB41324A9A9BF166DE5E1389582FAF72B6651987EE07FC3192943DB56050A37329CBB4A099ED8193E075776\
@@ -104,25 +199,206 @@ def gen_x(hash_class, salt, username, password):
     return H(hash_class, salt, H(hash_class, (username + b':' + password)))
 
 
+class GroupContext(object):
+    """
+    Values of a group and hash function shared by all handshakes: k = H(N, g) and
+    H(N) xor H(g) of M. Contexts are cached and not changed after creation.
+    """
+
+    __slots__ = ('group', 'N', 'g', 'hash_class', 'k', 'hnxorg')
+    __contexts = {}
+    __lock = threading.Lock()
+
+    def __init__(self, group, hash_class):
+        self.group = group
+        self.N = group.N
+        self.g = group.g
+        self.hash_class = hash_class
+        self.k = H(hash_class, group.N, group.g)
+        self.hnxorg = HNxorg(hash_class, group.N, group.g)
+
+    @classmethod
+    def get(cls, hash_alg, ng_type, n_hex=None, g_hex=None):
+        """
+        Get group context
+
+        :return GroupContext:
+        """
+
+        group = Group.get(ng_type, n_hex, g_hex)
+        hash_class = _hash_map[hash_alg]
+        with cls.__lock:
+            context = cls.__contexts.get((group, hash_class))
+            if context is None:
+                context = cls(group, hash_class)
+                cls.__contexts[(group, hash_class)] = context
+        return context
+
+
+class Identity(object):
+    """
+    Hash H(I) of a username used in M of every handshake of the identity. Identities are cached
+    and not changed after creation. Passwords are not cached: H(I:p) of x is computed by every
+    handshake.
+    """
+
+    __slots__ = ('hash_class', 'username', 'hash_I')
+    __identities = collections.OrderedDict()
+    __lock = threading.Lock()
+
+    MAX_CACHED = 1024
+
+    def __init__(self, hash_class, username):
+        self.hash_class = hash_class
+        self.username = username
+        self.hash_I = hash_class(username).digest()
+
+    @classmethod
+    def get(cls, hash_class, username):
+        """
+        Get identity, the least recently used identities are dropped above MAX_CACHED
+
+        :return Identity:
+        """
+
+        key = (hash_class, username)
+        with cls.__lock:
+            identity = cls.__identities.get(key)
+            if identity is None:
+                identity = cls(hash_class, username)
+                cls.__identities[key] = identity
+                if len(cls.__identities) > cls.MAX_CACHED:
+                    cls.__identities.popitem(last=False)
+            else:
+                cls.__identities.move_to_end(key)
+        return identity
+
+    @classmethod
+    def discard(cls, username):
+        """
+        Drop cached identities of username
+
+        :param bytes username: Username
+        """
+
+        with cls.__lock:
+            for key in [key for key in cls.__identities if key[1] == username]:
+                del cls.__identities[key]
+
+    @classmethod
+    def clear(cls):
+        """
+        Drop all cached identities
+        """
+
+        with cls.__lock:
+            cls.__identities.clear()
+
+
+class EphemeralPool(object):
+    """
+    Pool of precomputed client ephemerals (a, A = g^a mod N) of a group
+
+    A background thread fills the pool when it is created and after every pop(), so a client
+    starting a handshake takes a ready ephemeral instead of running the modular exponentiation.
+    Pools are shared by all clients of the group in the process.
+    """
+
+    DEFAULT_SIZE = 2
+
+    __pools = {}
+    __lock = threading.Lock()
+
+    def __init__(self, group, size=DEFAULT_SIZE):
+        self.__group = group
+        self.__size = size
+        self.__ephemerals = collections.deque()
+        self.__refill = threading.Event()
+        self.__refill.set()
+
+        thread = threading.Thread(target=self.__fill, name='THREAD_SRP_EPHEMERALS')
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def get(cls, ng_type=NG_1024, n_hex=None, g_hex=None, size=DEFAULT_SIZE):
+        """
+        Get pool of the group, an existing pool grows to size
+
+        :return EphemeralPool:
+        """
+
+        group = Group.get(ng_type, n_hex, g_hex)
+        with cls.__lock:
+            pool = cls.__pools.get(group)
+            if pool is None:
+                pool = cls(group, size)
+                cls.__pools[group] = pool
+            elif size > pool.__size:
+                pool.__size = size
+                pool.__refill.set()
+        return pool
+
+    def __len__(self):
+        return len(self.__ephemerals)
+
+    def pop(self):
+        """
+        Take ephemeral, computed at once if the pool is empty
+
+        :return tuple: (a, A)
+        """
+
+        try:
+            ephemeral = self.__ephemerals.popleft()
+        except IndexError:
+            ephemeral = None
+        self.__refill.set()
+
+        if ephemeral is None:
+            logging.debug("SRP ephemeral pool is empty")
+            ephemeral = new_ephemeral(self.__group)
+        return ephemeral
+
+    def __fill(self):
+        while True:
+            self.__refill.wait()
+            self.__refill.clear()
+            while len(self.__ephemerals) < self.__size:
+                self.__ephemerals.append(new_ephemeral(self.__group))
+
+
+def new_ephemeral(group):
+    """
+    New client ephemeral of the group
+
+    :return tuple: (a, A)
+    """
+
+    a = get_random_of_length(32)
+    return a, group.pow_g(a)
+
+
 def create_salted_verification_key(username, password, hash_alg=SHA256, ng_type=NG_1024, n_hex=None,
                                    g_hex=None):
     if ng_type == NG_CUSTOM and (n_hex is None or g_hex is None):
         raise ValueError("Both n_hex and g_hex are required when ng_type = NG_CUSTOM")
-    hash_class = _hash_map[hash_alg]
-    N, g = get_ng(ng_type, n_hex, g_hex)
+    group = Group.get(ng_type, n_hex, g_hex)
     _s = long_to_bytes(get_random(4))
     # _s = b'\xc3\x83\xc3\xa8'
-    _v = long_to_bytes(pow(g, gen_x(hash_class, _s, username, password), N))
+    _v = long_to_bytes(group.pow_g(gen_x(_hash_map[hash_alg], _s, username, password)))
 
     return _s, _v
 
 
 def calculate_M(hash_class, N, g, I, s, A, B, K):
+    return _calculate_M(hash_class, HNxorg(hash_class, N, g), hash_class(I).digest(), s, A, B, K)
+
+
+def _calculate_M(hash_class, hnxorg, hash_I, s, A, B, K):
     h = hash_class()
-    hnxorg = HNxorg(hash_class, N, g)
-    # print("HNxorg: {0}".format(hnxorg))
     h.update(hnxorg)
-    h.update(hash_class(I).digest())
+    h.update(hash_I)
     h.update(long_to_bytes(s))
     h.update(long_to_bytes(A))
     h.update(long_to_bytes(B))
@@ -151,9 +427,11 @@ class Verifier(object):
         self.K = None
         self._authenticated = False
 
-        N, g = get_ng(ng_type, n_hex, g_hex)
-        hash_class = _hash_map[hash_alg]
-        k = H(hash_class, N, g)
+        context = GroupContext.get(hash_alg, ng_type, n_hex, g_hex)
+        group = context.group
+        N, g = group.N, group.g
+        hash_class = context.hash_class
+        k = context.k
 
         self.hash_class = hash_class
         self.N = N
@@ -171,11 +449,14 @@ class Verifier(object):
                 self.b = bytes_to_long(bytes_b)
             else:
                 self.b = get_random_of_length(32)
-            self.B = (k * self.v + pow(g, self.b, N)) % N
+            self.B = (k * self.v + group.pow_g(self.b)) % N
             self.u = H(hash_class, self.A, self.B)
-            self.S = pow(self.A * pow(self.v, self.u, N), self.b, N)
+            powmod = bigint.get_backend().powmod
+            self.S = powmod(self.A * powmod(self.v, self.u, N), self.b, N)
             self.K = hash_class(long_to_bytes(self.S)).digest()
-            self.M = calculate_M(hash_class, N, g, self.I, self.s, self.A, self.B, self.K)
+            self.M = _calculate_M(hash_class, context.hnxorg,
+                                  Identity.get(hash_class, username).hash_I, self.s, self.A,
+                                  self.B, self.K)
             self.H_AMK = calculate_H_AMK(hash_class, self.A, self.M, self.K)
 
     def authenticated(self):
@@ -206,22 +487,27 @@ class Verifier(object):
 
 class User(object):
     def __init__(self, username, password, hash_alg=SHA256, ng_type=NG_1024, n_hex=None, g_hex=None,
-                 bytes_a=None):
+                 bytes_a=None, ephemeral=None):
         if ng_type == NG_CUSTOM and (n_hex is None or g_hex is None):
             raise ValueError("Both n_hex and g_hex are required when ng_type = NG_CUSTOM")
         if bytes_a and len(bytes_a) != 32:
             raise ValueError("32 bytes required for bytes_a")
-        N, g = get_ng(ng_type, n_hex, g_hex)
-        hash_class = _hash_map[hash_alg]
-        k = H(hash_class, N, g)
+        context = GroupContext.get(hash_alg, ng_type, n_hex, g_hex)
+        group = context.group
+        N, g = group.N, group.g
+        hash_class = context.hash_class
+        k = context.k
 
         self.I = username
         self.p = password
         if bytes_a:
             self.a = bytes_to_long(bytes_a)
+            self.A = group.pow_g(self.a)
+        elif ephemeral:
+            # (a, A) of the same group, see EphemeralPool
+            self.a, self.A = ephemeral
         else:
-            self.a = get_random_of_length(32)
-        self.A = pow(g, self.a, N)
+            self.a, self.A = new_ephemeral(group)
         self.v = None
         self.M = None
         self.K = None
@@ -229,6 +515,9 @@ class User(object):
         self._authenticated = False
 
         self.hash_class = hash_class
+        self.group = group
+        self.context = context
+        self.identity = Identity.get(hash_class, username)
         self.N = N
         self.g = g
         self.k = k
@@ -272,12 +561,14 @@ class User(object):
 
         self.x = gen_x(hash_class, self.s, self.I, self.p)
 
-        self.v = pow(g, self.x, N)
+        self.v = self.group.pow_g(self.x)
 
-        self.S = pow((self.B - k * self.v), (self.a + self.u * self.x), N)
+        self.S = bigint.get_backend().powmod((self.B - k * self.v) % N,
+                                             self.a + self.u * self.x, N)
 
         self.K = hash_class(long_to_bytes(self.S)).digest()
-        self.M = calculate_M(hash_class, N, g, self.I, self.s, self.A, self.B, self.K)
+        self.M = _calculate_M(hash_class, self.context.hnxorg, self.identity.hash_I, self.s,
+                              self.A, self.B, self.K)
         self.H_AMK = calculate_H_AMK(hash_class, self.A, self.M, self.K)
 
         return self.M
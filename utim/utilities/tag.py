@@ -2,6 +2,8 @@
 Tag module
 """
 
+from . import tlv
+
 
 class TagInbound(object):
     """
@@ -39,12 +41,7 @@ class TagInbound(object):
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.DATA_FROM_NETWORK
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.DATA_FROM_NETWORK, data)
 
         return None
 
@@ -58,6 +55,9 @@ class TagOutbound(object):
     DATA_TO_NETWORK = b'\x2d'
     DATA_TO_SLS = b'\x2e'
 
+    # Constant messages
+    __OK_STATUS_MESSAGE = tlv.assemble(OK_STATUS)
+
     def in_this_scope(self, tag):
         """
         Check tag is in this scope
@@ -82,12 +82,7 @@ class TagOutbound(object):
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.DATA_TO_NETWORK
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.DATA_TO_NETWORK, data)
 
         return None
 
@@ -97,12 +92,7 @@ class TagOutbound(object):
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.DATA_TO_SLS
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.DATA_TO_SLS, data)
 
         return None
 
@@ -111,13 +101,7 @@ class TagOutbound(object):
         Assemble OK status data
         """
 
-        # Get values
-        data = b''
-        tag = self.OK_STATUS
-        length = len(data).to_bytes(2, byteorder='big')
-
-        # Merge values into a message and return
-        return tag + length + data
+        return self.__OK_STATUS_MESSAGE
 
 
 class TagCrypto(object):
@@ -160,18 +144,19 @@ class UCommand(object):
     ERROR = b'\xee'
     DIE = b'\xff'
 
+    # Constant messages
+    __CONNECTION_STRING_SUCCESS_MESSAGE = tlv.assemble(CONNECTION_STRING, CONNECTION_STRING_SUCCESS)
+    __CONNECTION_STRING_ERROR_MESSAGE = tlv.assemble(CONNECTION_STRING, CONNECTION_STRING_ERROR)
+    __VERIFIED_MESSAGE = tlv.assemble(VERIFIED)
+    __AUTHENTIC_MESSAGE = tlv.assemble(AUTHENTIC)
+
     def assemble_test_platform_data(self, data):
         """
         Assemble test platform data command
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.TEST_PLATFORM_DATA
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.TEST_PLATFORM_DATA, data)
 
         return None
 
@@ -180,24 +165,14 @@ class UCommand(object):
         Assemble connection string success command
         """
 
-        # Get values
-        tag = self.CONNECTION_STRING
-        length = len(self.CONNECTION_STRING_SUCCESS).to_bytes(2, byteorder='big')
-
-        # Merge values into a message and return
-        return tag + length + self.CONNECTION_STRING_SUCCESS
+        return self.__CONNECTION_STRING_SUCCESS_MESSAGE
 
     def assemble_connection_string_error(self):
         """
         Assemble connection string error command
         """
 
-        # Get values
-        tag = self.CONNECTION_STRING
-        length = len(self.CONNECTION_STRING_ERROR).to_bytes(2, byteorder='big')
-
-        # Merge values into a message and return
-        return tag + length + self.CONNECTION_STRING_ERROR
+        return self.__CONNECTION_STRING_ERROR_MESSAGE
 
     def assemble_hello(self, data):
         """
@@ -205,12 +180,7 @@ class UCommand(object):
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.HELLO
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.HELLO, data)
 
         return None
 
@@ -220,14 +190,7 @@ class UCommand(object):
         """
 
         if isinstance(data1, (bytes, bytearray)) and isinstance(data2, (bytes, bytearray)):
-            # Get values
-            tag1 = self.TRY_FIRST
-            length1 = len(data1).to_bytes(2, byteorder='big')
-            tag2 = self.TRY_SECOND
-            length2 = len(data2).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag1 + length1 + data1 + tag2 + length2 + data2
+            return tlv.assemble_pair(self.TRY_FIRST, data1, self.TRY_SECOND, data2)
 
         return None
 
@@ -237,12 +200,7 @@ class UCommand(object):
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.CHECK
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.CHECK, data)
 
         return None
 
@@ -252,12 +210,7 @@ class UCommand(object):
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.INIT
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.INIT, data)
 
         return None
 
@@ -267,12 +220,7 @@ class UCommand(object):
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.TRUSTED
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.TRUSTED, data)
 
         return None
 
@@ -282,14 +230,7 @@ class UCommand(object):
         """
 
         if isinstance(data1, (bytes, bytearray)) and isinstance(data2, (bytes, bytearray)):
-            # Get values
-            tag1 = self.SIGNED
-            length1 = len(data1).to_bytes(2, byteorder='big')
-            tag2 = self.SIGNATURE
-            length2 = len(data2).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag1 + length1 + data1 + tag2 + length2 + data2
+            return tlv.assemble_pair(self.SIGNED, data1, self.SIGNATURE, data2)
 
         return None
 
@@ -299,12 +240,7 @@ class UCommand(object):
         """
 
         if isinstance(data, (bytes, bytearray)):
-            # Get values
-            tag = self.ERROR
-            length = len(data).to_bytes(2, byteorder='big')
-
-            # Merge values into a message and return
-            return tag + length + data
+            return tlv.assemble(self.ERROR, data)
 
         return None
 
@@ -313,24 +249,14 @@ class UCommand(object):
         Assemble verified command
         """
 
-        # Get values
-        tag = self.VERIFIED
-        length = (0).to_bytes(2, byteorder='big')
-
-        # Merge values into a message and return
-        return tag + length
+        return self.__VERIFIED_MESSAGE
 
     def assemble_authentic(self):
         """
         Assemble authentic command
         """
 
-        # Get values
-        tag = self.AUTHENTIC
-        length = (0).to_bytes(2, byteorder='big')
-
-        # Merge values into a message and return
-        return tag + length
+        return self.__AUTHENTIC_MESSAGE
 
 
 class Tag(object):
@@ -0,0 +1,2 @@
+class Timeout(object):
+    QUEUE_WAIT = 0.1    # Seconds a processing thread parks on an empty queue before checking stop
@@ -0,0 +1,158 @@
+"""
+TLV module
+
+Record is a tag (1 byte), a length of value (2 bytes, big-endian) and the value
+"""
+
+import struct
+
+HEADER = struct.Struct('>cH')
+HEADER_LENGTH = HEADER.size
+
+_pack_header = HEADER.pack
+_unpack_header = HEADER.unpack_from
+
+
+class TLVException(Exception):
+    """
+    General TLV exception
+    """
+
+    pass
+
+
+class TLVDecodeException(TLVException):
+    """
+    Malformed TLV data exception
+    """
+
+    pass
+
+
+def assemble(tag, value=b''):
+    """
+    Assemble TLV record
+
+    :param bytes tag: Tag
+    :param bytes value: Value
+    :return bytes: Record
+    """
+
+    return _pack_header(tag, len(value)) + value
+
+
+def assemble_pair(tag1, value1, tag2, value2):
+    """
+    Assemble two TLV records into one message
+
+    :param bytes tag1: Tag of first record
+    :param bytes value1: Value of first record
+    :param bytes tag2: Tag of second record
+    :param bytes value2: Value of second record
+    :return bytes: Message
+    """
+
+    return b''.join((_pack_header(tag1, len(value1)), value1, _pack_header(tag2, len(value2)), value2))
+
+
+def _decode_records(view):
+    """
+    Decode complete records from the beginning of view
+
+    :param memoryview view: Data
+    :return tuple: (list of (tag, value) records, offset of first incomplete record,
+    length of first incomplete record or None if its header is incomplete too)
+    """
+
+    records = []
+    offset = 0
+    end = len(view)
+    while end - offset >= HEADER_LENGTH:
+        tag, length = _unpack_header(view, offset)
+        value_end = offset + HEADER_LENGTH + length
+        if value_end > end:
+            return records, offset, HEADER_LENGTH + length
+        records.append((tag, view[offset + HEADER_LENGTH:value_end]))
+        offset = value_end
+
+    return records, offset, None
+
+
+def decode(data):
+    """
+    Decode complete TLV message
+
+    Values are memoryview slices of data, nothing is copied. Nested records are decoded by
+    calling decode() on the value.
+
+    :param bytes|memoryview data: Message
+    :return list: List of (tag, value) records
+    :raises: TLVDecodeException if the last record is incomplete
+    """
+
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    records, offset, _ = _decode_records(view)
+    if offset != len(view):
+        raise TLVDecodeException('{0} bytes of incomplete record'.format(len(view) - offset))
+
+    return records
+
+
+class TLVDecoder(object):
+    """
+    Incremental TLV decoder for byte streams
+
+    Feed data in chunks of any size and get complete records back. Values of records lying
+    in one chunk are memoryview slices of that chunk; only records split between chunks
+    are copied.
+    """
+
+    def __init__(self):
+        """
+        Initialization
+        """
+
+        self.__pending = bytearray()
+        self.__needed = HEADER_LENGTH
+
+    @property
+    def pending(self):
+        """
+        Number of buffered bytes of incomplete record
+        """
+
+        return len(self.__pending)
+
+    def feed(self, data):
+        """
+        Feed data
+
+        :param bytes data: Next chunk of stream
+        :return list: List of (tag, value) records completed by this chunk
+        """
+
+        if self.__pending:
+            self.__pending += data
+            if len(self.__pending) < self.__needed:
+                return []
+            chunk = bytes(self.__pending)
+            self.__pending = bytearray()
+        else:
+            # Views must not see later changes of caller's buffer
+            chunk = bytes(data) if isinstance(data, bytearray) else data
+
+        view = memoryview(chunk)
+        records, offset, needed = _decode_records(view)
+        if offset != len(view):
+            self.__pending += view[offset:]
+        self.__needed = needed if needed is not None else HEADER_LENGTH
+
+        return records
+
+    def reset(self):
+        """
+        Drop buffered incomplete record
+        """
+
+        self.__pending = bytearray()
+        self.__needed = HEADER_LENGTH
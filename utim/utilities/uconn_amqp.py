@@ -4,7 +4,8 @@ UConnAMQP module
 This module implements the AMQP connection and messaging through the RabbitMQ server
 """
 import logging
-import _thread
+import threading
+import time
 import pika
 import pika.connection
 from . import exceptions, config
@@ -15,29 +16,76 @@ class UConnAMQP(object):
     Connection to AMQP class
     """
 
-    def __init__(self):
+    DEFAULT_CONFIRM_BATCH = 0
+    DEFAULT_CONFIRM_INTERVAL_MS = 10
+    DEFAULT_PREFETCH_COUNT = 0
+    DEFAULT_ACK_BATCH = 1
+    DEFAULT_ACK_INTERVAL_MS = 10
+
+    def __init__(self, confirm_batch=DEFAULT_CONFIRM_BATCH,
+                 confirm_interval_ms=DEFAULT_CONFIRM_INTERVAL_MS,
+                 prefetch_count=DEFAULT_PREFETCH_COUNT, ack_batch=DEFAULT_ACK_BATCH,
+                 ack_interval_ms=DEFAULT_ACK_INTERVAL_MS):
         """
         Initialize AMQP connection
 
+        The broker sends at most prefetch_count unacknowledged messages to the consumer
+        (0 - no limit). A delivered message is acknowledged after its callback has returned,
+        with one ack covering all messages delivered before it: the ack is sent after ack_batch
+        messages or ack_interval_ms milliseconds after the first unacknowledged one, whichever
+        comes first. ack_batch should not exceed prefetch_count, otherwise every batch waits
+        for the interval.
+
+        With confirm_batch 0 messages are published outside of transactions. Otherwise they are
+        published on a transactional channel and committed in batches: the transaction is
+        committed when confirm_batch messages are published or confirm_interval_ms milliseconds
+        after the first uncommitted one, whichever comes first. This is transaction batching,
+        not publisher confirms: every commit is a synchronous round trip to the broker, so with
+        small batches it is slower than the publisher confirms of UConnAMQPAsync.
+        While a topic is subscribed the connection belongs to its consuming thread: publish()
+        hands queue declaration, publishing and commit over to that thread and waits for them,
+        and the interval timer runs there. Until then the interval is checked by publish() and
+        the last messages are committed by the next publish() or disconnect().
+
+        :param int confirm_batch: Messages per transaction commit (0 - no transactions)
+        :param float confirm_interval_ms: Maximum milliseconds a message waits for its commit
+        :param int prefetch_count: Maximum unacknowledged messages delivered (0 - no limit)
+        :param int ack_batch: Messages per ack (1 - ack every message)
+        :param float ack_interval_ms: Maximum milliseconds a message waits for its ack
         :raises utim.exceptions.UtimConnectionException: if connection is broken
         """
 
+        self.__config = config.Config()
+
         # Get connection parameters
         self.__username, self.__password, self.__host = self.__get_connection_parameters()
 
-        # SUBSCRIBER
-        self.SUBSCRIBE_QUEUE = None
-        self.SUBSCRIBE_ROUTING_KEY = None
-        self.__callback_object = None
-        self.__callback = None
+        # SUBSCRIBER: consumer tag, callback object and callback by queue
+        self.__subscriptions = {}
 
         # Connection
         self._connection = None
         self._channel = None
-        self._consumer_tag = None
         self._consuming = False
-
-        self.__config = config.Config()
+        self.__consumer_thread = None
+        self.__prefetch_count = prefetch_count
+        self.__ack_batch = max(ack_batch, 1)
+        self.__ack_interval = ack_interval_ms / 1000
+        # Delivery tag of the last message to acknowledge, number of them and ack timer
+        self.__ack_tag = None
+        self.__unacked = 0
+        self.__ack_timer = None
+
+        # PUBLISHER: channel, queues declared on the connection and uncommitted messages
+        self._publish_channel = None
+        self.__declared_queues = set()
+        self.__publish_lock = threading.Lock()
+        self.__confirm_batch = confirm_batch
+        self.__confirm_interval = confirm_interval_ms / 1000
+        # Number of uncommitted messages, time of the first one and commit timer state
+        self.__unconfirmed = 0
+        self.__unconfirmed_since = None
+        self.__confirm_timer = False
 
         # Establish connection
         self.__establish_connection(self.__username, self.__password, self.__host)
@@ -97,6 +145,16 @@ class UConnAMQP(object):
             logging.info('Connecting to RabbitMQ server')
             self._connection = pika.BlockingConnection(parameters)
             self._channel = self._connection.channel()
+            if self.__prefetch_count:
+                self._channel.basic_qos(prefetch_count=self.__prefetch_count)
+            self.__declared_queues = set()
+
+            # Transaction would hold acks of consumed messages, so publish on its own channel
+            if self.__confirm_batch:
+                self._publish_channel = self._connection.channel()
+                self._publish_channel.tx_select()
+            else:
+                self._publish_channel = self._channel
 
         except (pika.exceptions.ProbableAuthenticationError,
                 pika.exceptions.ConnectionClosed,
@@ -114,12 +172,58 @@ class UConnAMQP(object):
         """
         logging.info('Received message # %s from %s: %s', basic_deliver.delivery_tag,
                      properties.headers.get('sender'), body)
-        self._channel.basic_ack(delivery_tag=basic_deliver.delivery_tag)
-        if callable(self.__callback) and self.__callback:
-            self.__callback(self.__callback_object, properties.headers.get('sender').encode(),
-                            body)
-            return 0
-        return 1
+        try:
+            # Messages are published to the default exchange, so routing key is the queue name
+            subscription = self.__subscriptions.get(basic_deliver.routing_key)
+            if subscription is not None and callable(subscription[2]):
+                _, callback_object, callback = subscription
+                callback(callback_object, properties.headers.get('sender').encode(), body)
+                return 0
+            return 1
+        except Exception as ex:
+            logging.exception('Message callback error: %s', ex)
+        finally:
+            self.__acknowledge(basic_deliver.delivery_tag)
+
+    def __acknowledge(self, delivery_tag):
+        """
+        Acknowledge delivered message, batched by ack_batch and ack_interval_ms
+
+        Called on the consuming thread only.
+
+        :param int delivery_tag: Delivery tag
+        """
+
+        self.__ack_tag = delivery_tag
+        self.__unacked += 1
+        if self.__unacked >= self.__ack_batch:
+            self._flush_acks()
+        elif self.__ack_timer is None:
+            self.__ack_timer = self._connection.add_timeout(self.__ack_interval,
+                                                            self._on_ack_timer)
+
+    def _on_ack_timer(self):
+        """
+        Acknowledge messages waiting for ack_interval_ms
+        """
+
+        self.__ack_timer = None
+        self._flush_acks()
+
+    def _flush_acks(self):
+        """
+        Acknowledge all delivered messages with one ack
+
+        Called on the consuming thread only.
+        """
+
+        if self.__ack_timer is not None:
+            self._connection.remove_timeout(self.__ack_timer)
+            self.__ack_timer = None
+
+        if self.__unacked:
+            self._channel.basic_ack(delivery_tag=self.__ack_tag, multiple=self.__unacked > 1)
+            self.__unacked = 0
 
     def publish(self, sender, destination, message):
         """
@@ -137,49 +241,192 @@ class UConnAMQP(object):
                     or not isinstance(sender, bytes)):
                 raise exceptions.UtimExchangeException
 
-            self._channel.queue_declare(queue=destination, durable=True)
             properties = pika.BasicProperties(headers={'sender': sender.decode()})
-            self._channel.basic_publish(exchange='', routing_key=destination,
-                                        properties=properties, body=message)
-        except (pika.exceptions.ChannelClosed,
+            thread = self.__consumer_thread
+            if thread is not None and thread is not threading.current_thread():
+                self.__call_on_consumer(thread, lambda: self.__publish(destination, properties,
+                                                                       message))
+            else:
+                self.__publish(destination, properties, message)
+        except (pika.exceptions.ConnectionClosed,
+                pika.exceptions.ChannelClosed,
                 pika.exceptions.UnsupportedAMQPFieldException,
                 exceptions.UtimExchangeException) as ex:
             self.__log_exception(ex)
 
+    def __publish(self, destination, properties, message):
+        """
+        Declare queue if needed, publish and commit when the batch is due
+
+        Called on the consuming thread while consuming.
+
+        :param str destination: Destination address
+        :param pika.BasicProperties properties: Message properties
+        :param bytes message: Message
+        """
+
+        with self.__publish_lock:
+            if destination not in self.__declared_queues:
+                self._publish_channel.queue_declare(queue=destination, durable=True)
+                self.__declared_queues.add(destination)
+            self._publish_channel.basic_publish(exchange='', routing_key=destination,
+                                                properties=properties, body=message)
+
+            if self.__confirm_batch:
+                self.__unconfirmed += 1
+                if self.__unconfirmed == 1:
+                    self.__unconfirmed_since = time.monotonic()
+                if self.__unconfirmed >= self.__confirm_batch:
+                    self.__confirm()
+                elif not self._consuming:
+                    if time.monotonic() - self.__unconfirmed_since >= self.__confirm_interval:
+                        self.__confirm()
+                elif not self.__confirm_timer:
+                    self.__confirm_timer = True
+                    self._connection.add_timeout(self.__confirm_interval,
+                                                 self._on_confirm_timer)
+
+    def __call_on_consumer(self, thread, function):
+        """
+        Call function on the consuming thread and wait for it
+
+        :param threading.Thread thread: Consuming thread
+        :param function: Function without arguments
+        :raise: Exception raised by function, ConnectionClosed if consuming has stopped
+        """
+
+        done = threading.Event()
+        errors = []
+
+        def call():
+            try:
+                function()
+            except Exception as ex:
+                errors.append(ex)
+            finally:
+                done.set()
+
+        self._connection.add_callback_threadsafe(call)
+        while not done.wait(0.1):
+            if thread.ident is not None and not thread.is_alive():
+                raise pika.exceptions.ConnectionClosed()
+        if errors:
+            raise errors[0]
+
+    def __confirm(self):
+        """
+        Commit published messages, returns when the broker has accepted them
+
+        Must be called with publish lock held.
+        """
+
+        if self.__unconfirmed:
+            self._publish_channel.tx_commit()
+            self.__unconfirmed = 0
+
+    def _on_confirm_timer(self):
+        """
+        Commit messages waiting for confirm_interval_ms (consuming thread)
+
+        A batch committed since the timer was started leaves newer messages, which are
+        committed early.
+        """
+
+        try:
+            with self.__publish_lock:
+                self.__confirm_timer = False
+                self.__confirm()
+        except pika.exceptions.ChannelClosed as ex:
+            self.__log_exception(ex)
+
     def disconnect(self):
         """
         Disconnect function
 
-        Disconnection from the RabbitMQ server
+        Disconnection from the RabbitMQ server. Consuming stops on the consuming thread, which
+        sends the pending acks, then the rest is done on the caller thread.
         """
 
         logging.info('Closing connection')
-        if self._channel is not None:
-            self._channel.basic_cancel(self._consumer_tag)
-            self._channel.stop_consuming(self.SUBSCRIBE_QUEUE)
+        thread = self.__consumer_thread
+        if thread is not None:
+            self.__consumer_thread = None
+            if thread is threading.current_thread():
+                self.__stop_consuming()
+            else:
+                self._connection.add_callback_threadsafe(self.__stop_consuming)
+                thread.join()
+        self.__subscriptions.clear()
+
+        if self.__confirm_batch and self._publish_channel is not None:
+            with self.__publish_lock:
+                try:
+                    self.__confirm()
+                except pika.exceptions.AMQPError as ex:
+                    logging.error('Uncommitted messages on disconnect: ' + str(ex))
 
         if self._connection is not None:
             self._connection.close()
 
+    def __stop_consuming(self):
+        """
+        Acknowledge delivered messages and cancel consumers (consuming thread)
+        """
+
+        try:
+            self._flush_acks()
+            self._channel.stop_consuming()
+        except pika.exceptions.AMQPError as ex:
+            logging.error('Stop consuming error: ' + str(ex))
+        self._consuming = False
+
+    def __run_consumer(self):
+        """
+        Consume messages until consumers are cancelled (consuming thread)
+        """
+
+        try:
+            self._channel.start_consuming()
+        except pika.exceptions.AMQPError as ex:
+            logging.error('Consuming error: ' + str(ex))
+
     def subscribe(self, topic, callback_object, callback):
         """
         Subscribe on topic
 
+        Any number of topics may be subscribed, each one is consumed from its own queue on
+        the same channel.
+
         :param str topic: Topic for subscription
         :param object callback_object: Object with callback method
         :param method callback: Callback for received message
         """
 
-        self.SUBSCRIBE_QUEUE = topic
-        self.SUBSCRIBE_ROUTING_KEY = topic
-        self.__callback_object = callback_object
-        self.__callback = callback
+        consumer_tag = 'ctag.{0}'.format(topic)
+        self.__subscriptions[topic] = (consumer_tag, callback_object, callback)
 
-        self._channel.queue_declare(queue=self.SUBSCRIBE_QUEUE, durable=True)
-        self._consumer_tag = self._channel.basic_consume(self.on_message, self.SUBSCRIBE_QUEUE)
         if not self._consuming:
-            _thread.start_new_thread(self._channel.start_consuming, ())
+            self.__consume(topic, consumer_tag)
             self._consuming = True
+            self.__consumer_thread = threading.Thread(target=self.__run_consumer,
+                                                      name='THREAD_AMQP_CONSUMER')
+            self.__consumer_thread.daemon = True
+            self.__consumer_thread.start()
+        else:
+            # Channel belongs to the consuming thread now
+            self._connection.add_callback_threadsafe(lambda: self.__consume(topic, consumer_tag))
+
+    def __consume(self, topic, consumer_tag):
+        """
+        Declare queue of topic and start consuming it
+
+        :param str topic: Topic
+        :param str consumer_tag: Consumer tag
+        """
+
+        self._channel.queue_declare(queue=topic, durable=True)
+        self.__declared_queues.add(topic)
+        self._channel.basic_consume(self.on_message, topic, consumer_tag=consumer_tag)
 
     def unsubscribe(self, topic):
         """
@@ -187,8 +434,11 @@ class UConnAMQP(object):
 
         :param str topic: Channel name to listen
         """
-        self.SUBSCRIBE_QUEUE = None
-        self.SUBSCRIBE_ROUTING_KEY = None
-        self.__callback_object = None
-        self.__callback = None
-        self._channel.basic_cancel(self._consumer_tag)
+        subscription = self.__subscriptions.pop(topic, None)
+        if subscription is None:
+            return
+        consumer_tag = subscription[0]
+        if self._consuming:
+            self._connection.add_callback_threadsafe(lambda: self._channel.basic_cancel(consumer_tag))
+        else:
+            self._channel.basic_cancel(consumer_tag)
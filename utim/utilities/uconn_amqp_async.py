@@ -0,0 +1,393 @@
+"""
+UConnAMQPAsync module
+
+This module implements the AMQP connection and messaging through the RabbitMQ server on an
+asynchronous connection: one I/O thread runs the pika SelectConnection loop and does all channel
+work, consuming included. Publishes from any thread are queued and handed to the I/O thread, so
+publishers never touch the channel and never wait for the broker.
+"""
+
+import collections
+import logging
+import threading
+import pika
+from pika.adapters.select_connection import SelectConnection
+from . import exceptions, config
+
+
+class UConnAMQPAsync(object):
+    """
+    Asynchronous connection to AMQP class
+    """
+
+    DEFAULT_PREFETCH_COUNT = 0
+    DEFAULT_ACK_BATCH = 1
+    DEFAULT_ACK_INTERVAL_MS = 10
+    DEFAULT_CONNECTION_TIMEOUT = 10
+
+    def __init__(self, prefetch_count=DEFAULT_PREFETCH_COUNT, ack_batch=DEFAULT_ACK_BATCH,
+                 ack_interval_ms=DEFAULT_ACK_INTERVAL_MS, confirm=False,
+                 connection_timeout=DEFAULT_CONNECTION_TIMEOUT):
+        """
+        Initialize AMQP connection
+
+        Consumer prefetch and ack batching work as in UConnAMQP. With confirm the channel is in
+        publisher confirm mode, messages rejected by the broker are logged.
+
+        :param int prefetch_count: Maximum unacknowledged messages delivered (0 - no limit)
+        :param int ack_batch: Messages per ack (1 - ack every message)
+        :param float ack_interval_ms: Maximum milliseconds a message waits for its ack
+        :param bool confirm: Publisher confirms
+        :param float connection_timeout: Seconds to wait for the channel to open
+        :raises utim.exceptions.UtimConnectionException: if connection is broken
+        """
+
+        self.__config = config.Config()
+
+        self.__prefetch_count = prefetch_count
+        self.__ack_batch = max(ack_batch, 1)
+        self.__ack_interval = ack_interval_ms / 1000
+        self.__confirm = confirm
+
+        # SUBSCRIBER: consumer tag, callback object and callback by queue
+        self.__subscriptions = {}
+        # Delivery tag of the last message to acknowledge, number of them and ack timer
+        self.__ack_tag = None
+        self.__unacked = 0
+        self.__ack_timer = None
+
+        # PUBLISHER: messages waiting for the I/O thread, queues declared and being declared
+        self.__outbox = collections.deque()
+        self.__outbox_lock = threading.Lock()
+        self.__wakeup_pending = False
+        self.__declared_queues = set()
+        self.__declaring = {}
+
+        # Connection
+        self._connection = None
+        self._channel = None
+        self.__opened = threading.Event()
+        self.__closed = False
+
+        self.__establish_connection(connection_timeout)
+
+    def __establish_connection(self, timeout):
+        """
+        Connect and start I/O thread
+
+        :param float timeout: Seconds to wait for the channel to open
+        :raise: UtimConnectionException
+        """
+
+        username = self.__config.messaging_username
+        password = self.__config.messaging_password
+        hostname = self.__config.messaging_hostname
+        if username is None or password is None or hostname is None:
+            logging.error('Connection error: invalid credentials or host')
+            raise exceptions.UtimConnectionException
+
+        credentials = pika.PlainCredentials(username, password)
+        parameters = pika.ConnectionParameters(host=hostname, credentials=credentials,
+                                               heartbeat_interval=5)
+        logging.info('Connecting to RabbitMQ server')
+        try:
+            self._connection = SelectConnection(parameters,
+                                                on_open_callback=self.__on_connection_open,
+                                                on_open_error_callback=self.__on_open_error,
+                                                on_close_callback=self.__on_connection_closed)
+        except pika.exceptions.AMQPError as ex:
+            logging.exception("Connection error " + str(ex))
+            raise exceptions.UtimConnectionException
+
+        self.__thread = threading.Thread(
+            target=self._connection.ioloop.start,
+            name='THREAD_AMQP_IO'
+        )
+        self.__thread.daemon = True
+        self.__thread.start()
+
+        if not self.__opened.wait(timeout) or self.__closed:
+            logging.error('Connection error: channel was not opened')
+            self.disconnect()
+            raise exceptions.UtimConnectionException
+
+    def __on_connection_open(self, connection):
+        """
+        Connection opened, open channel (I/O thread)
+        """
+
+        connection.channel(on_open_callback=self.__on_channel_open)
+
+    def __on_open_error(self, connection, error):
+        """
+        Connection failed (I/O thread)
+        """
+
+        logging.error('Connection error ' + str(error))
+        self.__closed = True
+        self.__opened.set()
+        connection.ioloop.stop()
+
+    def __on_connection_closed(self, connection, reply_code, reply_text):
+        """
+        Connection closed (I/O thread)
+        """
+
+        if not self.__closed:
+            logging.error('Connection closed: (%s) %s', reply_code, reply_text)
+        self.__closed = True
+        self._channel = None
+        self.__opened.set()
+
+    def __on_channel_open(self, channel):
+        """
+        Channel opened: set prefetch and confirm mode, consume subscriptions, publish messages
+        queued so far (I/O thread)
+        """
+
+        self._channel = channel
+        if self.__prefetch_count:
+            channel.basic_qos(prefetch_count=self.__prefetch_count)
+        if self.__confirm:
+            channel.confirm_delivery(self.__on_confirm)
+
+        for topic, (consumer_tag, _, _) in list(self.__subscriptions.items()):
+            self.__consume(topic, consumer_tag)
+
+        self.__opened.set()
+        self.__drain()
+
+    def __call_threadsafe(self, callback):
+        """
+        Run callback on the I/O thread
+
+        :param callback: Callback
+        :raise: UtimConnectionException
+        """
+
+        if self.__closed:
+            raise exceptions.UtimConnectionException
+        self._connection.add_callback_threadsafe(callback)
+
+    def publish(self, sender, destination, message):
+        """
+        Send message to destination
+
+        Thread-safe, returns as soon as the message is queued for the I/O thread.
+
+        :param bytes sender: Sender name
+        :param str destination: Destination address
+        :param bytes message: Message
+        :raise: UtimExchangeException, UtimConnectionException
+        """
+
+        if (not isinstance(destination, str) or not destination
+                or not isinstance(message, bytes)
+                or not isinstance(sender, bytes)):
+            logging.error('Exchange error: invalid publish parameters')
+            raise exceptions.UtimExchangeException
+
+        with self.__outbox_lock:
+            self.__outbox.append((sender, destination, message))
+            # One wakeup of the I/O thread for all messages queued until it drains them
+            if self.__wakeup_pending:
+                return
+            self.__wakeup_pending = True
+
+        self.__call_threadsafe(self.__drain)
+
+    def __drain(self):
+        """
+        Publish queued messages (I/O thread)
+        """
+
+        with self.__outbox_lock:
+            self.__wakeup_pending = False
+
+        if self._channel is None:
+            return
+
+        while True:
+            try:
+                sender, destination, message = self.__outbox.popleft()
+            except IndexError:
+                break
+
+            if destination in self.__declared_queues:
+                self.__basic_publish(sender, destination, message)
+            elif destination in self.__declaring:
+                self.__declaring[destination].append((sender, message))
+            else:
+                self.__declaring[destination] = [(sender, message)]
+                self._channel.queue_declare(
+                    lambda frame, queue=destination: self.__on_queue_declared(queue),
+                    queue=destination, durable=True)
+
+    def __on_queue_declared(self, queue):
+        """
+        Publish messages waiting for their queue (I/O thread)
+
+        :param str queue: Queue name
+        """
+
+        self.__declared_queues.add(queue)
+        for sender, message in self.__declaring.pop(queue, ()):
+            self.__basic_publish(sender, queue, message)
+
+    def __basic_publish(self, sender, destination, message):
+        """
+        Publish message (I/O thread)
+        """
+
+        properties = pika.BasicProperties(headers={'sender': sender.decode()})
+        self._channel.basic_publish(exchange='', routing_key=destination,
+                                    properties=properties, body=message)
+
+    def __on_confirm(self, frame):
+        """
+        Publisher confirm (I/O thread)
+
+        :param pika.frame.Method frame: Basic.Ack or Basic.Nack
+        """
+
+        if isinstance(frame.method, pika.spec.Basic.Nack):
+            logging.error('Broker rejected message(s) up to #%s', frame.method.delivery_tag)
+
+    def on_message(self, unused_channel, basic_deliver, properties, body):
+        """
+        Invoked by pika when a message is delivered from RabbitMQ (I/O thread)
+
+        :param pika.channel.Channel unused_channel: The channel object
+        :param pika.Spec.Basic.Deliver basic_deliver: basic_deliver method
+        :param pika.Spec.BasicProperties properties: properties
+        :param bytes body: The message body
+        """
+        logging.info('Received message # %s from %s: %s', basic_deliver.delivery_tag,
+                     properties.headers.get('sender'), body)
+        try:
+            # Messages are published to the default exchange, so routing key is the queue name
+            subscription = self.__subscriptions.get(basic_deliver.routing_key)
+            if subscription is not None and callable(subscription[2]):
+                _, callback_object, callback = subscription
+                callback(callback_object, properties.headers.get('sender').encode(), body)
+                return 0
+            return 1
+        except Exception as ex:
+            logging.exception('Message callback error: %s', ex)
+        finally:
+            self.__acknowledge(basic_deliver.delivery_tag)
+
+    def __acknowledge(self, delivery_tag):
+        """
+        Acknowledge delivered message, batched by ack_batch and ack_interval_ms (I/O thread)
+
+        :param int delivery_tag: Delivery tag
+        """
+
+        self.__ack_tag = delivery_tag
+        self.__unacked += 1
+        if self.__unacked >= self.__ack_batch:
+            self._flush_acks()
+        elif self.__ack_timer is None:
+            self.__ack_timer = self._connection.add_timeout(self.__ack_interval,
+                                                            self._on_ack_timer)
+
+    def _on_ack_timer(self):
+        """
+        Acknowledge messages waiting for ack_interval_ms (I/O thread)
+        """
+
+        self.__ack_timer = None
+        self._flush_acks()
+
+    def _flush_acks(self):
+        """
+        Acknowledge all delivered messages with one ack (I/O thread)
+        """
+
+        if self.__ack_timer is not None:
+            self._connection.remove_timeout(self.__ack_timer)
+            self.__ack_timer = None
+
+        if self.__unacked and self._channel is not None:
+            self._channel.basic_ack(delivery_tag=self.__ack_tag, multiple=self.__unacked > 1)
+            self.__unacked = 0
+
+    def subscribe(self, topic, callback_object, callback):
+        """
+        Subscribe on topic
+
+        Any number of topics may be subscribed, each one is consumed from its own queue.
+        Callbacks run on the I/O thread.
+
+        :param str topic: Topic for subscription
+        :param object callback_object: Object with callback method
+        :param method callback: Callback for received message
+        """
+
+        consumer_tag = 'ctag.{0}'.format(topic)
+        self.__subscriptions[topic] = (consumer_tag, callback_object, callback)
+        self.__call_threadsafe(lambda: self.__consume(topic, consumer_tag))
+
+    def __consume(self, topic, consumer_tag):
+        """
+        Declare queue of topic and start consuming it (I/O thread)
+
+        :param str topic: Topic
+        :param str consumer_tag: Consumer tag
+        """
+
+        if self._channel is None:
+            # Consumed when the channel opens
+            return
+
+        def on_declared(frame):
+            self.__declared_queues.add(topic)
+            if self.__subscriptions.get(topic, (None,))[0] == consumer_tag:
+                self._channel.basic_consume(self.on_message, topic, consumer_tag=consumer_tag)
+
+        self._channel.queue_declare(on_declared, queue=topic, durable=True)
+
+    def unsubscribe(self, topic):
+        """
+        Unsubscribe
+
+        :param str topic: Channel name to listen
+        """
+
+        subscription = self.__subscriptions.pop(topic, None)
+        if subscription is None:
+            return
+        consumer_tag = subscription[0]
+        self.__call_threadsafe(
+            lambda: self._channel is not None and self._channel.basic_cancel(
+                consumer_tag=consumer_tag))
+
+    def disconnect(self):
+        """
+        Disconnect function
+
+        Publishes queued messages, acknowledges delivered ones and closes the connection.
+        """
+
+        logging.info('Closing connection')
+        if not self.__closed:
+            self.__closed = True
+            self._connection.add_callback_threadsafe(self.__close)
+
+        if threading.current_thread() is not self.__thread:
+            self.__thread.join()
+
+    def __close(self):
+        """
+        Close connection (I/O thread)
+        """
+
+        if self._channel is not None:
+            self.__drain()
+            self._flush_acks()
+        self.__subscriptions.clear()
+        if self._connection.is_open:
+            self._connection.close()
+        else:
+            self._connection.ioloop.stop()
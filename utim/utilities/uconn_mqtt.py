@@ -15,17 +15,45 @@ class UConnMQTT(object):
     MQTT class
     """
 
-    def __init__(self):
+    DEFAULT_QOS = 0
+    DEFAULT_MAX_INFLIGHT = 20
+
+    def __init__(self, qos=None, max_inflight=None, client_id=None):
         """
         Initialize MQTT connection
+
+        With QoS 1 or 2 delivery is guaranteed by MQTT: the session is persistent (not clean),
+        so the broker keeps subscriptions and queued messages of client_id while it is away, and
+        the client keeps unacknowledged outbound messages in memory and resends them after
+        reconnection. Options not given are read from config, client_id defaults to
+        utim-<utim name>.
+
+        :param int qos: MQTT QoS level of publishes and subscriptions (0, 1 or 2)
+        :param int max_inflight: Maximum unacknowledged QoS 1/2 outbound messages
+        :param str client_id: Client id of persistent session
         """
 
-        self.__topic = None
-        self.__message_callback = None
+        # Callback object and callback by topic
+        self.__subscriptions = {}
         self.reconnection = 0
 
         self.__config = config.Config()
 
+        self.__qos = self.__config.messaging_qos if qos is None else qos
+        if self.__qos not in (0, 1, 2):
+            raise ValueError('qos must be 0, 1 or 2')
+        self.__max_inflight = (self.__config.messaging_max_inflight if max_inflight is None
+                               else max_inflight)
+        self.__clean_session = self.__qos == 0
+        if self.__clean_session:
+            self.__client_id = ''
+        elif client_id is not None:
+            self.__client_id = client_id
+        else:
+            self.__client_id = self.__config.messaging_client_id or \
+                'utim-' + self.__config.utim_name
+        self.__client = None
+
         try:
             self.__reconnect_time = int(self.__config.messaging_reconnect_time)
         except (TypeError, ValueError):
@@ -65,36 +93,41 @@ class UConnMQTT(object):
 
     def __establish_connection(self, username, password, hostname):
         """
-        Exception handler
+        Connect and start the network loop
+
+        The loop thread of paho reconnects by itself when the connection is lost, waiting from
+        1 up to reconnect_time seconds between attempts, and on_connect subscribes again.
         :param str username: User name
         :param str password: User password
         :param str hostname: Host name
-        :return: Opened channel
         :raise: UtimConnectionException
         """
 
         self.connectionFlag = False
-        while True:
-            try:
-                if username is None or password is None:
-                    raise ValueError('Invalid credentials.')
-                if hostname is None:
-                    raise ValueError('Invalid host.')
-
-                # Parameters and credentials
 
-                self.__client = mqtt.Client()
-                self.__client.on_connect = self.on_connect
-                self.__client.on_disconnect = self.on_disconnect
+        try:
+            if username is None or password is None:
+                raise ValueError('Invalid credentials.')
+            if hostname is None:
+                raise ValueError('Invalid host.')
+        except ValueError as er:
+            self.__log_exception(er)
+
+        # Client is kept for the life of the connection, so the unacknowledged messages of a
+        # persistent session are resent after reconnection
+        self.__client = mqtt.Client(client_id=self.__client_id,
+                                    clean_session=self.__clean_session)
+        self.__client.max_inflight_messages_set(self.__max_inflight)
+        self.__client.reconnect_delay_set(min_delay=1, max_delay=max(1, self.__reconnect_time))
+        self.__client.on_connect = self.on_connect
+        self.__client.on_disconnect = self.on_disconnect
+        self.__client.username_pw_set(username, password)
+        self.__client.on_message = self._on_message
 
-                self.__client.username_pw_set(username, password)
-                self.__client.on_message = self._on_message
+        while True:
+            try:
                 self.__client.connect(hostname)
-                self.__client.loop_start()
-
                 break
-            except ValueError as er:
-                self.__log_exception(er)
             except OSError as er:
                 time.sleep(1)
                 if self.reconnection == 0:
@@ -109,36 +142,28 @@ class UConnMQTT(object):
                     logging.error('Reconnection timeout !')
                     raise exceptions.UtimConnectionException(er)
 
+        self.__client.loop_start()
+
     def on_connect(self, client, userdata, flags, rc):
         print("ucon-mqtt - Internet connection established..")
         logging.debug("Internet connection established..")
         self.reconnection = 0
         self.connectionFlag = True
 
-        if self.__topic:
-            self.__client.subscribe(self.__topic)
+        topics = list(self.__subscriptions)
+        if topics:
+            self.__client.subscribe([(topic, self.__qos) for topic in topics])
 
     def on_disconnect(self, client, userdata, rc):
         print("ucon-mqtt - Internet connection losted..")
         logging.debug("Internet connection losted..")
         self.connectionFlag = False
 
+        # Unexpected disconnection, the loop thread of paho reconnects after this callback
         if rc != mqtt.MQTT_ERR_SUCCESS:
             self.reconnection += 1
             print("RECONNECTION TIMES: {0}".format(self.reconnection))
-
-            self.__client.loop_stop(force=True)
-
-            if self.__reconnect_time <= self.reconnection:
-                print('ucon-mqtt - Reconnection timeout !')
-                logging.error('Reconnection timeout !')
-                raise exceptions.UtimConnectionException()
-
-            # Get connection parameters
-            username, password, host = self.__get_connection_parameters()
-
-            # Establish connection
-            self.__establish_connection(username, password, host)
+            logging.warning('Connection lost (%s), reconnecting', mqtt.error_string(rc))
 
     def disconnect(self):
         """
@@ -151,13 +176,14 @@ class UConnMQTT(object):
         """
         Subscribe
 
+        Any number of topics may be subscribed, each with its own callback.
+
         :param str topic: Channel name to listen
+        :param cbobj: Object passed to callback as first argument
         :param callback: Callback
         """
-        self.__topic = topic
-        self.__cbobject = cbobj
-        self.__message_callback = callback
-        self.__client.subscribe(topic)
+        self.__subscriptions[topic] = (cbobj, callback)
+        self.__client.subscribe(topic, self.__qos)
 
     def unsubscribe(self, topic):
         """
@@ -166,9 +192,7 @@ class UConnMQTT(object):
         :param str topic: Channel name to listen
         """
 
-        self.__topic = None
-        self.__cbobject = None
-        self.__message_callback = None
+        self.__subscriptions.pop(topic, None)
         self.__client.unsubscribe(topic)
 
     def publish(self, sender, destination, message):
@@ -186,7 +210,7 @@ class UConnMQTT(object):
                 raise exceptions.UtimExchangeException
             msg = sender + b' ' + message
             logging.info("UMQTT PUBLISH MESSAGE: {0}".format(msg))
-            self.__client.publish(topic=destination, payload=msg)
+            self.__client.publish(topic=destination, payload=msg, qos=self.__qos)
         except exceptions.UtimExchangeException as ex:
             self.__log_exception(ex)
 
@@ -200,9 +224,10 @@ class UConnMQTT(object):
         :returns: 0 - if custom message callback was called, 1 - if custom message callback is None,
         None - else
         """
-        msg = message.payload
-        m = msg.partition(b' ')
-        if callable(self.__message_callback):
-            self.__message_callback(self.__cbobject, m[0], m[2])
+        subscription = self.__subscriptions.get(message.topic)
+        if subscription is not None and callable(subscription[1]):
+            cbobject, message_callback = subscription
+            m = message.payload.partition(b' ')
+            message_callback(cbobject, m[0], m[2])
             return 0
         return 1
@@ -28,18 +28,21 @@ import threading
 import logging
 import queue
 import os
-from .utilities import srp
 from .connectivity import manager as conn_manager
+from .connectivity import async_manager as conn_async_manager
 from .utilities.exceptions import UtimConnectionException, UtimInitializationError
 from .connectivity import TopManagerConnectionStatus
 from .connectivity import TopDataType
 from .utilities.address import Address
-from .utilities.data_indexes import ProcessorIndex
+from .utilities.session import UtimSession
+from .utilities.cryptography import CryptoLayer
 from .utilities import process_item
+from .utilities import srp
 from .utilities import config
+from .utilities.timeout import Timeout
 
 
-class Utim(object):
+class Utim(UtimSession):
     """
     Utim class
     """
@@ -49,6 +52,11 @@ class Utim(object):
         Initialization
         """
 
+        UtimSession.__init__(self)
+
+        # Precomputed SRP ephemerals, filled from now on
+        srp.EphemeralPool.get()
+
         try:
             self.__item_process = None
 
@@ -57,22 +65,12 @@ class Utim(object):
             # Uhost protocol
             self.__uhost_protocol = self.__config.utim_messaging_protocol.lower()
 
-            # Session key and SLS name of this session
-            self.__session_key = None
-
-            # SRP client
-            self.__srp_client = None
-            # Utim SRP auth step
-            self.__srp_step = None
-            self.__step_iterations = 10
-
             # SLS id
             self.__sls_id = None
 
             # Process platform connection
             self.__platform_connection = None
             self.__platform_process = None
-            self.__platform_config = None
 
             # Process device
             self.__device_process = None
@@ -94,6 +92,13 @@ class Utim(object):
             # Name
             self.__utim_name = self.__config.utim_name.upper()
 
+            # Crypto mode of Uhost messages
+            crypto_mode = CryptoLayer.SESSION_MODES.get(self.__config.utim_crypto_mode)
+            if crypto_mode is None:
+                logging.error("Unsupported crypto mode %s", self.__config.utim_crypto_mode)
+                raise UtimInitializationError
+            self.set_crypto_mode(crypto_mode)
+
             # Connectivity
             self.__connection = None
             self.__uhost_status = None
@@ -124,11 +129,21 @@ class Utim(object):
         :param dl_type: DataLink manager connection type
         :param tx: Queue to transmit data
         :param rx: Queue to receive data
+        :param bool shared_connection: Share Uhost broker connection with other Utims in process
+        :param bool async_connectivity: Run connectivity layers as coroutines on the reactor
+            shared by all Utims in process (queue DataLink only), each Utim keeps one DataLink
+            reader thread
 
         :raise: UtimConnectionException
         """
 
-        self.__connection = conn_manager.ConnectivityManager()
+        shared_connection = kwargs.pop('shared_connection', False)
+        async_connectivity = kwargs.pop('async_connectivity', False)
+
+        if async_connectivity:
+            self.__connection = conn_async_manager.AsyncConnectivityManager()
+        else:
+            self.__connection = conn_manager.ConnectivityManager()
 
         # Device (another app) connection
         self.__connection.connect(**kwargs)
@@ -136,7 +151,8 @@ class Utim(object):
         # Uhost connection
         self.__uhost_status = self.__connection.run_uhost_connection({
             'utim_name': self.__utim_name,
-            'protocol': self.__uhost_protocol
+            'protocol': self.__uhost_protocol,
+            'shared': shared_connection
         })
 
         logging.info("UHOST CONNECTION STATUS: %s", self.__uhost_status)
@@ -169,7 +185,8 @@ class Utim(object):
         :return : Connection status
         """
 
-        self.__platform_status = self.__connection.run_platform_connection(self.__platform_config)
+        self.__platform_status = self.__connection.run_platform_connection(
+            self.get_platform_config())
 
         return self.__platform_status
 
@@ -180,21 +197,20 @@ class Utim(object):
 
         while self.__run_event.is_set():
             if self.__connection:
-                data = self.__connection.receive()
+                data = self.__connection.receive(Timeout.QUEUE_WAIT)
                 # print("Inbound ", data)
                 if data:
-                    tag = data[ProcessorIndex.address.value]
-                    body = data[ProcessorIndex.body.value]
+                    tag, body = data
                     # print("Inbound tag", tag)
                     # print("Inbound body", body)
                     if tag == TopDataType.DEVICE:
-                        while not self.__put_data([Address.ADDRESS_DEVICE, body]):
+                        while not self.__put_data((Address.ADDRESS_DEVICE, body)):
                             pass
                     elif tag == TopDataType.UHOST:
-                        while not self.__put_data([Address.ADDRESS_UHOST, body]):
+                        while not self.__put_data((Address.ADDRESS_UHOST, body)):
                             pass
                     elif tag == TopDataType.PLATFORM:
-                        while not self.__put_data([Address.ADDRESS_PLATFORM, body]):
+                        while not self.__put_data((Address.ADDRESS_PLATFORM, body)):
                             pass
                     else:
                         logging.debug("Unknown inbound tag: %s - %s", tag, body)
@@ -222,10 +238,9 @@ class Utim(object):
         while self.__run_event.is_set():
             if self.__connection:
                 try:
-                    data = self.__outbound_queue.get_nowait()
+                    data = self.__outbound_queue.get(timeout=Timeout.QUEUE_WAIT)
                     if data:
-                        tag = data[ProcessorIndex.address.value]
-                        body = data[ProcessorIndex.body.value]
+                        tag, body = data
                         # print("Outbound tag", tag)
                         # print("Outbound body", body)
                         if tag == Address.ADDRESS_DEVICE:
@@ -240,49 +255,6 @@ class Utim(object):
                 except queue.Empty:
                     pass
 
-    def set_platform_config(self, config_string):
-        """
-        Set platform id
-        """
-        try:
-            self.__platform_config = dict(config_string)
-        except ValueError:
-            logging.error('Error setting platform config')
-
-    def get_platform_config(self):
-        """
-        Get platform id
-        """
-        return self.__platform_config
-
-    def get_srp_step(self):
-        """
-        Get SRP step
-        """
-
-        return self.__srp_step
-
-    def set_srp_step(self, step):
-        """
-        Set SRP step
-        """
-
-        self.__srp_step = step
-
-    def get_srp_iterations(self):
-        """
-        Get SRP iterations
-        """
-
-        return self.__step_iterations
-
-    def set_srp_iterations(self, iteration):
-        """
-        Set SRP iterations
-        """
-
-        self.__step_iterations = iteration
-
     @staticmethod
     def __get_master_key():
         """
@@ -297,40 +269,12 @@ class Utim(object):
             logging.debug(ex)
             raise UtimInitializationError
 
-    def get_session_key(self):
-        """
-        Get session key
-        """
-
-        return self.__session_key
-
-    def set_session_key(self, key):
-        """
-        Set session key
-        """
-
-        self.__session_key = key
-
-    def get_srp_client(self):
+    def _get_srp_credentials(self):
         """
-        Get SRP client
+        Get SRP username and password
         """
 
-        logging.debug("Check sls id is not None")
-        if self.__srp_client is None:
-            logging.debug("Create new SRP User")
-            username = bytes.fromhex(self.__utim_name)
-            password = self.__get_master_key()
-            logging.debug("Username: %s", username)
-            logging.debug("Username: %s", [x for x in username])
-            logging.debug("Password: %s", [x for x in password])
-            self.__srp_client = srp.User(username, password)
-
-        logging.debug("SRP client type: %s", type(self.__srp_client))
-        if self.__srp_client is not None:
-            logging.debug("A: %s", str(self.__srp_client.A))
-
-        return self.__srp_client
+        return bytes.fromhex(self.__utim_name), self.__get_master_key()
 
     def run(self):
         """
@@ -2,7 +2,6 @@ import logging
 from ..utilities.tag import Tag
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
 
 
 def process(utim, data):
@@ -10,14 +9,14 @@ def process(utim, data):
     Run process
 
     :param Utim utim: Utim instance
-    :param list data: Data to process [source, destination, status, body]
-    :return list: [from, to, status, body]
+    :param Message data: Message to process
+    :return Message: Processed message
     """
 
-    source = data[SubprocessorIndex.source.value]
-    destination = data[SubprocessorIndex.destination.value]
-    status = data[SubprocessorIndex.status.value]
-    body = data[SubprocessorIndex.body.value]
+    source = data.source
+    destination = data.destination
+    status = data.status
+    body = data.body
 
     if (source == Address.ADDRESS_DEVICE and destination == Address.ADDRESS_UTIM and
             status == Status.STATUS_PROCESS):
@@ -51,7 +50,7 @@ def process(utim, data):
                     print('Starting SRP sequence...')
 
                     # Return STATUS_TO_SEND result
-                    return [source, destination, status, body]
+                    return data.update(source, destination, status, body)
 
                 else:
                     logging.error("SRP client is None")
@@ -68,4 +67,4 @@ def process(utim, data):
 
     # Return STATUS_FINALIZED result
     status = Status.STATUS_FINALIZED
-    return [source, destination, status, body]
+    return data.update(source, destination, status, body)
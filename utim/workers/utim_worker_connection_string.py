@@ -1,8 +1,8 @@
 import logging
+from ..utilities import tlv
 from ..utilities.tag import Tag
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
 
 
 def process(utim, data):
@@ -10,28 +10,29 @@ def process(utim, data):
     Run process
 
     :param Utim utim: Utim instance
-    :param list data: Data to process [source, destination, status, body]
-    :return list: [from, to, status, body]
+    :param Message data: Message to process
+    :return Message: Processed message
     """
 
-    source = data[SubprocessorIndex.source.value]
-    destination = data[SubprocessorIndex.destination.value]
-    status = data[SubprocessorIndex.status.value]
-    body = data[SubprocessorIndex.body.value]
+    source = data.source
+    destination = data.destination
+    status = data.status
+    body = data.body
 
     if (source == Address.ADDRESS_UHOST and destination == Address.ADDRESS_UTIM and
             status == Status.STATUS_PROCESS):
-        cs_tag = body[0:1]
-        cs_length_bytes = body[1:3]
-        cs_length = int.from_bytes(cs_length_bytes, byteorder='big', signed=False)
-        cs = body[3:3 + cs_length]
+        try:
+            cs_tag, cs = tlv.decode(body)[0]
+        except (tlv.TLVDecodeException, IndexError):
+            cs_tag, cs = None, None
 
         if cs_tag == Tag.UCOMMAND.CONNECTION_STRING:
-            # Parse platform tag
-            pl_tag = cs[0:1]
-            pl_length_bytes = cs[1:3]
-            pl_length = int.from_bytes(pl_length_bytes, byteorder='big', signed=False)
-            command = cs[3:3 + pl_length]
+            # Parse nested platform record
+            try:
+                pl_tag, command = tlv.decode(cs)[0]
+                command = bytes(command)
+            except (tlv.TLVDecodeException, IndexError):
+                pl_tag, command = None, None
 
             if pl_tag in (Tag.UPLATFORM.PL_AZURE, Tag.UPLATFORM.PL_AWS):
 
@@ -44,7 +45,7 @@ def process(utim, data):
                 print('Connecting to cloud...')
 
                 # Return STATUS_PROCESS result
-                return [source, destination, status, body]
+                return data.update(source, destination, status, body)
 
             else:
                 logging.error("Invalid pl_tag: %s", str(pl_tag))
@@ -58,4 +59,4 @@ def process(utim, data):
 
     # Return STATUS_FINALIZED result
     status = Status.STATUS_FINALIZED
-    return [source, destination, status, body]
+    return data.update(source, destination, status, body)
@@ -9,7 +9,6 @@ The Worker simply calls the Utim's Die() method which terminates the Utim's exec
 import logging
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
 
 
 def process(utim, data):
@@ -20,10 +19,9 @@ def process(utim, data):
     :param Queue outbound_queue: queue to write in
     """
 
-    logging.debug("CommandWorkerDie process data: %s", [x for x in data[SubprocessorIndex.body.value]])
+    logging.debug("CommandWorkerDie process data: %s", [x for x in data.body])
 
     utim.utim_die()
 
-    res = data
-    res[SubprocessorIndex.status.value] = Status.STATUS_FINALIZED
-    return res
+    data.status = Status.STATUS_FINALIZED
+    return data
@@ -3,10 +3,8 @@ Encryption worker
 """
 
 import logging
-from ..utilities.cryptography import CryptoLayer
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
 
 
 def process(utim, data):
@@ -15,15 +13,17 @@ def process(utim, data):
     """
 
     res = None
+    crypto = utim.get_crypto()
     try:
-        crypto = CryptoLayer(utim.get_session_key())
-        logging.debug('Encrypting message {0} with key {1}'
-                      .format(data[SubprocessorIndex.body.value], utim.get_session_key()))
-        res = crypto.encrypt(CryptoLayer.CRYPTO_MODE_AES, data[SubprocessorIndex.body.value])
-        logging.debug('Encrypted package: {0}'.format(res))
+        logging.debug('Encrypting message %s', data.body)
+        res = crypto.encrypt(crypto.mode, data.body)
+        logging.debug('Encrypted package: %s', res)
     except ValueError:
         logging.error('Error appeared in encrypting message')
     if res is None:
-        return [Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_FINALIZED, res]
+        return data.update(Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_FINALIZED, res)
+    elif crypto.is_aead:
+        # Authenticated encryption is complete envelope, no signing
+        return data.update(Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_TO_SEND, res)
     else:
-        return [Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_PROCESS, res]
+        return data.update(Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_PROCESS, res)
@@ -9,9 +9,9 @@ then permanently discards the command.
 """
 
 import logging
+from ..utilities import tlv
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
 
 
 def process(utim, data):
@@ -22,20 +22,17 @@ def process(utim, data):
     :param Queue outbound_queue: queue to write in
     """
 
-    logging.debug("WorkerError process data: %s", [x for x in data[SubprocessorIndex.body.value]])
+    logging.debug("WorkerError process data: %s", [x for x in data.body])
 
     # Allow start SRP authentication if error is 'hello', 'check' or 'trusted' type
     try:
-        uhost_data = data[SubprocessorIndex.body.value]
-        tag = uhost_data[0:1]
-        length = uhost_data[1:3]
-        value = uhost_data[3:]
-        data_split = value.decode('utf-8').split(' ', 1)
+        uhost_data = data.body
+        tag, value = tlv.decode(uhost_data)[0]
+        data_split = bytes(value).decode('utf-8').split(' ', 1)
         if data_split[0] in ('hello', 'check', 'trusted'):
             utim.set_srp_iterations(10)
             utim.set_srp_step(None)
-    except UnicodeDecodeError as ex:
+    except (UnicodeDecodeError, tlv.TLVDecodeException, IndexError) as ex:
         logging.error(ex)
-    res = data
-    res[SubprocessorIndex.status.value] = Status.STATUS_FINALIZED
-    return res
+    data.status = Status.STATUS_FINALIZED
+    return data
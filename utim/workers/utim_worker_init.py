@@ -1,9 +1,9 @@
 import logging
 import os
+from ..utilities import tlv
 from ..utilities.tag import Tag
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
 
 
 def process(utim, data):
@@ -11,21 +11,22 @@ def process(utim, data):
     Run process
 
     :param Utim utim: Utim instance
-    :param list data: Data to process [source, destination, status, body]
-    :return list: [from, to, status, body]
+    :param Message data: Message to process
+    :return Message: Processed message
     """
 
-    source = data[SubprocessorIndex.source.value]
-    destination = data[SubprocessorIndex.destination.value]
-    status = data[SubprocessorIndex.status.value]
-    body = data[SubprocessorIndex.body.value]
+    source = data.source
+    destination = data.destination
+    status = data.status
+    body = data.body
 
     if (source == Address.ADDRESS_UHOST and destination == Address.ADDRESS_UTIM and
             status == Status.STATUS_PROCESS):
-        tag = body[0:1]
-        length_bytes = body[1:3]
-        length = int.from_bytes(length_bytes, byteorder='big', signed=False)
-        value = body[3:3 + length]
+        try:
+            tag, value = tlv.decode(body)[0]
+            value = bytes(value)
+        except (tlv.TLVDecodeException, IndexError):
+            tag, value = None, None
 
         if tag == Tag.UCOMMAND.INIT:
             # Get SRP step
@@ -60,7 +61,7 @@ def process(utim, data):
                     body = command
 
                     # Return STATUS_TO_SEND result
-                    return [source, destination, status, body]
+                    return data.update(source, destination, status, body)
 
                 else:
                     logging.error("SRP client is None")
@@ -77,4 +78,4 @@ def process(utim, data):
 
     # Return STATUS_FINALIZED result
     status = Status.STATUS_FINALIZED
-    return [source, destination, status, body]
+    return data.update(source, destination, status, body)
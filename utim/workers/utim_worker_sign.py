@@ -6,7 +6,6 @@ import logging
 from ..utilities.cryptography import CryptoLayer
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
 
 
 def process(utim, data):
@@ -16,14 +15,13 @@ def process(utim, data):
 
     res = None
     try:
-        crypto = CryptoLayer(utim.get_session_key())
-        logging.debug('Signing message {0} with key {1}'
-                      .format(data[SubprocessorIndex.body.value], utim.get_session_key()))
-        res = crypto.sign(CryptoLayer.SIGN_MODE_SHA1, data[SubprocessorIndex.body.value])
-        logging.debug('Signed package: {0}'.format(res))
+        crypto = utim.get_crypto()
+        logging.debug('Signing message %s', data.body)
+        res = crypto.sign(CryptoLayer.SIGN_MODE_SHA1, data.body)
+        logging.debug('Signed package: %s', res)
     except TypeError:
         logging.error('Error appeared in signing message')
     if res is None:
-        return [Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_FINALIZED, res]
+        return data.update(Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_FINALIZED, res)
     else:
-        return [Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_TO_SEND, res]
+        return data.update(Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_TO_SEND, res)
@@ -16,10 +16,10 @@ and puts it into the outbound queue.
 """
 
 import logging
+from ..utilities import tlv
 from ..utilities.tag import Tag
 from ..utilities.address import Address
 from ..utilities.status import Status
-from ..utilities.data_indexes import SubprocessorIndex
 
 
 def process(utim, data):
@@ -31,29 +31,24 @@ def process(utim, data):
     """
 
     packet = None
-    uhost_data = data[SubprocessorIndex.body.value]
-
-    tag1 = uhost_data[0:1]
-    length_bytes1 = uhost_data[1:3]
-    length1 = int.from_bytes(length_bytes1, byteorder='big', signed=False)
-    value1 = uhost_data[3:3 + length1]
-
-    tag2 = uhost_data[3 + length1:4 + length1]
-    length_bytes2 = uhost_data[4 + length1: 6 + length1]
-    length2 = int.from_bytes(length_bytes2, byteorder='big', signed=False)
-    value2 = uhost_data[6 + length1:6 + length1 + length2]
-
-    # Logging
-    logging.debug('Tag1: %s', str(tag1))
-    logging.debug('Length1: %d', length1)
-    logging.debug('Value1: %s', [x for x in value1])
-    logging.debug('Tag2: %s', str(tag2))
-    logging.debug('Length2: %d', length2)
-    logging.debug('Value2: %s', [x for x in value2])
-
-    # Check real data length
-    if (length1 == len(value1) and tag1 == Tag.UCOMMAND.TRY_FIRST and
-        length2 == len(value2) and tag2 == Tag.UCOMMAND.TRY_SECOND):
+    uhost_data = data.body
+
+    try:
+        records = tlv.decode(uhost_data)
+    except tlv.TLVDecodeException as ex:
+        logging.debug('Invalid try data: %s', ex)
+        records = []
+
+    # Check records
+    if (len(records) == 2 and records[0][0] == Tag.UCOMMAND.TRY_FIRST and
+            records[1][0] == Tag.UCOMMAND.TRY_SECOND):
+        value1 = bytes(records[0][1])
+        value2 = bytes(records[1][1])
+
+        # Logging
+        logging.debug('Value1: %s', [x for x in value1])
+        logging.debug('Value2: %s', [x for x in value2])
+
         # Get SRP client
         srp_client = utim.get_srp_client()
         if srp_client is not None:
@@ -73,7 +68,8 @@ def process(utim, data):
                 packet = Tag.UCOMMAND.assemble_check(M)
         else:
             logging.debug('SRP client is None')
-            return [data[0], data[1], Status.STATUS_FINALIZED, data[3]]
+            data.status = Status.STATUS_FINALIZED
+            return data
 
     else:
         logging.debug('error try wrong_parameters')
@@ -83,4 +79,4 @@ def process(utim, data):
     # Put packet to the queue
     if packet is not None:
         logging.debug('put answer to outbound queue')
-        return [Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_PROCESS, packet]
+        return data.update(Address.ADDRESS_UTIM, Address.ADDRESS_UHOST, Status.STATUS_PROCESS, packet)